@@ -0,0 +1,29 @@
+"""add physical exam whr and bp_grade
+
+Revision ID: 1d6b8e2f4c95
+Revises: e7a1c5f3b820
+Create Date: 2026-10-18 18:12:40.381957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d6b8e2f4c95'
+down_revision: Union[str, None] = 'e7a1c5f3b820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 历史数据的派生值（含 eGFR）由 scripts/recompute_derived.py 回填
+    op.add_column('physical_exams', sa.Column('whr', sa.Float(), nullable=True))
+    op.add_column('physical_exams', sa.Column('bp_grade', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('physical_exams', 'bp_grade')
+    op.drop_column('physical_exams', 'whr')
@@ -0,0 +1,46 @@
+"""add patient summary columns
+
+Revision ID: 3a5a71de4078
+Revises: 551226eecc95
+Create Date: 2026-10-18 09:12:40.218731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a5a71de4078'
+down_revision: Union[str, None] = '551226eecc95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('patients', sa.Column('has_submitted', sa.Boolean(), server_default='0', nullable=False))
+    op.add_column('patients', sa.Column('has_consent', sa.Boolean(), server_default='0', nullable=False))
+    op.add_column('patients', sa.Column('latest_visit_status', sa.String(length=20), nullable=True))
+
+    # 回填已有数据（与 scripts/rebuild_patient_summary.py 逻辑一致）
+    op.execute("""
+        UPDATE patients SET
+            has_submitted = EXISTS (
+                SELECT 1 FROM visits WHERE visits.patient_id = patients.id AND visits.status <> 'draft'
+            ),
+            has_consent = EXISTS (
+                SELECT 1 FROM consent_records WHERE consent_records.patient_id = patients.id
+            ),
+            latest_visit_status = (
+                SELECT visits.status FROM visits WHERE visits.patient_id = patients.id
+                ORDER BY visits.visit_date DESC, visits.id DESC LIMIT 1
+            ),
+            updated_at = updated_at
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('patients', 'latest_visit_status')
+    op.drop_column('patients', 'has_consent')
+    op.drop_column('patients', 'has_submitted')
@@ -0,0 +1,38 @@
+"""add change_log outbox
+
+Revision ID: 4f8a2c6e9d13
+Revises: 1d6b8e2f4c95
+Create Date: 2026-10-18 19:03:27.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a2c6e9d13'
+down_revision: Union[str, None] = '1d6b8e2f4c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 从空表开始记录；下游首次同步先做一次全量导出，再从当前最大 id 起增量拉取
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=40), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('center_id', sa.Integer(), nullable=True),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('visit_id', sa.Integer(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_center_id', 'change_log', ['center_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_center_id', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,29 @@
+"""add visit and patient version counters
+
+Revision ID: 5e0c9a7d2b61
+Revises: c41e7f0b9d23
+Create Date: 2026-10-18 15:06:12.904381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c9a7d2b61'
+down_revision: Union[str, None] = 'c41e7f0b9d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有行以 server_default 填充为 1，无需回填
+    op.add_column('visits', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('patients', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('patients', 'version')
+    op.drop_column('visits', 'version')
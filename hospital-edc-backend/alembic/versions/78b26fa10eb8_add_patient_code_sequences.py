@@ -0,0 +1,31 @@
+"""add patient_code_sequences
+
+Revision ID: 78b26fa10eb8
+Revises: a69e5d99ed74
+Create Date: 2026-10-18 11:20:36.117289
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '78b26fa10eb8'
+down_revision: Union[str, None] = 'a69e5d99ed74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 序列行在各中心首次分配编号时按已有最大序号初始化，无需回填
+    op.create_table('patient_code_sequences',
+    sa.Column('center_code', sa.String(length=20), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('center_code')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('patient_code_sequences')
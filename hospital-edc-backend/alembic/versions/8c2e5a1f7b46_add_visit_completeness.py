@@ -0,0 +1,51 @@
+"""add visit_completeness matrix
+
+Revision ID: 8c2e5a1f7b46
+Revises: 4f8a2c6e9d13
+Create Date: 2026-10-18 19:48:05.662913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e5a1f7b46'
+down_revision: Union[str, None] = '4f8a2c6e9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有访视的完整度由 scripts/rebuild_completeness.py 回填
+    op.create_table('visit_completeness',
+    sa.Column('visit_id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('center_id', sa.Integer(), nullable=False),
+    sa.Column('visit_type', sa.String(length=10), nullable=False),
+    sa.Column('section_mask', sa.Integer(), nullable=False),
+    sa.Column('basic_ratio', sa.Float(), nullable=False),
+    sa.Column('comorbidity_ratio', sa.Float(), nullable=False),
+    sa.Column('medication_ratio', sa.Float(), nullable=False),
+    sa.Column('cost_ratio', sa.Float(), nullable=False),
+    sa.Column('eq5d_ratio', sa.Float(), nullable=False),
+    sa.Column('dtsq_ratio', sa.Float(), nullable=False),
+    sa.Column('phq9_ratio', sa.Float(), nullable=False),
+    sa.Column('gad7_ratio', sa.Float(), nullable=False),
+    sa.Column('diet_ratio', sa.Float(), nullable=False),
+    sa.Column('exercise_ratio', sa.Float(), nullable=False),
+    sa.Column('meal_ratio', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['visit_id'], ['visits.id'], ),
+    sa.PrimaryKeyConstraint('visit_id')
+    )
+    op.create_index('ix_visit_completeness_center_type', 'visit_completeness', ['center_id', 'visit_type'], unique=False)
+    op.create_index('ix_visit_completeness_patient_id', 'visit_completeness', ['patient_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_visit_completeness_patient_id', table_name='visit_completeness')
+    op.drop_index('ix_visit_completeness_center_type', table_name='visit_completeness')
+    op.drop_table('visit_completeness')
@@ -0,0 +1,27 @@
+"""add questionnaire eq5d_index
+
+Revision ID: 9b3f62d8e4a7
+Revises: 5e0c9a7d2b61
+Create Date: 2026-10-18 16:41:55.210736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f62d8e4a7'
+down_revision: Union[str, None] = '5e0c9a7d2b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 历史问卷的效用值由 scripts/rescore.py --only questionnaires 回填
+    op.add_column('questionnaires', sa.Column('eq5d_index', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('questionnaires', 'eq5d_index')
@@ -0,0 +1,57 @@
+"""add patient_search_tokens
+
+Revision ID: a69e5d99ed74
+Revises: d77a89afb4c5
+Create Date: 2026-10-18 10:48:02.931556
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a69e5d99ed74'
+down_revision: Union[str, None] = 'd77a89afb4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _suffixes(value):
+    value = (value or "").strip().lower()[:20]
+    return {value[i:] for i in range(len(value))}
+
+
+def upgrade() -> None:
+    tokens = op.create_table('patient_search_tokens',
+    sa.Column('token', sa.String(length=20), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('token', 'patient_id')
+    )
+    op.create_index('ix_patient_search_tokens_patient_id', 'patient_search_tokens', ['patient_id'], unique=False)
+
+    # 回填已有患者（与 scripts/rebuild_search_index.py 逻辑一致），按主键分批
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, patient_code, name_initials FROM patients WHERE id > :last ORDER BY id LIMIT 5000"),
+            {"last": last_id},
+        ).fetchall()
+        if not rows:
+            break
+        values = [
+            {"token": t, "patient_id": pid}
+            for pid, code, initials in rows
+            for t in _suffixes(code) | _suffixes(initials)
+        ]
+        if values:
+            op.bulk_insert(tokens, values)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patient_search_tokens_patient_id', table_name='patient_search_tokens')
+    op.drop_table('patient_search_tokens')
@@ -0,0 +1,53 @@
+"""add discrepancies and sweep_watermarks
+
+Revision ID: b5d91e3a7c28
+Revises: 8c2e5a1f7b46
+Create Date: 2026-10-18 20:41:37.218504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d91e3a7c28'
+down_revision: Union[str, None] = '8c2e5a1f7b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有数据由 scripts/run_edit_checks.py --full 做首次核查
+    op.create_table('discrepancies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('visit_id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('center_id', sa.Integer(), nullable=False),
+    sa.Column('rule_code', sa.String(length=40), nullable=False),
+    sa.Column('field', sa.String(length=40), nullable=True),
+    sa.Column('value', sa.String(length=100), nullable=True),
+    sa.Column('message', sa.String(length=200), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('detected_at', sa.DateTime(), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_discrepancies_visit_rule', 'discrepancies', ['visit_id', 'rule_code'], unique=True)
+    op.create_index('ix_discrepancies_patient_id', 'discrepancies', ['patient_id'], unique=False)
+    op.create_index('ix_discrepancies_center_status', 'discrepancies', ['center_id', 'status', 'id'], unique=False)
+    op.create_table('sweep_watermarks',
+    sa.Column('name', sa.String(length=40), nullable=False),
+    sa.Column('last_change_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sweep_watermarks')
+    op.drop_index('ix_discrepancies_center_status', table_name='discrepancies')
+    op.drop_index('ix_discrepancies_patient_id', table_name='discrepancies')
+    op.drop_index('uq_discrepancies_visit_rule', table_name='discrepancies')
+    op.drop_table('discrepancies')
@@ -0,0 +1,39 @@
+"""add hot path composite indexes
+
+Revision ID: be2caec7af27
+Revises: 78b26fa10eb8
+Create Date: 2026-10-18 12:02:51.447093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'be2caec7af27'
+down_revision: Union[str, None] = '78b26fa10eb8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 索引与各路由查询一一对应，可用 scripts/explain_hot_queries.py 校验执行计划
+    op.create_index('ix_visits_patient_date', 'visits', ['patient_id', 'visit_date', 'id'], unique=False)
+    op.create_index('ix_visits_patient_type', 'visits', ['patient_id', 'visit_type'], unique=False)
+    op.create_index('ix_visits_status', 'visits', ['status'], unique=False)
+    op.create_index('ix_questionnaires_visit_type', 'questionnaires', ['visit_id', 'questionnaire_type'], unique=False)
+    op.create_index(op.f('ix_medications_visit_id'), 'medications', ['visit_id'], unique=False)
+    op.create_index(op.f('ix_meal_records_visit_id'), 'meal_records', ['visit_id'], unique=False)
+    op.create_index('ix_patients_center_status_id', 'patients', ['center_id', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_center_status_id', table_name='patients')
+    op.drop_index(op.f('ix_meal_records_visit_id'), table_name='meal_records')
+    op.drop_index(op.f('ix_medications_visit_id'), table_name='medications')
+    op.drop_index('ix_questionnaires_visit_type', table_name='questionnaires')
+    op.drop_index('ix_visits_status', table_name='visits')
+    op.drop_index('ix_visits_patient_type', table_name='visits')
+    op.drop_index('ix_visits_patient_date', table_name='visits')
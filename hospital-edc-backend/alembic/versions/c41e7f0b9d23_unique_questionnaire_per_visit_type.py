@@ -0,0 +1,41 @@
+"""unique questionnaire per visit and type
+
+Revision ID: c41e7f0b9d23
+Revises: be2caec7af27
+Create Date: 2026-10-18 14:20:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7f0b9d23'
+down_revision: Union[str, None] = 'be2caec7af27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 先清理历史重复问卷（同访视同类型只保留 id 最大的一份），再建唯一索引
+    op.execute(
+        """
+        DELETE FROM questionnaires
+        WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MAX(id) AS keep_id FROM questionnaires
+                GROUP BY visit_id, questionnaire_type
+            ) AS latest
+        )
+        """
+    )
+    # MySQL 外键需要 visit_id 前缀索引，先建新索引再删旧索引
+    op.create_index('uq_questionnaires_visit_type', 'questionnaires', ['visit_id', 'questionnaire_type'], unique=True)
+    op.drop_index('ix_questionnaires_visit_type', table_name='questionnaires')
+
+
+def downgrade() -> None:
+    op.create_index('ix_questionnaires_visit_type', 'questionnaires', ['visit_id', 'questionnaire_type'], unique=False)
+    op.drop_index('uq_questionnaires_visit_type', table_name='questionnaires')
@@ -0,0 +1,38 @@
+"""add center_stats
+
+Revision ID: d77a89afb4c5
+Revises: 3a5a71de4078
+Create Date: 2026-10-18 10:05:17.604412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd77a89afb4c5'
+down_revision: Union[str, None] = '3a5a71de4078'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 计数行在首次读取时按中心懒加载生成，无需回填
+    op.create_table('center_stats',
+    sa.Column('center_id', sa.Integer(), nullable=False),
+    sa.Column('total_patients', sa.Integer(), nullable=False),
+    sa.Column('enrolled', sa.Integer(), nullable=False),
+    sa.Column('visits_draft', sa.Integer(), nullable=False),
+    sa.Column('visits_submitted', sa.Integer(), nullable=False),
+    sa.Column('visits_signed', sa.Integer(), nullable=False),
+    sa.Column('visits_locked', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['center_id'], ['centers.id'], ),
+    sa.PrimaryKeyConstraint('center_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('center_stats')
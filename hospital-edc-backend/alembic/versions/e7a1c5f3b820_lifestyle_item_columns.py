@@ -0,0 +1,103 @@
+"""move lifestyle item scores into columns
+
+Revision ID: e7a1c5f3b820
+Revises: 9b3f62d8e4a7
+Create Date: 2026-10-18 17:25:08.663120
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c5f3b820'
+down_revision: Union[str, None] = '9b3f62d8e4a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ITEM_COLUMNS = {
+    "diet": [f"diet_q{i}" for i in range(1, 11)],
+    "exercise": [f"exercise_q{i}" for i in range(1, 6)],
+}
+
+
+def _parse(raw, size):
+    """旧 JSON（列表或 {题号: 分值}）→ 定长分值列表；无法解析时全部为空"""
+    try:
+        scores = json.loads(raw) if raw else []
+        if isinstance(scores, dict):
+            scores = list(scores.values())
+        scores = [None if s is None else float(s) for s in scores][:size]
+    except (ValueError, TypeError, AttributeError):
+        scores = []
+    return scores + [None] * (size - len(scores))
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('lifestyle_assessments') as batch_op:
+        for columns in ITEM_COLUMNS.values():
+            for col in columns:
+                batch_op.add_column(sa.Column(col, sa.Float(), nullable=True))
+
+    # 按主键分批解析旧 JSON，executemany 批量写入逐题列
+    conn = op.get_bind()
+    table = sa.table('lifestyle_assessments', sa.column('id'),
+                     *[sa.column(c) for cols in ITEM_COLUMNS.values() for c in cols])
+    stmt = (
+        table.update()
+        .where(table.c.id == sa.bindparam('_id'))
+        .values({c: sa.bindparam('v_' + c) for cols in ITEM_COLUMNS.values() for c in cols})
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, diet_scores_json, exercise_scores_json FROM lifestyle_assessments "
+                    "WHERE id > :last ORDER BY id LIMIT 5000"),
+            {"last": last_id},
+        ).fetchall()
+        if not rows:
+            break
+        params = []
+        for row_id, diet_raw, exercise_raw in rows:
+            values = {"_id": row_id}
+            for kind, raw in (("diet", diet_raw), ("exercise", exercise_raw)):
+                columns = ITEM_COLUMNS[kind]
+                values.update({'v_' + c: s for c, s in zip(columns, _parse(raw, len(columns)))})
+            params.append(values)
+        conn.execute(stmt, params)
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('lifestyle_assessments') as batch_op:
+        batch_op.drop_column('diet_scores_json')
+        batch_op.drop_column('exercise_scores_json')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('lifestyle_assessments') as batch_op:
+        batch_op.add_column(sa.Column('diet_scores_json', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('exercise_scores_json', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    all_columns = [c for cols in ITEM_COLUMNS.values() for c in cols]
+    rows = conn.execute(sa.text(f"SELECT id, {', '.join(all_columns)} FROM lifestyle_assessments")).fetchall()
+    params = []
+    for row in rows:
+        values = dict(zip(all_columns, row[1:]))
+        params.append({
+            "_id": row[0],
+            "diet": json.dumps([values[c] for c in ITEM_COLUMNS["diet"]]) if any(values[c] is not None for c in ITEM_COLUMNS["diet"]) else None,
+            "exercise": json.dumps([values[c] for c in ITEM_COLUMNS["exercise"]]) if any(values[c] is not None for c in ITEM_COLUMNS["exercise"]) else None,
+        })
+    if params:
+        conn.execute(
+            sa.text("UPDATE lifestyle_assessments SET diet_scores_json = :diet, exercise_scores_json = :exercise WHERE id = :_id"),
+            params,
+        )
+
+    with op.batch_alter_table('lifestyle_assessments') as batch_op:
+        for columns in ITEM_COLUMNS.values():
+            for col in columns:
+                batch_op.drop_column(col)
@@ -0,0 +1,39 @@
+"""add center_daily_stats rollups
+
+Revision ID: f2a7c4e8b159
+Revises: b5d91e3a7c28
+Create Date: 2026-10-18 21:26:52.904716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c4e8b159'
+down_revision: Union[str, None] = 'b5d91e3a7c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 已有数据由 scripts/rebuild_daily_stats.py 回填
+    op.create_table('center_daily_stats',
+    sa.Column('center_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('enrollments', sa.Integer(), nullable=False),
+    sa.Column('visits', sa.Integer(), nullable=False),
+    sa.Column('visits_submitted', sa.Integer(), nullable=False),
+    sa.Column('visits_signed', sa.Integer(), nullable=False),
+    sa.Column('visits_locked', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['center_id'], ['centers.id'], ),
+    sa.PrimaryKeyConstraint('center_id', 'day')
+    )
+    op.create_index('ix_center_daily_stats_day', 'center_daily_stats', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_center_daily_stats_day', table_name='center_daily_stats')
+    op.drop_table('center_daily_stats')
@@ -7,6 +7,27 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
     UPLOAD_DIR: str = "./uploads"
 
+    # 同一请求内同一 SQL 执行次数达到该值时记录疑似 N+1 告警（0 = 关闭）
+    DB_N_PLUS_ONE_THRESHOLD: int = 0
+    # 开启后检测到疑似 N+1 直接报错（开发/测试环境使用）
+    DB_N_PLUS_ONE_RAISE: bool = False
+
+    # 已签名/锁定访视 all-forms 缓存：内存上限（字节，0 = 关闭）
+    VISIT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # 可选磁盘层目录（留空 = 不启用）及其总大小上限
+    VISIT_CACHE_DIR: str = ""
+    VISIT_CACHE_DISK_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # EQ-5D-5L 效用值价值集（见 app/services/eq5d.py）；指定文件时优先使用文件
+    EQ5D_VALUE_SET: str = "CN"
+    EQ5D_VALUE_SET_FILE: str = ""
+
+    # 变更订阅（GET /api/changes）只返回写入超过该秒数的记录，避免并发事务晚提交导致漏读
+    CHANGE_FEED_SETTLE_SECONDS: int = 2
+
+    # 数据核查规则文件（JSON 数组，格式见 app/services/edit_checks.py）；留空使用内置规则
+    EDIT_CHECK_RULES_FILE: str = ""
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,74 @@
+"""
+条件 GET（ETag / If-None-Match）。
+
+访视与患者各带一个 version 计数器，写入时在同一事务内 +1
+（见 app/services/visit_events.py、app/services/patient_summary.py）。
+校验只查 version 一列，命中时直接返回 304，不加载表单/患者数据。
+"""
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dependencies import get_current_user, get_accessible_center_ids
+from app.models.patient import Patient
+from app.models.visit import Visit
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def visit_tag(visit_id: int, version: int) -> str:
+    return f'"visit-{visit_id}-{version}"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """If-None-Match 命中则以 304 结束请求，否则在响应上附带 ETag"""
+    headers = etag_headers(etag)
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(304, headers=headers)
+    response.headers.update(headers)
+
+
+def visit_etag(
+    visit_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> Optional[int]:
+    """
+    访视及其表单的 ETag，返回当前 version；访视不存在时返回 None，交由路由返回 404。
+    version 每次都查库（主键单列查询）：进程内缓存只在本进程失效，多 worker 部署时不可作为依据。
+    """
+    version = db.query(Visit.version).filter(Visit.id == visit_id).scalar()
+    if version is not None:
+        check_etag(request, response, visit_tag(visit_id, version))
+    return version
+
+
+def patient_etag(
+    patient_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> None:
+    """患者详情的 ETag；无权访问时不短路，交由路由返回 403"""
+    row = db.query(Patient.version, Patient.center_id).filter(Patient.id == patient_id).first()
+    if row is None:
+        return
+    accessible_centers = get_accessible_center_ids(current_user)
+    if accessible_centers is not None and row.center_id not in accessible_centers:
+        return
+    check_etag(request, response, f'"patient-{patient_id}-{row.version}"')
@@ -3,8 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from app.routers import auth, patients, visits, forms, consent, centers, invitation_codes
+from app.routers import auth, patients, visits, forms, consent, centers, invitation_codes, analytics, exports, changes, discrepancies
 from app.database import engine, Base
+from app.config import settings
+from app import query_counter
 import app.models  # noqa: 确保所有 Model 在启动时被注册
 import os
 
@@ -32,8 +34,30 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-ms", "ETag"],
 )
 
+# 按请求统计 SQL 语句数与耗时（响应头 X-DB-Queries / X-DB-Time-ms）
+query_counter.install(engine)
+
+
+@app.middleware("http")
+async def db_query_stats(request: Request, call_next):
+    stats, token = query_counter.begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        query_counter.end_request(token)
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time-ms"] = f"{stats.elapsed_ms:.1f}"
+    query_counter.check_n_plus_one(
+        stats,
+        f"{request.method} {request.url.path}",
+        settings.DB_N_PLUS_ONE_THRESHOLD,
+        settings.DB_N_PLUS_ONE_RAISE,
+    )
+    return response
+
 app.include_router(auth.router)
 app.include_router(patients.router)
 app.include_router(visits.router)
@@ -41,6 +65,10 @@ app.include_router(forms.router)
 app.include_router(consent.router)
 app.include_router(centers.router)
 app.include_router(invitation_codes.router)
+app.include_router(analytics.router)
+app.include_router(exports.router)
+app.include_router(changes.router)
+app.include_router(discrepancies.router)
 
 # ── 前端静态文件托管 ──────────────────────────────────────────
 # 计算前端目录：main.py → app/ → hospital-edc-backend/ → hospital-edc/
@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """
+    变更发件箱：患者、访视、表单、知情同意写入时在同一事务内追加一行，只增不改。
+    自增 id 即水位线，下游按 id 顺序增量同步（见 app/services/change_log.py）。
+    表单按 (表名, visit_id) 记录，下游据此重新拉取该访视的该表单。
+    """
+    __tablename__ = "change_log"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    table_name = Column(String(40), nullable=False)   # patients / visits / consent_records / 各表单表名
+    op = Column(String(10), nullable=False)           # insert / update / delete；表单为 upsert
+    center_id = Column(Integer)
+    patient_id = Column(Integer)
+    visit_id = Column(Integer)                        # 访视及表单变更时填写
+    changed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # 中心管理员按中心拉取增量
+        Index("ix_change_log_center_id", "center_id", "id"),
+    )
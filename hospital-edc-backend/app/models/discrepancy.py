@@ -0,0 +1,38 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Discrepancy(Base):
+    """
+    核查规则发现的数据疑问，每个 (访视, 规则) 一行（见 app/services/edit_checks.py）。
+    规则不再触发时置为 resolved，再次触发时重新打开，保留处理历史。
+    """
+    __tablename__ = "discrepancies"
+
+    id = Column(Integer, primary_key=True)
+    visit_id = Column(Integer, nullable=False)      # 不设外键：访视删除后疑问随下次核查关闭
+    patient_id = Column(Integer, nullable=False)
+    center_id = Column(Integer, nullable=False)
+    rule_code = Column(String(40), nullable=False)
+    field = Column(String(40))                      # 主要涉及的字段，如 lab.hba1c
+    value = Column(String(100))                     # 触发时的取值
+    message = Column(String(200), nullable=False)
+    status = Column(String(10), nullable=False, default="open")   # open / resolved
+    detected_at = Column(DateTime, nullable=False)
+    resolved_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("uq_discrepancies_visit_rule", "visit_id", "rule_code", unique=True),
+        Index("ix_discrepancies_patient_id", "patient_id"),
+        Index("ix_discrepancies_center_status", "center_id", "status", "id"),
+    )
+
+
+class SweepWatermark(Base):
+    """后台增量任务已处理到的 change_log 位置"""
+    __tablename__ = "sweep_watermarks"
+
+    name = Column(String(40), primary_key=True)
+    last_change_id = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -15,9 +15,11 @@ class PhysicalExam(Base):
     bmi = Column(Float)          # 后端自动计算
     waist_cm = Column(Float)
     hip_cm = Column(Float)
+    whr = Column(Float)          # 腰臀比，后端自动计算
     heart_rate = Column(Integer)
     sbp_mmhg = Column(Integer)   # 收缩压
     dbp_mmhg = Column(Integer)   # 舒张压
+    bp_grade = Column(String(20))  # 血压分级，后端自动计算
 
     recorded_at = Column(DateTime, server_default=func.now())
     visit = relationship("Visit", back_populates="physical_exam")
@@ -38,7 +40,7 @@ class LabResults(Base):
     alt = Column(Float)
     ast = Column(Float)
     scr = Column(Float)               # 血清肌酐 μmol/L
-    egfr = Column(Float)
+    egfr = Column(Float)              # 有肌酐与患者年龄、性别时按 CKD-EPI 2021 自动计算
     ua = Column(Float)                # 尿酸
     bun = Column(Float)
     test_date = Column(Date)
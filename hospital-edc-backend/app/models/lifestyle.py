@@ -10,12 +10,25 @@ class LifestyleAssessment(Base):
     visit_id = Column(Integer, ForeignKey("visits.id"), unique=True, nullable=False)
 
     # 饮食评估（10题，各2.5/5/7.5/10分）
-    diet_scores_json = Column(Text)       # JSON 存储 10 个题目的分值
+    diet_q1 = Column(Float)
+    diet_q2 = Column(Float)
+    diet_q3 = Column(Float)
+    diet_q4 = Column(Float)
+    diet_q5 = Column(Float)
+    diet_q6 = Column(Float)
+    diet_q7 = Column(Float)
+    diet_q8 = Column(Float)
+    diet_q9 = Column(Float)
+    diet_q10 = Column(Float)
     diet_total = Column(Float)            # 自动求和
     diet_level = Column(String(20))       # 差/尚可/一般/良好
 
     # 运动评估（5题）
-    exercise_scores_json = Column(Text)
+    exercise_q1 = Column(Float)
+    exercise_q2 = Column(Float)
+    exercise_q3 = Column(Float)
+    exercise_q4 = Column(Float)
+    exercise_q5 = Column(Float)
     exercise_total = Column(Float)
     exercise_level = Column(String(20))
 
@@ -28,11 +41,18 @@ class LifestyleAssessment(Base):
     visit = relationship("Visit", back_populates="lifestyle")
 
 
+# 各评估的逐题列（按题号顺序）
+LIFESTYLE_ITEM_COLUMNS = {
+    "diet": tuple(f"diet_q{i}" for i in range(1, 11)),
+    "exercise": tuple(f"exercise_q{i}" for i in range(1, 6)),
+}
+
+
 class MealRecord(Base):
     __tablename__ = "meal_records"
 
     id = Column(Integer, primary_key=True)
-    visit_id = Column(Integer, ForeignKey("visits.id"), nullable=False)
+    visit_id = Column(Integer, ForeignKey("visits.id"), nullable=False, index=True)
 
     meal_time = Column(String(20))        # 早餐/早加餐/午餐/午加餐/晚餐/晚加餐
     dish_name = Column(String(100))       # 菜肴名称
@@ -6,7 +6,7 @@ class Medication(Base):
     __tablename__ = "medications"
 
     id = Column(Integer, primary_key=True)
-    visit_id = Column(Integer, ForeignKey("visits.id"), nullable=False)
+    visit_id = Column(Integer, ForeignKey("visits.id"), nullable=False, index=True)
 
     treatment_type = Column(String(50))   # 糖尿病/高血压/降脂/抗血小板/抗凝/其他
     drug_name = Column(String(100))
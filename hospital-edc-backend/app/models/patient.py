@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Enum, Text, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -34,6 +34,13 @@ class Patient(Base):
     enrollment_date = Column(Date)
     status = Column(Enum("enrolled", "withdrawn", "completed"), default="enrolled")
 
+    # 录入状态汇总（冗余存储，由访视/知情同意写入时维护，见 app/services/patient_summary.py）
+    has_submitted = Column(Boolean, nullable=False, default=False, server_default="0")
+    has_consent = Column(Boolean, nullable=False, default=False, server_default="0")
+    latest_visit_status = Column(String(20))
+    # 患者详情的版本号：资料或汇总字段变化时 +1，用于 ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     created_by = Column(Integer)              # 创建者 user_id
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
@@ -41,4 +48,32 @@ class Patient(Base):
     # 关联
     center = relationship("Center", back_populates="patients")
     visits = relationship("Visit", back_populates="patient")
-    consent = relationship("ConsentRecord", back_populates="patient", uselist=False)
\ No newline at end of file
+    consent = relationship("ConsentRecord", back_populates="patient", uselist=False)
+
+    __table_args__ = (
+        # 患者列表：按中心（及状态）过滤、按 id 倒序分页
+        Index("ix_patients_center_status_id", "center_id", "status", "id"),
+    )
+
+
+class PatientSearchToken(Base):
+    """
+    患者编号 / 姓名首字母的后缀索引：每个后缀一行（小写）。
+    子串查询 LIKE '%x%' 转化为 token LIKE 'x%'，走主键范围扫描。
+    """
+    __tablename__ = "patient_search_tokens"
+
+    token = Column(String(20), primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_patient_search_tokens_patient_id", "patient_id"),
+    )
+
+
+class PatientCodeSequence(Base):
+    """患者编号序列：每个中心编号前缀一行，分配时对该行原子自增"""
+    __tablename__ = "patient_code_sequences"
+
+    center_code = Column(String(20), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -30,6 +30,7 @@ class Questionnaire(Base):
     eq_pain = Column(Integer)            # 疼痛/不舒服
     eq_anxiety = Column(Integer)         # 焦虑/沮丧
     eq_vas_score = Column(Integer)       # 刻度尺 0-100
+    eq5d_index = Column(Float)           # 效用值，后端按价值集查表计算
 
     # DTSQ 专用（10题，每题1-5）
     dtsq_open_text = Column(Text)        # 开放性问题答案
@@ -38,4 +39,9 @@ class Questionnaire(Base):
     phq9_symptoms = Column(String(100))  # 逗号分隔，如 "头晕,失眠"
 
     completed_at = Column(DateTime, server_default=func.now())
-    visit = relationship("Visit", back_populates="questionnaires")
\ No newline at end of file
+    visit = relationship("Visit", back_populates="questionnaires")
+
+    __table_args__ = (
+        # 每个访视每类问卷只有一份，原生 upsert 依赖此唯一索引
+        Index("uq_questionnaires_visit_type", "visit_id", "questionnaire_type", unique=True),
+    )
@@ -0,0 +1,86 @@
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CenterStats(Base):
+    """各中心首页计数缓存，由患者/访视写入增量维护（见 app/services/stats.py）"""
+    __tablename__ = "center_stats"
+
+    center_id = Column(Integer, ForeignKey("centers.id"), primary_key=True)
+
+    total_patients = Column(Integer, nullable=False, default=0)
+    enrolled = Column(Integer, nullable=False, default=0)
+    visits_draft = Column(Integer, nullable=False, default=0)       # 待录入
+    visits_submitted = Column(Integer, nullable=False, default=0)   # 待签名
+    visits_signed = Column(Integer, nullable=False, default=0)
+    visits_locked = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class CenterDailyStats(Base):
+    """
+    各中心按日汇总，供入组曲线与访视进度趋势（见 app/services/daily_stats.py）。
+    enrollments 按 patients.enrollment_date 计（未填入组日期的患者不计入）；
+    访视各列按 visit_date 计，visits_<状态> 为当日访视中已到达该状态（含后续状态）的数量。
+    由患者/访视写入增量维护，scripts/rebuild_daily_stats.py 全量重建。
+    """
+    __tablename__ = "center_daily_stats"
+
+    center_id = Column(Integer, ForeignKey("centers.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    enrollments = Column(Integer, nullable=False, default=0)
+    visits = Column(Integer, nullable=False, default=0)
+    visits_submitted = Column(Integer, nullable=False, default=0)
+    visits_signed = Column(Integer, nullable=False, default=0)
+    visits_locked = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # 时间序列按日期区间查询全部中心
+        Index("ix_center_daily_stats_day", "day"),
+    )
+
+
+# 访视 CRF 区段（顺序即 section_mask 的位序，与录入页标签页一致）。
+# 共 11 个区段而非需求中的 9 个：录入页的问卷与生活方式各拆为独立标签页
+# （eq5d/dtsq/phq9/gad7、diet/exercise/meal），按标签页统计质控才能定位到具体缺失项。
+# 位序是对外契约：只能在末尾追加新区段，不得调整或删除已有位。
+CRF_SECTIONS = (
+    "basic", "comorbidity", "medication", "cost", "eq5d", "dtsq", "phq9", "gad7", "diet", "exercise", "meal",
+)
+
+
+class VisitCompleteness(Base):
+    """
+    各访视数据完整度：section_mask 第 i 位表示 CRF_SECTIONS[i] 已有数据，
+    <区段>_ratio 为该区段已填字段占比。由表单写入增量维护（见 app/services/completeness.py），
+    中心、访视类型冗余存储，质控汇总只需按 (center_id, visit_type) 一次分组查询。
+    """
+    __tablename__ = "visit_completeness"
+
+    visit_id = Column(Integer, ForeignKey("visits.id"), primary_key=True)
+    patient_id = Column(Integer, nullable=False)
+    center_id = Column(Integer, nullable=False)
+    visit_type = Column(String(10), nullable=False)
+    section_mask = Column(Integer, nullable=False, default=0)
+
+    basic_ratio = Column(Float, nullable=False, default=0)        # 体格检查 + 实验室检查
+    comorbidity_ratio = Column(Float, nullable=False, default=0)
+    medication_ratio = Column(Float, nullable=False, default=0)   # 有记录即为 1
+    cost_ratio = Column(Float, nullable=False, default=0)
+    eq5d_ratio = Column(Float, nullable=False, default=0)
+    dtsq_ratio = Column(Float, nullable=False, default=0)
+    phq9_ratio = Column(Float, nullable=False, default=0)
+    gad7_ratio = Column(Float, nullable=False, default=0)
+    diet_ratio = Column(Float, nullable=False, default=0)
+    exercise_ratio = Column(Float, nullable=False, default=0)
+    meal_ratio = Column(Float, nullable=False, default=0)         # 有记录即为 1
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_visit_completeness_center_type", "center_id", "visit_type"),
+        Index("ix_visit_completeness_patient_id", "patient_id"),
+    )
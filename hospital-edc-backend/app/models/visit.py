@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -19,6 +19,8 @@ class Visit(Base):
         default="draft"
     )
     created_by = Column(Integer)
+    # 访视及其表单的版本号：访视或任一表单写入时 +1，用于 ETag 与只读缓存
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
@@ -31,4 +33,11 @@ class Visit(Base):
     cost_indicators = relationship("CostIndicator", back_populates="visit", uselist=False)
     questionnaires = relationship("Questionnaire", back_populates="visit")
     lifestyle = relationship("LifestyleAssessment", back_populates="visit", uselist=False)
-    meal_records = relationship("MealRecord", back_populates="visit")
\ No newline at end of file
+    meal_records = relationship("MealRecord", back_populates="visit")
+
+    __table_args__ = (
+        # 患者访视列表（按日期排序）/ 同类型访视查重 / 按状态统计
+        Index("ix_visits_patient_date", "patient_id", "visit_date", "id"),
+        Index("ix_visits_patient_type", "patient_id", "visit_type"),
+        Index("ix_visits_status", "status"),
+    )
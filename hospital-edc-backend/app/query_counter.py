@@ -0,0 +1,82 @@
+"""
+按请求统计 SQL 语句数与数据库耗时，并检测疑似 N+1 查询。
+
+通过 SQLAlchemy engine 事件累计到当前请求的 ContextVar 中；
+main.py 中的中间件在响应头写入 X-DB-Queries / X-DB-Time-ms。
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 保存点等事务控制语句天然重复，不计入 N+1 检测
+_TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class NPlusOneQueryError(RuntimeError):
+    """DB_N_PLUS_ONE_RAISE 开启时，检测到疑似 N+1 查询抛出"""
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "elapsed", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0          # 秒
+        self.statements = Counter()  # SQL 文本 → 执行次数
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed * 1000
+
+    def repeated(self, threshold: int) -> list:
+        """同一语句（参数不同）执行次数达到阈值的 [(sql, 次数)]"""
+        return [
+            (sql, n) for sql, n in self.statements.most_common()
+            if n >= threshold and not sql.startswith(_TRANSACTION_STATEMENTS)
+        ]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def begin_request():
+    """开始统计当前请求，返回 (stats, token)；结束时调用 end_request(token)"""
+    stats = RequestQueryStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def install(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.elapsed += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+def check_n_plus_one(stats: RequestQueryStats, endpoint: str, threshold: int, fail: bool) -> None:
+    """threshold <= 0 表示关闭检测"""
+    if threshold <= 0:
+        return
+    repeated = stats.repeated(threshold)
+    for sql, n in repeated:
+        logger.warning("疑似 N+1 查询：%s 中同一语句执行 %d 次：%s", endpoint, n, " ".join(sql.split())[:300])
+    if repeated and fail:
+        raise NPlusOneQueryError(f"{endpoint} 中检测到疑似 N+1 查询（同一语句最多执行 {repeated[0][1]} 次）")
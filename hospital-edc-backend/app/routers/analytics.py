@@ -0,0 +1,172 @@
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dependencies import get_current_user, get_accessible_center_ids
+from app.models.lifestyle import LIFESTYLE_ITEM_COLUMNS, LifestyleAssessment
+from app.models.patient import Patient
+from app.models.stats import CRF_SECTIONS, VisitCompleteness
+from app.models.visit import Visit
+from app.services.completeness import SECTION_BITS, completeness_rollup
+from app.services.daily_stats import BUCKETS, daily_series
+from app.services.longitudinal import get_longitudinal
+
+router = APIRouter(prefix="/api/analytics", tags=["统计分析"])
+
+
+@router.get("/lifestyle-items")
+def lifestyle_item_stats(
+    center_id: Optional[int] = None,
+    visit_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """饮食/运动逐题统计（作答人数、均值、最小/最大值），全部在数据库内聚合"""
+    columns = [
+        getattr(LifestyleAssessment, col)
+        for items in LIFESTYLE_ITEM_COLUMNS.values() for col in items
+    ]
+    aggregates = [func.count(LifestyleAssessment.id)]
+    for col in columns:
+        aggregates += [func.count(col), func.avg(col), func.min(col), func.max(col)]
+
+    query = (
+        db.query(*aggregates)
+        .join(Visit, Visit.id == LifestyleAssessment.visit_id)
+        .join(Patient, Patient.id == Visit.patient_id)
+    )
+    accessible_centers = get_accessible_center_ids(current_user)
+    if accessible_centers is not None:
+        query = query.filter(Patient.center_id.in_(accessible_centers))
+    if center_id:
+        query = query.filter(Patient.center_id == center_id)
+    if visit_type:
+        query = query.filter(Visit.visit_type == visit_type)
+
+    row = query.one()
+    result = {"assessments": row[0]}
+    pos = 1
+    for kind, items in LIFESTYLE_ITEM_COLUMNS.items():
+        result[kind] = []
+        for i, _ in enumerate(items, start=1):
+            n, mean, low, high = row[pos:pos + 4]
+            pos += 4
+            result[kind].append({
+                "item": i,
+                "n": n,
+                "mean": round(float(mean), 2) if mean is not None else None,
+                "min": low,
+                "max": high,
+            })
+    return result
+
+
+@router.get("/longitudinal")
+def longitudinal_stats(
+    center_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    各中心及合计在 baseline → M24 各访视的指标均值、中位数、相对基线变化量与达标率。
+    结果在相关访视、表单或患者未变化时直接取缓存。
+    """
+    return get_longitudinal(db, _scoped_center_ids(current_user, center_id))
+
+
+def _scoped_center_ids(current_user, center_id: Optional[int]):
+    center_ids = get_accessible_center_ids(current_user)
+    if center_id:
+        if center_ids is not None and center_id not in center_ids:
+            raise HTTPException(403, "无权查看该中心数据")
+        center_ids = [center_id]
+    return center_ids
+
+
+@router.get("/completeness")
+def completeness_summary(
+    center_id: Optional[int] = None,
+    visit_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    质控看板：各中心 × 访视类型的 CRF 区段完整度汇总（读取完整度矩阵，一次分组查询）。
+
+    sections 为 11 个区段（basic、comorbidity、medication、cost、eq5d、dtsq、phq9、gad7、
+    diet、exercise、meal），顺序即 section_mask 的位序（第 i 位对应 sections[i]），
+    与录入页标签页一一对应；新增区段只会追加在末尾。
+    """
+    return {
+        "sections": list(CRF_SECTIONS),
+        "groups": completeness_rollup(db, _scoped_center_ids(current_user, center_id), visit_type),
+    }
+
+
+@router.get("/completeness/visits")
+def completeness_visits(
+    center_id: Optional[int] = None,
+    visit_type: Optional[str] = None,
+    missing: Optional[str] = Query(None, description="只返回该区段无数据的访视，如 phq9"),
+    after_id: int = Query(0, ge=0, description="游标分页：上一页返回的 next_after_id"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """完整度矩阵明细：每个访视各区段的填写率，按 visit_id 游标分页；section_mask 位序同 sections"""
+    if missing and missing not in SECTION_BITS:
+        raise HTTPException(400, f"未知的区段：{missing}")
+    vc = VisitCompleteness
+    query = (
+        db.query(vc, Patient.patient_code)
+        .join(Patient, Patient.id == vc.patient_id)
+        .filter(vc.visit_id > after_id)
+    )
+    center_ids = _scoped_center_ids(current_user, center_id)
+    if center_ids is not None:
+        query = query.filter(vc.center_id.in_(center_ids))
+    if visit_type:
+        query = query.filter(vc.visit_type == visit_type)
+    if missing:
+        query = query.filter(vc.section_mask.op("&")(SECTION_BITS[missing]) == 0)
+    rows = query.order_by(vc.visit_id).limit(limit).all()
+    return {
+        "sections": list(CRF_SECTIONS),
+        "items": [
+            {
+                "visit_id": r.visit_id,
+                "patient_id": r.patient_id,
+                "patient_code": code,
+                "center_id": r.center_id,
+                "visit_type": r.visit_type,
+                "section_mask": r.section_mask,
+                "ratios": {name: getattr(r, f"{name}_ratio") for name in CRF_SECTIONS},
+            }
+            for r, code in rows
+        ],
+        "next_after_id": rows[-1][0].visit_id if len(rows) == limit else None,
+    }
+
+
+@router.get("/timeseries")
+def progress_timeseries(
+    start: Optional[date] = Query(None, description="默认 end 前 52 周"),
+    end: Optional[date] = Query(None, description="默认今天"),
+    bucket: str = Query("week", description="day / week / month"),
+    center_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """各中心入组与访视进度（已提交/签名/锁定）时间序列，直接读取按日汇总表"""
+    if bucket not in BUCKETS:
+        raise HTTPException(400, f"未知的分桶：{bucket}")
+    end = end or date.today()
+    start = start or end - timedelta(weeks=52)
+    if start > end:
+        raise HTTPException(400, "开始日期不能晚于结束日期")
+    try:
+        return daily_series(db, start, end, bucket, _scoped_center_ids(current_user, center_id))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dependencies import get_accessible_center_ids, require_admin
+from app.services.change_log import changes_since
+
+router = APIRouter(prefix="/api/changes", tags=["变更订阅"])
+
+
+@router.get("/")
+def list_changes(
+    since: int = Query(0, ge=0, description="上次返回的 next；首次同步传 0"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """
+    按写入顺序返回 since 之后的变更（仅管理员，按可访问中心过滤）。
+    以返回的 next 作为下一次的 since 继续拉取，直到 has_more 为 false。
+    """
+    rows, next_since, has_more = changes_since(db, since, limit, get_accessible_center_ids(current_user))
+    return {
+        "changes": [
+            {
+                "id": r.id,
+                "table": r.table_name,
+                "op": r.op,
+                "center_id": r.center_id,
+                "patient_id": r.patient_id,
+                "visit_id": r.visit_id,
+                "changed_at": r.changed_at,
+            }
+            for r in rows
+        ],
+        "next": next_since,
+        "has_more": has_more,
+    }
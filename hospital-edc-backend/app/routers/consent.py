@@ -9,6 +9,8 @@ from app.models.consent import ConsentRecord
 from app.models.patient import Patient
 from app.schemas.consent import ConsentOut
 from app.dependencies import get_current_user
+from app.services.change_log import record_change
+from app.services.patient_summary import mark_consent
 from app.config import settings
 
 router = APIRouter(prefix="/api/consent", tags=["知情同意"])
@@ -50,7 +52,8 @@ async def save_consent(
     current_user=Depends(get_current_user),
 ):
     # 确认患者存在
-    if not db.query(Patient).filter(Patient.id == patient_id).first():
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    if not patient:
         raise HTTPException(404, "患者不存在")
 
     # 处理文件上传
@@ -92,9 +95,12 @@ async def save_consent(
         for k, v in fields.items():
             if v is not None:
                 setattr(record, k, v)
+        record_change(db, "consent_records", "update", patient.center_id, patient_id)
     else:
         record = ConsentRecord(patient_id=patient_id, **{k: v for k, v in fields.items() if v is not None})
         db.add(record)
+        record_change(db, "consent_records", "insert", patient.center_id, patient_id)
+    mark_consent(db, patient_id)
 
     db.commit()
     db.refresh(record)
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.dependencies import get_accessible_center_ids, get_current_user, require_main_admin
+from app.models.discrepancy import Discrepancy
+from app.models.patient import Patient
+from app.services.edit_checks import RULES, run_sweep
+
+router = APIRouter(prefix="/api/discrepancies", tags=["数据核查"])
+
+
+@router.get("/")
+def list_discrepancies(
+    center_id: Optional[int] = None,
+    status: Optional[str] = Query("open", pattern="^(open|resolved)$"),
+    rule_code: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    visit_id: Optional[int] = None,
+    after_id: int = Query(0, ge=0, description="游标分页：上一页返回的 next_after_id"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """数据疑问列表（按可访问中心过滤），按 id 游标分页"""
+    center_ids = get_accessible_center_ids(current_user)
+    if center_id:
+        if center_ids is not None and center_id not in center_ids:
+            raise HTTPException(403, "无权查看该中心数据")
+        center_ids = [center_id]
+    query = (
+        db.query(Discrepancy, Patient.patient_code)
+        .join(Patient, Patient.id == Discrepancy.patient_id)
+        .filter(Discrepancy.id > after_id)
+    )
+    if center_ids is not None:
+        query = query.filter(Discrepancy.center_id.in_(center_ids))
+    if status:
+        query = query.filter(Discrepancy.status == status)
+    if rule_code:
+        query = query.filter(Discrepancy.rule_code == rule_code)
+    if patient_id:
+        query = query.filter(Discrepancy.patient_id == patient_id)
+    if visit_id:
+        query = query.filter(Discrepancy.visit_id == visit_id)
+    rows = query.order_by(Discrepancy.id).limit(limit).all()
+    return {
+        "items": [
+            {
+                "id": d.id,
+                "visit_id": d.visit_id,
+                "patient_id": d.patient_id,
+                "patient_code": code,
+                "center_id": d.center_id,
+                "rule_code": d.rule_code,
+                "field": d.field,
+                "value": d.value,
+                "message": d.message,
+                "status": d.status,
+                "detected_at": d.detected_at,
+                "resolved_at": d.resolved_at,
+            }
+            for d, code in rows
+        ],
+        "next_after_id": rows[-1][0].id if len(rows) == limit else None,
+    }
+
+
+@router.get("/rules")
+def list_rules(current_user=Depends(get_current_user)):
+    """当前生效的核查规则"""
+    return [{"code": r.code, "field": r.field, "message": r.message} for r in RULES]
+
+
+@router.post("/sweep")
+def sweep(
+    full: bool = Query(False, description="核查全部患者；默认只核查上次核查以来有变更的患者"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_main_admin),
+):
+    """运行数据核查（仅总管理员）。大库全量核查建议用 scripts/run_edit_checks.py"""
+    return run_sweep(db, full=full)
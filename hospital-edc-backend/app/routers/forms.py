@@ -1,21 +1,32 @@
 ﻿import json
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from functools import lru_cache
+from typing import List, Optional
+from operator import attrgetter
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.database import get_db
 from app.models.visit import Visit
+from app.models.patient import Patient
 from app.models.forms import PhysicalExam, LabResults, Comorbidity, CostIndicator
 from app.models.medication import Medication
 from app.models.questionnaire import Questionnaire
-from app.models.lifestyle import LifestyleAssessment, MealRecord
+from app.models.lifestyle import LIFESTYLE_ITEM_COLUMNS, LifestyleAssessment, MealRecord
 from app.schemas.forms import (
     PhysicalExamIn, LabResultsIn, ComorbidityIn, CostIndicatorIn,
-    MedicationBatchIn, QuestionnaireIn, LifestyleIn, MealRecordBatchIn,
+    MedicationIn, MedicationBatchIn, QuestionnaireIn, LifestyleIn,
+    MealRecordIn, MealRecordBatchIn, AllFormsIn,
 )
 from app.dependencies import get_current_user
-from app.services.scoring import (
-    calc_phq9_level, calc_gad7_level,
-    calc_diet_level, calc_exercise_level,
-)
+from app.etag import etag_headers, visit_etag, visit_tag
+from app.services.upsert import upsert_row
+from app.services.row_sync import sync_visit_rows
+from app.services.visit_cache import FROZEN_STATUSES, visit_forms_cache
+from app.services.visit_events import forms_changed
+from app.services.scoring import QUESTION_COUNTS, band_label, items_total, parse_scores_json, questionnaire_total
+from app.services.eq5d import DIMENSION_COLUMNS, eq5d_index, eq5d_index_sql
+from app.services.derived import calc_egfr, derive_physical_exam, physical_exam_update
 
 router = APIRouter(prefix="/api/visits", tags=["表单录入"])
 
@@ -30,27 +41,27 @@ def _get_unlocked_visit(visit_id: int, db: Session) -> Visit:
     return visit
 
 
-def _upsert(db: Session, model_cls, filter_kwargs: dict, data: dict):
-    obj = db.query(model_cls).filter_by(**filter_kwargs).first()
-    if obj:
-        for k, v in data.items():
-            setattr(obj, k, v)
-    else:
-        obj = model_cls(**filter_kwargs, **data)
-        db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return obj
+def _upsert(db: Session, model_cls, filter_kwargs: dict, data: dict, derived=None):
+    """单行表单写入：一条原生 upsert 语句（调用方负责 commit）"""
+    upsert_row(db, model_cls, filter_kwargs, data, derived)
+
+
+@lru_cache(maxsize=None)
+def _columns(model_cls):
+    """每个 Model 的列名与取值器只构建一次"""
+    names = tuple(c.name for c in model_cls.__table__.columns)
+    return names, attrgetter(*names)
 
 
 def _to_dict(obj):
     if obj is None:
         return None
-    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+    names, getter = _columns(type(obj))
+    return dict(zip(names, getter(obj)))
 
 
 #  体格检查 
-@router.get("/{visit_id}/physical-exam")
+@router.get("/{visit_id}/physical-exam", dependencies=[Depends(visit_etag)])
 def get_physical_exam(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(PhysicalExam).filter(PhysicalExam.visit_id == visit_id).first()
     if not obj:
@@ -58,21 +69,49 @@ def get_physical_exam(visit_id: int, db: Session = Depends(get_db), current_user
     return _to_dict(obj)
 
 
+def _save_physical_exam(db: Session, visit_id: int, data: PhysicalExamIn) -> dict:
+    payload = data.model_dump(exclude_unset=True)
+    # 插入分支的派生值直接由本次提交计算；部分更新时由语句内合并旧值重算，响应回读库中结果
+    derived = derive_physical_exam(payload)
+    payload.update(derived)
+    _upsert(db, PhysicalExam, {"visit_id": visit_id}, payload, derived=physical_exam_update)
+    row = (
+        db.query(PhysicalExam.bmi, PhysicalExam.whr, PhysicalExam.bp_grade)
+        .filter(PhysicalExam.visit_id == visit_id)
+        .one()
+    )
+    return dict(row._mapping)
+
+
+def _save_lab_results(db: Session, visit_id: int, data: LabResultsIn) -> dict:
+    payload = data.model_dump(exclude_unset=True)
+    # 提交了肌酐时按患者年龄、性别计算 eGFR；信息不全则保留手工录入值
+    if payload.get("scr") is not None:
+        patient = (
+            db.query(Patient.age, Patient.gender)
+            .join(Visit, Visit.patient_id == Patient.id)
+            .filter(Visit.id == visit_id)
+            .first()
+        )
+        egfr = calc_egfr(payload["scr"], patient.age, patient.gender) if patient else None
+        if egfr is not None:
+            payload["egfr"] = egfr
+    _upsert(db, LabResults, {"visit_id": visit_id}, payload)
+    egfr = db.query(LabResults.egfr).filter(LabResults.visit_id == visit_id).scalar()
+    return {"egfr": egfr}
+
+
 @router.post("/{visit_id}/physical-exam")
 def save_physical_exam(visit_id: int, data: PhysicalExamIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
-    payload = data.model_dump(exclude_unset=True)
-    existing = db.query(PhysicalExam).filter_by(visit_id=visit_id).first()
-    h_cm = payload.get("height_cm") or (existing.height_cm if existing else None)
-    w_kg = payload.get("weight_kg") or (existing.weight_kg if existing else None)
-    if h_cm and w_kg:
-        payload["bmi"] = round(w_kg / ((h_cm / 100) ** 2), 1)
-    _upsert(db, PhysicalExam, {"visit_id": visit_id}, payload)
-    return {"message": "体格检查保存成功", "bmi": payload.get("bmi")}
+    result = _save_physical_exam(db, visit_id, data)
+    forms_changed(db, visit_id, PhysicalExam)
+    db.commit()
+    return {"message": "体格检查保存成功", **result}
 
 
 #  实验室检查 
-@router.get("/{visit_id}/lab-results")
+@router.get("/{visit_id}/lab-results", dependencies=[Depends(visit_etag)])
 def get_lab_results(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(LabResults).filter(LabResults.visit_id == visit_id).first()
     if not obj:
@@ -83,12 +122,14 @@ def get_lab_results(visit_id: int, db: Session = Depends(get_db), current_user=D
 @router.post("/{visit_id}/lab-results")
 def save_lab_results(visit_id: int, data: LabResultsIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
-    _upsert(db, LabResults, {"visit_id": visit_id}, data.model_dump(exclude_unset=True))
-    return {"message": "实验室检查保存成功"}
+    result = _save_lab_results(db, visit_id, data)
+    forms_changed(db, visit_id, LabResults)
+    db.commit()
+    return {"message": "实验室检查保存成功", **result}
 
 
 #  合并症 
-@router.get("/{visit_id}/comorbidity")
+@router.get("/{visit_id}/comorbidity", dependencies=[Depends(visit_etag)])
 def get_comorbidity(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(Comorbidity).filter(Comorbidity.visit_id == visit_id).first()
     if not obj:
@@ -100,11 +141,13 @@ def get_comorbidity(visit_id: int, db: Session = Depends(get_db), current_user=D
 def save_comorbidity(visit_id: int, data: ComorbidityIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
     _upsert(db, Comorbidity, {"visit_id": visit_id}, data.model_dump(exclude_unset=True))
+    forms_changed(db, visit_id, Comorbidity)
+    db.commit()
     return {"message": "合并症保存成功"}
 
 
 #  核心指标（费用）
-@router.get("/{visit_id}/cost-indicators")
+@router.get("/{visit_id}/cost-indicators", dependencies=[Depends(visit_etag)])
 def get_cost_indicators(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(CostIndicator).filter(CostIndicator.visit_id == visit_id).first()
     if not obj:
@@ -116,27 +159,33 @@ def get_cost_indicators(visit_id: int, db: Session = Depends(get_db), current_us
 def save_cost_indicators(visit_id: int, data: CostIndicatorIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
     _upsert(db, CostIndicator, {"visit_id": visit_id}, data.model_dump(exclude_unset=True))
+    forms_changed(db, visit_id, CostIndicator)
+    db.commit()
     return {"message": "费用数据保存成功"}
 
 
 #  药物治疗（批量）
-@router.get("/{visit_id}/medications")
+@router.get("/{visit_id}/medications", dependencies=[Depends(visit_etag)])
 def get_medications(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return [_to_dict(m) for m in db.query(Medication).filter(Medication.visit_id == visit_id).all()]
 
 
+def _save_medications(db: Session, visit_id: int, medications: List[MedicationIn]) -> dict:
+    changes = sync_visit_rows(db, Medication, visit_id, [m.model_dump() for m in medications])
+    return {"count": len(medications), **changes}
+
+
 @router.post("/{visit_id}/medications")
 def save_medications(visit_id: int, data: MedicationBatchIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
-    db.query(Medication).filter(Medication.visit_id == visit_id).delete()
-    for med in data.medications:
-        db.add(Medication(visit_id=visit_id, **med.model_dump(exclude_unset=True)))
+    result = _save_medications(db, visit_id, data.medications)
+    forms_changed(db, visit_id, Medication)
     db.commit()
-    return {"message": f"药物记录保存成功，共 {len(data.medications)} 条"}
+    return {"message": f"药物记录保存成功，共 {len(data.medications)} 条", **result}
 
 
 #  问卷（PHQ-9 / GAD-7 / EQ-5D / DTSQ）
-@router.get("/{visit_id}/questionnaire/{q_type}")
+@router.get("/{visit_id}/questionnaire/{q_type}", dependencies=[Depends(visit_etag)])
 def get_questionnaire(visit_id: int, q_type: str, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(Questionnaire).filter_by(visit_id=visit_id, questionnaire_type=q_type).first()
     if not obj:
@@ -144,35 +193,52 @@ def get_questionnaire(visit_id: int, q_type: str, db: Session = Depends(get_db),
     return _to_dict(obj)
 
 
+def _questionnaire_update(q_type: str):
+    """upsert 更新分支：总分、效用值按合并后的题目/维度在同一语句内重算"""
+    def derived(merged) -> dict:
+        updates = {}
+        count = QUESTION_COUNTS.get(q_type)
+        if count:
+            updates["total_score"] = sum(func.coalesce(merged(f"q{i}"), 0) for i in range(1, count + 1))
+        if q_type == "eq5d":
+            updates["eq5d_index"] = eq5d_index_sql([merged(c) for c in DIMENSION_COLUMNS])
+        return updates
+    return derived
+
+
+def _save_questionnaire(db: Session, visit_id: int, data: QuestionnaireIn) -> dict:
+    payload = data.model_dump(exclude_unset=True)
+    q_type = data.questionnaire_type
+    # 插入分支由本次提交计算；部分更新时由语句内合并旧值重算，响应回读库中结果
+    total = questionnaire_total(q_type, payload)
+    if total is not None:
+        payload["total_score"] = total
+    if q_type == "eq5d":
+        payload["eq5d_index"] = eq5d_index([payload.get(c) for c in DIMENSION_COLUMNS])
+    payload.pop("questionnaire_type", None)
+    key = {"visit_id": visit_id, "questionnaire_type": q_type}
+    _upsert(db, Questionnaire, key, payload, derived=_questionnaire_update(q_type))
+    total, index = (
+        db.query(Questionnaire.total_score, Questionnaire.eq5d_index).filter_by(**key).one()
+    )
+    if q_type == "eq5d":
+        return {"eq5d_index": index}
+    if total is None:
+        return {}
+    return {"total_score": total, "level": band_label(q_type, total)}
+
+
 @router.post("/{visit_id}/questionnaire")
 def save_questionnaire(visit_id: int, data: QuestionnaireIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
-    payload = data.model_dump(exclude_unset=True)
-    q_type = data.questionnaire_type
-    if q_type == "phq9":
-        payload["total_score"] = sum(payload.get(f"q{i}", 0) or 0 for i in range(1, 10))
-    elif q_type == "gad7":
-        payload["total_score"] = sum(payload.get(f"q{i}", 0) or 0 for i in range(1, 8))
-    obj = db.query(Questionnaire).filter_by(visit_id=visit_id, questionnaire_type=q_type).first()
-    if obj:
-        for k, v in payload.items():
-            setattr(obj, k, v)
-    else:
-        obj = Questionnaire(visit_id=visit_id, **payload)
-        db.add(obj)
+    result = _save_questionnaire(db, visit_id, data)
+    forms_changed(db, visit_id, Questionnaire)
     db.commit()
-    result = {"message": f"{q_type} 保存成功"}
-    if q_type == "phq9":
-        result["total_score"] = payload["total_score"]
-        result["level"] = calc_phq9_level(int(payload["total_score"]))
-    elif q_type == "gad7":
-        result["total_score"] = payload["total_score"]
-        result["level"] = calc_gad7_level(int(payload["total_score"]))
-    return result
+    return {"message": f"{data.questionnaire_type} 保存成功", **result}
 
 
 #  生活方式评估 
-@router.get("/{visit_id}/lifestyle")
+@router.get("/{visit_id}/lifestyle", dependencies=[Depends(visit_etag)])
 def get_lifestyle(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     obj = db.query(LifestyleAssessment).filter(LifestyleAssessment.visit_id == visit_id).first()
     if not obj:
@@ -180,23 +246,28 @@ def get_lifestyle(visit_id: int, db: Session = Depends(get_db), current_user=Dep
     return _to_dict(obj)
 
 
-@router.post("/{visit_id}/lifestyle")
-def save_lifestyle(visit_id: int, data: LifestyleIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    _get_unlocked_visit(visit_id, db)
+def _save_lifestyle(db: Session, visit_id: int, data: LifestyleIn) -> dict:
     payload = data.model_dump(exclude_unset=True)
-    if "diet_scores_json" in payload:
-        scores = json.loads(payload["diet_scores_json"])
-        total = sum(scores) if isinstance(scores, list) else sum(scores.values())
-        payload["diet_total"] = total
-        payload["diet_level"] = calc_diet_level(total)
-    if "exercise_scores_json" in payload:
-        scores = json.loads(payload["exercise_scores_json"])
-        total = sum(scores) if isinstance(scores, list) else sum(scores.values())
-        payload["exercise_total"] = total
-        payload["exercise_level"] = calc_exercise_level(total)
+    for kind, columns in LIFESTYLE_ITEM_COLUMNS.items():
+        provided = f"{kind}_scores" in payload or f"{kind}_scores_json" in payload
+        scores = payload.pop(f"{kind}_scores", None)
+        raw = payload.pop(f"{kind}_scores_json", None)
+        if not provided:
+            continue
+        if scores is None:
+            try:
+                scores = parse_scores_json(raw)
+            except (ValueError, TypeError, AttributeError):
+                raise HTTPException(400, f"{kind}_scores_json 格式错误")
+        if len(scores) > len(columns):
+            raise HTTPException(400, f"{kind} 最多 {len(columns)} 题")
+        items = list(scores) + [None] * (len(columns) - len(scores))
+        payload.update(zip(columns, items))
+        total = items_total(items) if any(s is not None for s in items) else None
+        payload[f"{kind}_total"] = total
+        payload[f"{kind}_level"] = band_label(kind, total) if total is not None else None
     _upsert(db, LifestyleAssessment, {"visit_id": visit_id}, payload)
     return {
-        "message": "生活方式评估保存成功",
         "diet_total": payload.get("diet_total"),
         "diet_level": payload.get("diet_level"),
         "exercise_total": payload.get("exercise_total"),
@@ -204,24 +275,37 @@ def save_lifestyle(visit_id: int, data: LifestyleIn, db: Session = Depends(get_d
     }
 
 
+@router.post("/{visit_id}/lifestyle")
+def save_lifestyle(visit_id: int, data: LifestyleIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    _get_unlocked_visit(visit_id, db)
+    result = _save_lifestyle(db, visit_id, data)
+    forms_changed(db, visit_id, LifestyleAssessment)
+    db.commit()
+    return {"message": "生活方式评估保存成功", **result}
+
+
 #  膳食记录（批量）
-@router.get("/{visit_id}/meal-records")
+@router.get("/{visit_id}/meal-records", dependencies=[Depends(visit_etag)])
 def get_meal_records(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return [_to_dict(r) for r in db.query(MealRecord).filter(MealRecord.visit_id == visit_id).all()]
 
 
+def _save_meal_records(db: Session, visit_id: int, records: List[MealRecordIn]) -> dict:
+    changes = sync_visit_rows(db, MealRecord, visit_id, [r.model_dump() for r in records])
+    return {"count": len(records), **changes}
+
+
 @router.post("/{visit_id}/meal-records")
 def save_meal_records(visit_id: int, data: MealRecordBatchIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     _get_unlocked_visit(visit_id, db)
-    db.query(MealRecord).filter(MealRecord.visit_id == visit_id).delete()
-    for rec in data.records:
-        db.add(MealRecord(visit_id=visit_id, **rec.model_dump(exclude_unset=True)))
+    result = _save_meal_records(db, visit_id, data.records)
+    forms_changed(db, visit_id, MealRecord)
     db.commit()
-    return {"message": f"膳食记录保存成功，共 {len(data.records)} 条"}
+    return {"message": f"膳食记录保存成功，共 {len(data.records)} 条", **result}
 
 
 # /meals 是 /meal-records 的别名，与 API 表格对齐
-@router.get("/{visit_id}/meals")
+@router.get("/{visit_id}/meals", dependencies=[Depends(visit_etag)])
 def get_meals(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return get_meal_records(visit_id, db, current_user)
 
@@ -232,22 +316,98 @@ def save_meals(visit_id: int, data: MealRecordBatchIn, db: Session = Depends(get
 
 
 #  一次性获取全部表单数据 
+# 单行表单与问卷（每访视至多 4 份）随访视一起 JOIN 取回；药物、膳食各一条 IN 查询
+_ALL_FORMS_OPTIONS = (
+    joinedload(Visit.physical_exam),
+    joinedload(Visit.lab_results),
+    joinedload(Visit.comorbidities),
+    joinedload(Visit.cost_indicators),
+    joinedload(Visit.lifestyle),
+    joinedload(Visit.questionnaires),
+    selectinload(Visit.medications),
+    selectinload(Visit.meal_records),
+)
+
+
 @router.get("/{visit_id}/all-forms")
-def get_all_forms(visit_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    visit = db.query(Visit).filter(Visit.id == visit_id).first()
+def get_all_forms(
+    visit_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    version: Optional[int] = Depends(visit_etag),
+):
+    # 已签名/锁定访视命中缓存时直接返回序列化好的 JSON，不再查表单
+    if version is not None:
+        body = visit_forms_cache.get(visit_id, version)
+        if body is not None:
+            return _json_response(body, visit_id, version)
+    visit = (
+        db.query(Visit)
+        .options(*_ALL_FORMS_OPTIONS)
+        .filter(Visit.id == visit_id)
+        .one_or_none()
+    )
     if not visit:
         raise HTTPException(404, "访视不存在")
-    return {
+    payload = {
         "visit": _to_dict(visit),
-        "physical_exam": _to_dict(db.query(PhysicalExam).filter_by(visit_id=visit_id).first()),
-        "lab_results": _to_dict(db.query(LabResults).filter_by(visit_id=visit_id).first()),
-        "comorbidity": _to_dict(db.query(Comorbidity).filter_by(visit_id=visit_id).first()),
-        "cost_indicators": _to_dict(db.query(CostIndicator).filter_by(visit_id=visit_id).first()),
-        "medications": [_to_dict(m) for m in db.query(Medication).filter_by(visit_id=visit_id).all()],
-        "questionnaires": {
-            q.questionnaire_type: _to_dict(q)
-            for q in db.query(Questionnaire).filter_by(visit_id=visit_id).all()
-        },
-        "lifestyle": _to_dict(db.query(LifestyleAssessment).filter_by(visit_id=visit_id).first()),
-        "meal_records": [_to_dict(r) for r in db.query(MealRecord).filter_by(visit_id=visit_id).all()],
-    }
\ No newline at end of file
+        "physical_exam": _to_dict(visit.physical_exam),
+        "lab_results": _to_dict(visit.lab_results),
+        "comorbidity": _to_dict(visit.comorbidities),
+        "cost_indicators": _to_dict(visit.cost_indicators),
+        "medications": [_to_dict(m) for m in visit.medications],
+        "questionnaires": {q.questionnaire_type: _to_dict(q) for q in visit.questionnaires},
+        "lifestyle": _to_dict(visit.lifestyle),
+        "meal_records": [_to_dict(r) for r in visit.meal_records],
+    }
+    if visit.status not in FROZEN_STATUSES:
+        return payload
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode()
+    visit_forms_cache.put(visit.id, visit.version, visit.status, body)
+    return _json_response(body, visit.id, visit.version)
+
+
+def _json_response(body: bytes, visit_id: int, version: int) -> Response:
+    return Response(body, media_type="application/json", headers=etag_headers(visit_tag(visit_id, version)))
+
+
+#  一次性保存全部表单（单一事务）
+@router.post("/{visit_id}/all-forms")
+def save_all_forms(visit_id: int, data: AllFormsIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """只保存请求中出现的部分；锁定检查一次，全部写入在同一事务内提交"""
+    _get_unlocked_visit(visit_id, db)
+    results = {}
+    saved = []
+    if data.physical_exam is not None:
+        results["physical_exam"] = _save_physical_exam(db, visit_id, data.physical_exam)
+        saved.append(PhysicalExam)
+    if data.lab_results is not None:
+        results["lab_results"] = _save_lab_results(db, visit_id, data.lab_results)
+        saved.append(LabResults)
+    if data.comorbidity is not None:
+        _upsert(db, Comorbidity, {"visit_id": visit_id}, data.comorbidity.model_dump(exclude_unset=True))
+        results["comorbidity"] = {}
+        saved.append(Comorbidity)
+    if data.cost_indicators is not None:
+        _upsert(db, CostIndicator, {"visit_id": visit_id}, data.cost_indicators.model_dump(exclude_unset=True))
+        results["cost_indicators"] = {}
+        saved.append(CostIndicator)
+    if data.medications is not None:
+        results["medications"] = _save_medications(db, visit_id, data.medications)
+        saved.append(Medication)
+    if data.questionnaires is not None:
+        # 同类型问卷重复提交时以最后一份为准
+        by_type = {q.questionnaire_type: q for q in data.questionnaires}
+        results["questionnaires"] = {
+            q_type: _save_questionnaire(db, visit_id, q) for q_type, q in by_type.items()
+        }
+        saved.append(Questionnaire)
+    if data.lifestyle is not None:
+        results["lifestyle"] = _save_lifestyle(db, visit_id, data.lifestyle)
+        saved.append(LifestyleAssessment)
+    if data.meal_records is not None:
+        results["meal_records"] = _save_meal_records(db, visit_id, data.meal_records)
+        saved.append(MealRecord)
+    forms_changed(db, visit_id, *saved)
+    db.commit()
+    return {"message": "表单保存成功", "results": results}
@@ -1,21 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from sqlalchemy import exists
+from sqlalchemy import func
 from typing import Optional, List
 from app.database import get_db
+from app.models.center import Center
 from app.models.patient import Patient
 from app.models.visit import Visit
-from app.models.consent import ConsentRecord
 from app.schemas.patient import PatientCreate, PatientUpdate, PatientOut
-from app.dependencies import get_current_user, get_accessible_center_ids
+from app.dependencies import get_current_user, get_accessible_center_ids, require_admin
+from app.etag import patient_etag
+from app.services.change_log import record_change
+from app.services.daily_stats import bump_enrollments, move_enrollment, move_patient_visits
+from app.services.completeness import move_patient_completeness
+from app.services.derived import recompute_lab_results
+from app.services.edit_checks import move_patient_discrepancies
+from app.services.patient_codes import allocate_patient_codes
+from app.services.patient_import import import_patients, parse_patient_file
+from app.services.patient_search import index_patient, search_filter
+from app.services.stats import bump_patient_status, get_center_stats, invalidate_centers
+from app.services.visit_events import visit_changed
 
 router = APIRouter(prefix="/api/patients", tags=["患者管理"])
 
 
+def _encode_cursor(last_id: int) -> str:
+    """分页游标：对外不透明，内部为最后一条记录的 id"""
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "无效的分页游标")
+
+
 @router.get("/", response_model=dict)
 def list_patients(
-    skip: int = 0,
-    limit: int = 20,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    after_id: Optional[int] = Query(None, description="游标分页：返回 id 小于该值的记录"),
+    cursor: Optional[str] = Query(None, description="游标分页：上一页返回的 next_cursor"),
+    include_total: bool = Query(True, description="是否统计总数；翻页时传 false 可省去全表 COUNT"),
     search: Optional[str] = Query(None, description="按患者编号或姓名首字母搜索"),
     status: Optional[str] = Query(None, description="enrolled | withdrawn | completed"),
     db: Session = Depends(get_db),
@@ -24,53 +53,40 @@ def list_patients(
     # 获取用户可访问的中心ID列表
     accessible_centers = get_accessible_center_ids(current_user)
 
-    latest_status_sq = (
-        db.query(Visit.status)
-        .filter(Visit.patient_id == Patient.id)
-        .order_by(Visit.visit_date.desc(), Visit.id.desc())
-        .limit(1)
-        .scalar_subquery()
-    )
-    has_submitted_sq = (
-        db.query(Visit.id)
-        .filter(Visit.patient_id == Patient.id, Visit.status != "draft")
-        .exists()
-    )
-
-    has_consent_sq = (
-        db.query(ConsentRecord.id)
-        .filter(ConsentRecord.patient_id == Patient.id)
-        .exists()
-    )
-
-    query = db.query(
-        Patient,
-        has_submitted_sq.label("has_submitted"),
-        has_consent_sq.label("has_consent"),
-        latest_status_sq.label("latest_visit_status"),
-    )
-
+    filters = []
     # 根据用户权限过滤中心
     if accessible_centers is not None:
-        query = query.filter(Patient.center_id.in_(accessible_centers))
+        filters.append(Patient.center_id.in_(accessible_centers))
 
     if search:
-        query = query.filter(
-            Patient.patient_code.contains(search)
-            | Patient.name_initials.contains(search)
-        )
+        filters.append(search_filter(search))
     if status:
-        query = query.filter(Patient.status == status)
-    total = query.count()
-    rows = query.order_by(Patient.id.desc()).offset(skip).limit(limit).all()
-    items = []
-    for p, has_submitted, has_consent, latest_visit_status in rows:
-        d = PatientOut.model_validate(p).model_dump()
-        d["has_submitted"] = bool(has_submitted)
-        d["has_consent"] = bool(has_consent)
-        d["latest_visit_status"] = latest_visit_status
-        items.append(d)
-    return {"total": total, "items": items}
+        filters.append(Patient.status == status)
+
+    total = None
+    if include_total and not search and status in (None, "enrolled"):
+        # 无搜索条件时直接取中心计数缓存
+        cached = get_center_stats(db, accessible_centers)
+        total = cached["enrolled"] if status else cached["total_patients"]
+    elif include_total:
+        total = db.query(func.count(Patient.id)).filter(*filters).scalar()
+
+    # 录入状态已冗余在 patients 表上，每行只读一条记录
+    query = db.query(Patient).filter(*filters).order_by(Patient.id.desc())
+
+    # 游标分页：按主键定位，代价与页深无关
+    if cursor:
+        after_id = _decode_cursor(cursor)
+    if after_id is not None:
+        query = query.filter(Patient.id < after_id)
+    else:
+        query = query.offset(skip)
+
+    # 多取一条用于判断是否还有下一页
+    rows = query.limit(limit + 1).all()
+    next_cursor = _encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    items = [PatientOut.model_validate(p).model_dump() for p in rows[:limit]]
+    return {"total": total, "items": items, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=PatientOut)
@@ -90,54 +106,71 @@ def create_patient(
     if accessible_centers is not None and center_id not in accessible_centers:
         raise HTTPException(403, "无权在该中心创建患者")
 
-    # 自动生成患者编号：取当前最大 id+1
-    last = db.query(Patient).order_by(Patient.id.desc()).first()
-    next_num = (last.id + 1) if last else 1
-    code = f"{data.center_code}-{next_num:03d}"
+    # 未给出编号前缀（center_code 为 null 或空）时取所属中心的中心编号
+    center_code = data.center_code or db.query(Center.center_code).filter(Center.id == center_id).scalar()
+    if not center_code:
+        raise HTTPException(400, "所属中心不存在")
+
+    # 自动生成患者编号：按中心编号前缀从序列表原子分配
+    code = allocate_patient_codes(db, center_code)[0]
 
     patient = Patient(
         **data.model_dump(exclude={"center_code", "center_id"}),
         patient_code=code,
-        center_code=data.center_code,
+        center_code=center_code,
         center_id=center_id,
         created_by=current_user.id,
     )
     db.add(patient)
+    db.flush()
+    index_patient(db, patient)
+    bump_patient_status(db, center_id, None, "enrolled")
+    bump_enrollments(db, [(center_id, patient.enrollment_date, 1)])
+    record_change(db, "patients", "insert", center_id, patient.id)
     db.commit()
     db.refresh(patient)
     return patient
 
 
+@router.post("/import")
+def import_patient_file(
+    file: UploadFile = File(..., description="CSV（首行为字段名）或 JSON 数组"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin),
+):
+    """批量导入患者（历史队列迁移用），返回逐行错误报告"""
+    # 同步端点：FastAPI 在线程池中执行，大批量写入不阻塞事件循环
+    try:
+        rows = parse_patient_file(file.filename or "", file.file.read())
+    except (ValueError, KeyError, UnicodeDecodeError):
+        raise HTTPException(400, "文件格式无法解析，请上传 UTF-8 编码的 CSV 或 JSON")
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        raise HTTPException(400, "JSON 须为患者对象数组")
+    return import_patients(
+        db,
+        rows,
+        default_center_id=current_user.center_id,
+        created_by=current_user.id,
+        accessible_centers=get_accessible_center_ids(current_user),
+    )
+
+
 @router.get("/stats")
 def get_stats(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    """首页概况统计"""
+    """首页概况统计（读取各中心计数缓存）"""
     accessible_centers = get_accessible_center_ids(current_user)
-
-    # 基础查询
-    patient_query = db.query(Patient)
-    if accessible_centers is not None:
-        patient_query = patient_query.filter(Patient.center_id.in_(accessible_centers))
-
-    total = patient_query.count()
-    enrolled = patient_query.filter(Patient.status == "enrolled").count()
+    stats = get_center_stats(db, accessible_centers)
 
     # draft 访视 = 待录入；submitted = 待签名
-    visit_query = db.query(Visit).join(Patient)
-    if accessible_centers is not None:
-        visit_query = visit_query.filter(Patient.center_id.in_(accessible_centers))
-
-    pending_entry = visit_query.filter(Visit.status == "draft").count()
-    pending_sign = visit_query.filter(Visit.status == "submitted").count()
-
     return {
-        "total_patients": total,
-        "enrolled": enrolled,
-        "pending_entry": pending_entry,
-        "pending_sign": pending_sign,
+        "total_patients": stats["total_patients"],
+        "enrolled": stats["enrolled"],
+        "pending_entry": stats["visits_draft"],
+        "pending_sign": stats["visits_submitted"],
     }
 
 
-@router.get("/{patient_id}", response_model=PatientOut)
+@router.get("/{patient_id}", response_model=PatientOut, dependencies=[Depends(patient_etag)])
 def get_patient(
     patient_id: int,
     db: Session = Depends(get_db),
@@ -152,24 +185,7 @@ def get_patient(
     if accessible_centers is not None and patient.center_id not in accessible_centers:
         raise HTTPException(403, "无权访问该患者")
 
-    has_submitted = (
-        db.query(exists().where(Visit.patient_id == patient_id).where(Visit.status != "draft"))
-        .scalar()
-    )
-    has_consent = (
-        db.query(exists().where(ConsentRecord.patient_id == patient_id)).scalar()
-    )
-    latest = (
-        db.query(Visit.status)
-        .filter(Visit.patient_id == patient_id)
-        .order_by(Visit.visit_date.desc(), Visit.id.desc())
-        .first()
-    )
-    out = PatientOut.model_validate(patient).model_dump()
-    out["has_submitted"] = bool(has_submitted)
-    out["has_consent"] = bool(has_consent)
-    out["latest_visit_status"] = latest[0] if latest else None
-    return out
+    return patient
 
 
 @router.put("/{patient_id}", response_model=PatientOut)
@@ -182,8 +198,29 @@ def update_patient(
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(404, "患者不存在")
+    old_center_id = patient.center_id
+    old_initials = patient.name_initials
+    old_age, old_gender = patient.age, patient.gender
+    old_enrollment_date = patient.enrollment_date
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(patient, key, value)
+    if patient.name_initials != old_initials:
+        index_patient(db, patient)
+    if patient.center_id != old_center_id:
+        # 转中心涉及该患者全部访视，两个中心的计数缓存直接失效重建
+        invalidate_centers(db, [old_center_id, patient.center_id])
+        move_patient_completeness(db, patient_id, patient.center_id)
+        move_patient_discrepancies(db, patient_id, patient.center_id)
+        move_patient_visits(db, patient_id, old_center_id, patient.center_id)
+        # 原中心的订阅方也需得知该患者已移出
+        record_change(db, "patients", "update", old_center_id, patient_id)
+    if (patient.center_id, patient.enrollment_date) != (old_center_id, old_enrollment_date):
+        move_enrollment(db, old_center_id, old_enrollment_date, patient.center_id, patient.enrollment_date)
+    if (patient.age, patient.gender) != (old_age, old_gender):
+        # eGFR 依赖年龄与性别，随之重算该患者各访视的化验结果（已签名/锁定的访视保持不变）
+        recompute_lab_results(db, patient_id=patient_id)
+    record_change(db, "patients", "update", patient.center_id, patient_id)
+    patient.version = Patient.version + 1
     db.commit()
     db.refresh(patient)
     return patient
@@ -198,7 +235,11 @@ def delete_patient(
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(404, "患者不存在")
+    old_status = patient.status
     patient.status = "withdrawn"
+    patient.version = Patient.version + 1
+    bump_patient_status(db, patient.center_id, old_status, "withdrawn")
+    record_change(db, "patients", "update", patient.center_id, patient_id)
     db.commit()
     return {"message": "患者已标记为退出"}
 
@@ -252,6 +293,7 @@ def create_patient_visit(
         created_by=current_user.id,
     )
     db.add(visit)
+    visit_changed(db, visit, None, "draft")
     db.commit()
     db.refresh(visit)
     return visit
\ No newline at end of file
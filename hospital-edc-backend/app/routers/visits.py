@@ -6,6 +6,7 @@ from app.models.visit import Visit
 from app.models.patient import Patient
 from app.schemas.visit import VisitCreate, VisitUpdate, VisitOut
 from app.dependencies import get_current_user
+from app.services.visit_events import visit_changed
 
 router = APIRouter(prefix="/api/visits", tags=["访视管理"])
 
@@ -56,6 +57,7 @@ def create_visit(
         created_by=current_user.id,
     )
     db.add(visit)
+    visit_changed(db, visit, None, "draft")
     db.commit()
     db.refresh(visit)
     return visit
@@ -85,8 +87,10 @@ def update_visit(
         raise HTTPException(404, "访视记录不存在")
     if visit.status == "locked":
         raise HTTPException(400, "该访视已锁定，无法修改")
+    old_status = visit.status
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(visit, key, value)
+    visit_changed(db, visit, old_status, visit.status)
     db.commit()
     db.refresh(visit)
     return visit
@@ -105,6 +109,7 @@ def submit_visit(
     if visit.status != "draft":
         raise HTTPException(400, f"当前状态 {visit.status} 不可提交")
     visit.status = "submitted"
+    visit_changed(db, visit, "draft", "submitted")
     db.commit()
     return {"message": "提交成功", "visit_id": visit_id, "status": "submitted"}
 
@@ -122,6 +127,7 @@ def sign_visit(
     if visit.status != "submitted":
         raise HTTPException(400, f"当前状态 {visit.status} 不可签名")
     visit.status = "signed"
+    visit_changed(db, visit, "submitted", "signed")
     db.commit()
     return {"message": "签名成功", "visit_id": visit_id, "status": "signed"}
 
@@ -138,5 +144,6 @@ def delete_visit(
     if visit.status in ("signed", "locked"):
         raise HTTPException(400, "已签名或锁定的访视不可删除")
     db.delete(visit)
+    visit_changed(db, visit, visit.status, None)
     db.commit()
     return {"message": "删除成功"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import date
 
@@ -72,6 +72,7 @@ class CostIndicatorIn(BaseModel):
 
 # ---- 药物 ----
 class MedicationIn(BaseModel):
+    id: Optional[int] = None   # 已有行的 id，用于差异同步；新行省略
     treatment_type: Optional[str] = None
     drug_name: Optional[str] = None
     route: Optional[str] = None
@@ -118,7 +119,11 @@ class QuestionnaireIn(BaseModel):
 
 # ---- 生活方式 ----
 class LifestyleIn(BaseModel):
-    diet_scores_json: Optional[str] = None    # JSON 字符串
+    # 逐题分值，按题号顺序（饮食 10 题、运动 5 题）
+    diet_scores: Optional[List[Optional[float]]] = Field(None, max_length=10)
+    exercise_scores: Optional[List[Optional[float]]] = Field(None, max_length=5)
+    # 兼容旧客户端：JSON 字符串形式的逐题分值，与上面两项等价
+    diet_scores_json: Optional[str] = None
     exercise_scores_json: Optional[str] = None
     bad_habits: Optional[str] = None          # 逗号分隔
     meal_basic_info_json: Optional[str] = None
@@ -126,6 +131,7 @@ class LifestyleIn(BaseModel):
 
 # ---- 膳食记录（单条）----
 class MealRecordIn(BaseModel):
+    id: Optional[int] = None   # 已有行的 id，用于差异同步；新行省略
     meal_time: Optional[str] = None
     dish_name: Optional[str] = None
     ingredients: Optional[str] = None
@@ -135,3 +141,15 @@ class MealRecordIn(BaseModel):
 
 class MealRecordBatchIn(BaseModel):
     records: List[MealRecordIn]
+
+
+# ---- 整个访视的表单（一次提交，各部分均可省略）----
+class AllFormsIn(BaseModel):
+    physical_exam: Optional[PhysicalExamIn] = None
+    lab_results: Optional[LabResultsIn] = None
+    comorbidity: Optional[ComorbidityIn] = None
+    cost_indicators: Optional[CostIndicatorIn] = None
+    medications: Optional[List[MedicationIn]] = None
+    questionnaires: Optional[List[QuestionnaireIn]] = None
+    lifestyle: Optional[LifestyleIn] = None
+    meal_records: Optional[List[MealRecordIn]] = None
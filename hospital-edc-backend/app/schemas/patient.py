@@ -48,7 +48,7 @@ class PatientOut(BaseModel):
     consent_date: Optional[date]
     enrollment_date: Optional[date]
     status: Optional[str]
-    # 录入状态（由后端计算，便于前端展示/禁用入口）
+    # 录入状态（冗余存储在 patients 表，便于前端展示/禁用入口）
     has_submitted: bool = False
     has_consent: bool = False
     latest_visit_status: Optional[str] = None
@@ -0,0 +1,186 @@
+"""
+问卷与生活方式评分的批量重算。
+
+修改切点或导入历史数据后，按主键分批读取、用 numpy 整批计算总分与等级，
+只把与库中不一致的行以 executemany 批量写回，并像表单保存一样递增访视版本、记变更；
+已签名/锁定访视的数据保持不变，只在结果中计数（skipped）。分级表见 app/services/scoring.py。
+"""
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from app.models.lifestyle import LIFESTYLE_ITEM_COLUMNS, LifestyleAssessment
+from app.models.questionnaire import Questionnaire
+from app.models.visit import Visit
+from app.services.eq5d import DIMENSION_COLUMNS, eq5d_indices
+from app.services.scoring import QUESTION_COUNTS, SCORE_BANDS
+from app.services.visit_cache import FROZEN_STATUSES
+from app.services.visit_events import forms_recomputed
+
+_MAX_QUESTIONS = max(QUESTION_COUNTS.values())
+_Q_COLUMNS = [Questionnaire.__table__.c[f"q{i}"] for i in range(1, _MAX_QUESTIONS + 1)]
+_EQ_COLUMNS = [Questionnaire.__table__.c[c] for c in DIMENSION_COLUMNS]
+
+
+def band_labels(kind: str, scores: np.ndarray) -> np.ndarray:
+    """整批分级；NaN（无分数）返回 None"""
+    edges, labels = SCORE_BANDS[kind]
+    out = np.asarray(labels, dtype=object)[np.searchsorted(edges, scores, side="left")]
+    out[np.isnan(scores)] = None
+    return out
+
+
+def questionnaire_totals(types: np.ndarray, answers: np.ndarray) -> np.ndarray:
+    """
+    types: (n,) 问卷类型；answers: (n, 9) 题目分值，未答为 NaN。
+    返回总分（未答按 0 计），不计分的问卷为 NaN。
+    """
+    totals = np.full(len(types), np.nan)
+    for q_type, count in QUESTION_COUNTS.items():
+        mask = types == q_type
+        if mask.any():
+            totals[mask] = np.nansum(answers[mask, :count], axis=1)
+    return totals
+
+
+def _changed(stored: np.ndarray, computed: np.ndarray) -> np.ndarray:
+    both_nan = np.isnan(stored) & np.isnan(computed)
+    return ~(both_nan | (stored == computed))
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+_OFFSET = 3   # 每行前三列：id、visit_id、访视状态
+
+
+def _scan_ids(db: Session, table, columns, last_id: int, chunk_size: int):
+    return db.execute(
+        select(table.c.id, table.c.visit_id, Visit.status, *columns)
+        .join(Visit, Visit.id == table.c.visit_id)
+        .where(table.c.id > last_id)
+        .order_by(table.c.id)
+        .limit(chunk_size)
+    ).all()
+
+
+def _writable(rows, changed: np.ndarray) -> tuple:
+    """(可改写的行号, 因访视已签名/锁定而跳过的行数)"""
+    frozen = np.array([r[2] in FROZEN_STATUSES for r in rows], dtype=bool)
+    return np.flatnonzero(changed & ~frozen), int(np.count_nonzero(changed & frozen))
+
+
+def _write(db: Session, model, stmt, rows, idx, params, dry_run: bool) -> None:
+    if not len(idx) or dry_run:
+        return
+    db.execute(stmt, params)
+    forms_recomputed(db, model, [rows[i][1] for i in idx])
+    db.commit()
+
+
+def rescore_questionnaires(db: Session, chunk_size: int = 50000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    重算 PHQ-9 / GAD-7 total_score 与 EQ-5D-5L 效用值，每批单独提交；
+    返回扫描数、更新数、跳过数与各等级人数
+    """
+    table = Questionnaire.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(total_score=bindparam("_total"), eq5d_index=bindparam("_index"))
+    )
+    columns = [table.c.questionnaire_type, table.c.total_score, table.c.eq5d_index, *_Q_COLUMNS, *_EQ_COLUMNS]
+    n_q = len(_Q_COLUMNS)
+    summary = {"scanned": 0, "updated": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        rows = _scan_ids(db, table, columns, last_id, chunk_size)
+        if not rows:
+            return summary
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        types = np.array([r[_OFFSET] for r in rows], dtype=object)
+        stored_total = np.array([r[_OFFSET + 1] for r in rows], dtype=float)
+        stored_index = np.array([r[_OFFSET + 2] for r in rows], dtype=float)
+        answers = np.array([r[_OFFSET + 3:_OFFSET + 3 + n_q] for r in rows], dtype=float)
+        eq_levels = np.array([r[_OFFSET + 3 + n_q:] for r in rows], dtype=float)
+
+        # 只改各自适用的问卷：总分只属于 PHQ-9 / GAD-7，效用值只属于 EQ-5D
+        totals = questionnaire_totals(types, answers)
+        totals = np.where(np.isnan(totals), stored_total, totals)
+        indices = np.where(types == "eq5d", eq5d_indices(eq_levels), stored_index)
+        changed, skipped = _writable(rows, _changed(stored_total, totals) | _changed(stored_index, indices))
+        _write(db, Questionnaire, stmt, rows, changed, [
+            {"_id": int(ids[i]), "_total": _nullable(totals[i]), "_index": _nullable(indices[i])}
+            for i in changed
+        ], dry_run)
+        for q_type in QUESTION_COUNTS:
+            q_totals = totals[types == q_type]
+            scored = ~np.isnan(q_totals)
+            # 无总分的问卷单独计为 unscored，不参与分级（避免 None 标签被转成字符串 "None"）
+            if (~scored).any():
+                key = f"{q_type}:unscored"
+                summary[key] = summary.get(key, 0) + int((~scored).sum())
+            labels, counts = np.unique(band_labels(q_type, q_totals[scored]).astype(str), return_counts=True)
+            for label, n in zip(labels, counts):
+                key = f"{q_type}:{label}"
+                summary[key] = summary.get(key, 0) + int(n)
+        summary["scanned"] += len(rows)
+        summary["updated"] += len(changed)
+        summary["skipped"] += skipped
+        last_id = int(ids[-1])
+
+
+def rescore_lifestyle(db: Session, chunk_size: int = 50000, dry_run: bool = False) -> Dict[str, int]:
+    """由逐题分值重算饮食/运动总分与等级，每批单独提交；返回扫描数、更新数与跳过数"""
+    table = LifestyleAssessment.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values({
+            f"{kind}_{col}": bindparam(f"_{kind}_{col}")
+            for kind in LIFESTYLE_ITEM_COLUMNS for col in ("total", "level")
+        })
+    )
+    columns = []
+    for kind, items in LIFESTYLE_ITEM_COLUMNS.items():
+        columns += [table.c[f"{kind}_total"], table.c[f"{kind}_level"], *[table.c[c] for c in items]]
+    summary = {"scanned": 0, "updated": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        rows = _scan_ids(db, table, columns, last_id, chunk_size)
+        if not rows:
+            return summary
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        changed = np.zeros(len(rows), dtype=bool)
+        computed = {}
+        offset = _OFFSET
+        for kind, items in LIFESTYLE_ITEM_COLUMNS.items():
+            stored_total = np.array([r[offset] for r in rows], dtype=float)
+            stored_level = np.array([r[offset + 1] for r in rows], dtype=object)
+            scores = np.array([r[offset + 2:offset + 2 + len(items)] for r in rows], dtype=float)
+            offset += 2 + len(items)
+
+            # 一题都没有的评估保持原值
+            valid = ~np.all(np.isnan(scores), axis=1)
+            totals = np.where(valid, np.nansum(scores, axis=1), np.nan)
+            levels = band_labels(kind, totals)
+            changed |= valid & (_changed(stored_total, totals) | (stored_level != levels))
+            computed[kind] = (
+                np.where(valid, totals, stored_total),
+                np.where(valid, levels, stored_level),
+            )
+
+        idx, skipped = _writable(rows, changed)
+        params = []
+        for i in idx:
+            row = {"_id": int(ids[i])}
+            for kind, (totals, levels) in computed.items():
+                row[f"_{kind}_total"] = _nullable(totals[i])
+                row[f"_{kind}_level"] = levels[i]
+            params.append(row)
+        _write(db, LifestyleAssessment, stmt, rows, idx, params, dry_run)
+        summary["scanned"] += len(rows)
+        summary["updated"] += len(idx)
+        summary["skipped"] += skipped
+        last_id = int(ids[-1])
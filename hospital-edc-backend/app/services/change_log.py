@@ -0,0 +1,91 @@
+"""
+变更发件箱（change_log）的写入与增量读取。
+
+写入：各写接口调用 record_change / record_changes 只是在会话上登记，
+真正的 INSERT 由 before_commit 钩子在提交前的最后一步统一执行，与业务数据同一事务提交；
+回滚时登记一并丢弃，不会出现"有变更无记录"或"有记录无变更"。
+
+读取：changes_since 按 id 升序分页，返回的 next 即下一次的 since。
+自增 id 在插入时分配、提交顺序却可能不同：并发事务中 id 较小者可能晚提交，
+若读者已越过该 id 就会漏掉。因此只返回 CHANGE_FEED_SETTLE_SECONDS 秒之前写入的行，
+并且遇到第一条未稳定的行即停止，保证水位线之前不会再出现新行。
+INSERT 紧挨着 COMMIT 执行（之间没有其他业务语句），无论事务本身做了多少工作，
+从分配 id 到提交的间隔都远小于该秒数。
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.change_log import ChangeLog
+
+
+_PENDING_KEY = "pending_changes"
+
+
+def record_change(
+    db: Session,
+    table_name: str,
+    op: str,
+    center_id: Optional[int],
+    patient_id: Optional[int] = None,
+    visit_id: Optional[int] = None,
+) -> None:
+    """登记一条变更，提交时写入（调用方负责 commit）"""
+    record_changes(db, [{
+        "table_name": table_name, "op": op, "center_id": center_id,
+        "patient_id": patient_id, "visit_id": visit_id,
+    }])
+
+
+def record_changes(db: Session, rows: Iterable[dict]) -> None:
+    """批量登记，rows 的键同 record_change 的参数；提交时以一条 executemany 写入"""
+    if not db.in_transaction():
+        # 登记随事务走：确保此后的 rollback 能触发丢弃
+        db.begin()
+    db.info.setdefault(_PENDING_KEY, []).extend(
+        {"patient_id": None, "visit_id": None, **row} for row in rows
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_changes(session: Session) -> None:
+    # 保存点释放时也会触发，只在最外层提交时写入
+    if session.in_nested_transaction():
+        return
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        now = datetime.utcnow()
+        session.execute(insert(ChangeLog), [{**row, "changed_at": now} for row in rows])
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_changes(session: Session, transaction) -> None:
+    # 只在最外层事务结束（回滚）时丢弃；保存点回滚不影响外层已登记的变更
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def changes_since(
+    db: Session,
+    since: int,
+    limit: int = 1000,
+    center_ids: Optional[List[int]] = None,
+) -> Tuple[List[ChangeLog], int, bool]:
+    """
+    返回 (since 之后的变更, 下一水位线, 是否还有更多)。
+    center_ids 为 None 表示全部中心。
+    """
+    query = db.query(ChangeLog).filter(ChangeLog.id > since)
+    if center_ids is not None:
+        query = query.filter(ChangeLog.center_id.in_(center_ids))
+    rows = query.order_by(ChangeLog.id).limit(limit + 1).all()
+
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    for i, row in enumerate(rows):
+        if row.changed_at > settled_before:
+            rows = rows[:i]
+            break
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1].id if rows else since), has_more
@@ -0,0 +1,165 @@
+"""
+列式导出：患者、访视与各表单表分别导出为 Parquet 或 Arrow IPC 文件，供 pandas / R 直接读取。
+
+每张表一个文件，列类型按 SQLAlchemy 列类型映射（日期 → date32、时间 → timestamp、
+枚举 → 字典编码字符串、浮点 → float64）。数据通过服务端游标分批读取，每批直接写成
+一个 row group / record batch，内存只占一批。各表在线程池中并行导出，每个线程使用独立会话。
+
+pyarrow 为可选依赖，只在实际导出时导入。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, select
+from app.database import SessionLocal
+from app.models.forms import Comorbidity, CostIndicator, LabResults, PhysicalExam
+from app.models.lifestyle import LifestyleAssessment, MealRecord
+from app.models.medication import Medication
+from app.models.patient import Patient
+from app.models.questionnaire import Questionnaire
+from app.models.visit import Visit
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# 患者表不导出的可识别身份字段
+PATIENT_EXCLUDED_COLUMNS = {"full_name_encrypted", "name_initials", "visit_number"}
+
+# 表名 → Model；访视下的表经 Visit → Patient 按中心过滤。
+# 知情同意记录含签署人姓名与联系方式，不导出（签署日期见 patients.consent_date）
+TABLES = {
+    "patients": Patient,
+    "visits": Visit,
+    "physical_exams": PhysicalExam,
+    "lab_results": LabResults,
+    "comorbidities": Comorbidity,
+    "cost_indicators": CostIndicator,
+    "medications": Medication,
+    "questionnaires": Questionnaire,
+    "lifestyle_assessments": LifestyleAssessment,
+    "meal_records": MealRecord,
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("列式导出需要安装 pyarrow：pip install pyarrow") from e
+    return pyarrow
+
+
+def _columns(model) -> list:
+    columns = list(model.__table__.c)
+    if model is Patient:
+        columns = [c for c in columns if c.name not in PATIENT_EXCLUDED_COLUMNS]
+    return columns
+
+
+def arrow_type(pa, column):
+    """SQLAlchemy 列类型 → Arrow 类型"""
+    t = column.type
+    if isinstance(t, Boolean):
+        return pa.bool_()
+    if isinstance(t, Integer):
+        return pa.int64()
+    if isinstance(t, Float):
+        return pa.float64()
+    if isinstance(t, DateTime):
+        return pa.timestamp("us")
+    if isinstance(t, Date):
+        return pa.date32()
+    if isinstance(t, Enum):
+        return pa.dictionary(pa.int8(), pa.string())
+    return pa.string()
+
+
+def arrow_schema(pa, model):
+    return pa.schema([pa.field(c.name, arrow_type(pa, c)) for c in _columns(model)])
+
+
+def _table_query(model, center_ids: Optional[List[int]]):
+    stmt = select(*_columns(model))
+    if center_ids is not None:
+        if model is Patient:
+            stmt = stmt.where(Patient.center_id.in_(center_ids))
+        else:
+            if model is not Visit:
+                stmt = stmt.join(Visit, Visit.id == model.visit_id)
+            stmt = stmt.join(Patient, Patient.id == Visit.patient_id).where(Patient.center_id.in_(center_ids))
+    return stmt.order_by(model.id)
+
+
+def _enum_array(pa, values, column):
+    # 固定字典（枚举全集），各批次字典一致，Arrow IPC 文件格式要求如此
+    dictionary = list(column.type.enums)
+    codes = {v: i for i, v in enumerate(dictionary)}
+    indices = pa.array([codes.get(v) for v in values], type=pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, pa.array(dictionary, type=pa.string()))
+
+
+def _record_batch(pa, schema, columns, rows):
+    arrays = []
+    for column, field, values in zip(columns, schema, zip(*rows)):
+        if isinstance(column.type, Enum):
+            arrays.append(_enum_array(pa, values, column))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_table(
+    name: str,
+    path: str,
+    fmt: str = "parquet",
+    center_ids: Optional[List[int]] = None,
+    batch_size: int = 50000,
+) -> int:
+    """导出单张表到 path，返回行数。使用独立会话，可在线程中调用"""
+    pa = _pyarrow()
+    model = TABLES[name]
+    columns = _columns(model)
+    schema = arrow_schema(pa, model)
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+        write = lambda batch: writer.write_batch(batch, row_group_size=batch_size)  # noqa: E731
+    else:
+        writer = pa.ipc.new_file(path, schema)
+        write = writer.write_batch
+
+    db = SessionLocal()
+    total = 0
+    try:
+        result = db.execute(_table_query(model, center_ids), execution_options={"yield_per": batch_size})
+        for rows in result.partitions():
+            write(_record_batch(pa, schema, columns, rows))
+            total += len(rows)
+    finally:
+        writer.close()
+        db.close()
+    return total
+
+
+def export_tables(
+    out_dir: str,
+    fmt: str = "parquet",
+    center_ids: Optional[List[int]] = None,
+    tables: Optional[Iterable[str]] = None,
+    batch_size: int = 50000,
+    workers: int = 4,
+) -> Dict[str, int]:
+    """并行导出多张表到 out_dir（每表一个文件），返回 {表名: 行数}"""
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式：{fmt}")
+    _pyarrow()
+    names = list(tables or TABLES)
+    os.makedirs(out_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        futures = {
+            name: pool.submit(
+                export_table, name, os.path.join(out_dir, name + FORMATS[fmt]), fmt, center_ids, batch_size,
+            )
+            for name in names
+        }
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,222 @@
+"""
+访视数据完整度矩阵（患者 × 访视 × CRF 区段），存于 visit_completeness。
+
+- 访视新增时建行（全 0），删除时删行；
+- 表单写入后只重算本次写入涉及的区段（forms_changed 调用 refresh_completeness）；
+- 质控汇总（completeness_rollup）按 (center_id, visit_type) 一次分组查询，不再逐访视读表单；
+- 历史数据或修改区段定义后用 scripts/rebuild_completeness.py 全量重建。
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+from app.models.forms import Comorbidity, CostIndicator, LabResults, PhysicalExam
+from app.models.lifestyle import LIFESTYLE_ITEM_COLUMNS, LifestyleAssessment, MealRecord
+from app.models.medication import Medication
+from app.models.patient import Patient
+from app.models.questionnaire import Questionnaire
+from app.models.stats import CRF_SECTIONS, VisitCompleteness
+from app.models.visit import Visit
+from app.services.eq5d import DIMENSION_COLUMNS
+
+_PE_FIELDS = ("weight_kg", "height_cm", "waist_cm", "hip_cm", "heart_rate", "sbp_mmhg", "dbp_mmhg")
+_LAB_FIELDS = ("fasting_glucose", "hba1c", "tc", "tg", "hdl_c", "ldl_c", "alt", "ast", "scr", "ua", "bun", "test_date")
+_COMORBIDITY_FIELDS = ("hypertension", "ckd", "chd", "angina", "mi", "stroke", "dr", "dn", "df")
+_COST_FIELDS = ("drug_cost", "lab_cost", "service_cost", "supply_cost", "other_cost")
+
+
+def _items(n: int) -> tuple:
+    return tuple(f"q{i}" for i in range(1, n + 1))
+
+
+# 区段 → ((来源表, 问卷类型, 计入完整度的录入字段), ...)；字段为 None 的多行表单有记录即完整。
+# 派生字段（BMI、总分、eGFR 等）不计入
+SECTION_SOURCES = {
+    "basic": ((PhysicalExam, None, _PE_FIELDS), (LabResults, None, _LAB_FIELDS)),
+    "comorbidity": ((Comorbidity, None, _COMORBIDITY_FIELDS),),
+    "medication": ((Medication, None, None),),
+    "cost": ((CostIndicator, None, _COST_FIELDS),),
+    "eq5d": ((Questionnaire, "eq5d", DIMENSION_COLUMNS + ("eq_vas_score",)),),
+    "dtsq": ((Questionnaire, "dtsq", _items(9)),),
+    "phq9": ((Questionnaire, "phq9", _items(9)),),
+    "gad7": ((Questionnaire, "gad7", _items(7)),),
+    "diet": ((LifestyleAssessment, None, LIFESTYLE_ITEM_COLUMNS["diet"]),),
+    "exercise": ((LifestyleAssessment, None, LIFESTYLE_ITEM_COLUMNS["exercise"]),),
+    "meal": ((MealRecord, None, None),),
+}
+assert tuple(SECTION_SOURCES) == CRF_SECTIONS
+
+SECTION_BITS = {name: 1 << i for i, name in enumerate(CRF_SECTIONS)}
+FULL_MASK = (1 << len(CRF_SECTIONS)) - 1
+
+
+def section_ratio(section: str, rows_by_model: Dict[type, list]) -> float:
+    """rows_by_model: {Model: 该访视的记录列表} → 区段已填字段占比"""
+    filled = total = 0
+    for model, q_type, fields in SECTION_SOURCES[section]:
+        rows = rows_by_model.get(model, [])
+        if q_type is not None:
+            rows = [r for r in rows if r.questionnaire_type == q_type]
+        if fields is None:
+            total += 1
+            filled += bool(rows)
+            continue
+        total += len(fields)
+        if rows:
+            filled += sum(getattr(rows[0], f) is not None for f in fields)
+    return round(filled / total, 4)
+
+
+def section_mask(ratios: Dict[str, float]) -> int:
+    return sum(bit for name, bit in SECTION_BITS.items() if ratios.get(name))
+
+
+def _sections_for(models: Iterable[type]) -> List[str]:
+    models = set(models)
+    return [
+        name for name, sources in SECTION_SOURCES.items()
+        if any(model in models for model, _, _ in sources)
+    ]
+
+
+def _load_rows(db: Session, models: Iterable[type], visit_ids: list) -> Dict[type, Dict[int, list]]:
+    """{Model: {visit_id: [记录]}}，每个表一条 IN 查询"""
+    loaded = {}
+    for model in set(models):
+        grouped = defaultdict(list)
+        # 表单由 Core 语句写入，会话中已加载的对象可能是旧值，以查询结果覆盖
+        for row in db.query(model).populate_existing().filter(model.visit_id.in_(visit_ids)):
+            grouped[row.visit_id].append(row)
+        loaded[model] = grouped
+    return loaded
+
+
+def _compute(sections: Iterable[str], loaded: Dict[type, Dict[int, list]], visit_id: int) -> Dict[str, float]:
+    rows_by_model = {model: grouped.get(visit_id, []) for model, grouped in loaded.items()}
+    return {name: section_ratio(name, rows_by_model) for name in sections}
+
+
+def init_completeness(db: Session, visit: Visit, center_id: int) -> None:
+    """新访视建空行（调用方负责 commit）"""
+    db.add(VisitCompleteness(
+        visit_id=visit.id,
+        patient_id=visit.patient_id,
+        center_id=center_id,
+        visit_type=visit.visit_type,
+        section_mask=0,
+        **{f"{name}_ratio": 0.0 for name in CRF_SECTIONS},
+    ))
+
+
+def drop_completeness(db: Session, visit_id: int) -> None:
+    db.query(VisitCompleteness).filter(VisitCompleteness.visit_id == visit_id).delete(synchronize_session=False)
+
+
+def move_patient_completeness(db: Session, patient_id: int, center_id: int) -> None:
+    """患者转中心后同步冗余的 center_id"""
+    db.query(VisitCompleteness).filter(VisitCompleteness.patient_id == patient_id).update(
+        {VisitCompleteness.center_id: center_id}, synchronize_session=False
+    )
+
+
+def refresh_completeness(db: Session, visit_id: int, models: Iterable[type]) -> None:
+    """表单写入后重算涉及的区段；访视尚无完整度行（历史数据）时整行计算补建"""
+    db.flush()
+    record = db.get(VisitCompleteness, visit_id)
+    if record is None:
+        visit_type, patient_id, center_id = (
+            db.query(Visit.visit_type, Visit.patient_id, Patient.center_id)
+            .join(Patient, Patient.id == Visit.patient_id)
+            .filter(Visit.id == visit_id)
+            .one()
+        )
+        record = VisitCompleteness(
+            visit_id=visit_id, patient_id=patient_id, center_id=center_id, visit_type=visit_type,
+        )
+        db.add(record)
+        sections = list(CRF_SECTIONS)
+    else:
+        sections = _sections_for(models)
+        if not sections:
+            return
+    needed = {model for name in sections for model, _, _ in SECTION_SOURCES[name]}
+    ratios = _compute(sections, _load_rows(db, needed, [visit_id]), visit_id)
+    for name, ratio in ratios.items():
+        setattr(record, f"{name}_ratio", ratio)
+    record.section_mask = section_mask({name: getattr(record, f"{name}_ratio") for name in CRF_SECTIONS})
+
+
+def rebuild_completeness(db: Session, chunk_size: int = 2000) -> int:
+    """清空并按当前数据全量重建，每批单独提交；返回访视数"""
+    db.query(VisitCompleteness).delete(synchronize_session=False)
+    db.commit()
+    all_models = {model for sources in SECTION_SOURCES.values() for model, _, _ in sources}
+    total = 0
+    last_id = 0
+    while True:
+        visits = (
+            db.query(Visit.id, Visit.patient_id, Visit.visit_type, Patient.center_id)
+            .join(Patient, Patient.id == Visit.patient_id)
+            .filter(Visit.id > last_id)
+            .order_by(Visit.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not visits:
+            return total
+        loaded = _load_rows(db, all_models, [v.id for v in visits])
+        values = []
+        for v in visits:
+            ratios = _compute(CRF_SECTIONS, loaded, v.id)
+            values.append({
+                "visit_id": v.id,
+                "patient_id": v.patient_id,
+                "center_id": v.center_id,
+                "visit_type": v.visit_type,
+                "section_mask": section_mask(ratios),
+                **{f"{name}_ratio": ratio for name, ratio in ratios.items()},
+            })
+        db.execute(insert(VisitCompleteness), values)
+        db.commit()
+        db.expunge_all()
+        total += len(visits)
+        last_id = visits[-1].id
+
+
+def completeness_rollup(
+    db: Session,
+    center_ids: Optional[List[int]] = None,
+    visit_type: Optional[str] = None,
+) -> List[dict]:
+    """按中心 × 访视类型汇总：访视数、全部区段齐全的访视数、各区段有数据的访视数与平均填写率"""
+    vc = VisitCompleteness
+    columns = [
+        vc.center_id,
+        vc.visit_type,
+        func.count(),
+        func.sum(case((vc.section_mask == FULL_MASK, 1), else_=0)),
+    ]
+    for name in CRF_SECTIONS:
+        ratio = getattr(vc, f"{name}_ratio")
+        columns += [func.sum(case((ratio > 0, 1), else_=0)), func.avg(ratio)]
+    query = db.query(*columns)
+    if center_ids is not None:
+        query = query.filter(vc.center_id.in_(center_ids))
+    if visit_type:
+        query = query.filter(vc.visit_type == visit_type)
+    rows = query.group_by(vc.center_id, vc.visit_type).order_by(vc.center_id, vc.visit_type).all()
+
+    result = []
+    for row in rows:
+        sections = {}
+        for i, name in enumerate(CRF_SECTIONS):
+            present, avg_ratio = row[4 + 2 * i], row[5 + 2 * i]
+            sections[name] = {"visits_with_data": int(present or 0), "avg_ratio": round(float(avg_ratio or 0), 4)}
+        result.append({
+            "center_id": row[0],
+            "visit_type": row[1],
+            "visits": row[2],
+            "complete_visits": int(row[3] or 0),
+            "sections": sections,
+        })
+    return result
@@ -0,0 +1,227 @@
+"""
+各中心按日汇总（center_daily_stats）的增量维护与时间序列查询。
+
+- 患者入组、修改入组日期或转中心，访视新增、改期、状态流转或删除时，
+  在同一事务内对受影响的 (中心, 日期) 行加减计数；
+- 时间序列接口只读汇总表（中心数 × 天数行），按日/周/月分桶在内存中合并，
+  不再扫描 patients / visits；
+- 历史数据或口径调整后用 scripts/rebuild_daily_stats.py 全量重建。
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.patient import Patient
+from app.models.stats import CenterDailyStats
+from app.models.visit import Visit
+
+COUNTER_COLUMNS = ("enrollments", "visits", "visits_submitted", "visits_signed", "visits_locked")
+
+# 访视状态 → 计入的列（到达某状态即同时计入之前各状态）
+VISIT_STATUS_COUNTERS = {
+    "draft": ("visits",),
+    "submitted": ("visits", "visits_submitted"),
+    "signed": ("visits", "visits_submitted", "visits_signed"),
+    "locked": ("visits", "visits_submitted", "visits_signed", "visits_locked"),
+}
+
+BUCKETS = ("day", "week", "month")
+MAX_BUCKETS = 3660
+
+Deltas = Dict[Tuple[int, date], Dict[str, int]]
+
+
+def _add_visit(deltas: Deltas, center_id: Optional[int], day: Optional[date], status: Optional[str], sign: int) -> None:
+    if center_id is None or day is None or status not in VISIT_STATUS_COUNTERS:
+        return
+    row = deltas.setdefault((center_id, day), defaultdict(int))
+    for column in VISIT_STATUS_COUNTERS[status]:
+        row[column] += sign
+
+
+def _add_enrollment(deltas: Deltas, center_id: Optional[int], day: Optional[date], count: int) -> None:
+    if center_id is None or day is None:
+        return
+    deltas.setdefault((center_id, day), defaultdict(int))["enrollments"] += count
+
+
+def _apply(db: Session, deltas: Deltas) -> None:
+    """按 (中心, 日期) 累加；行不存在时插入，被并发写入抢先则改为累加"""
+    for (center_id, day), values in deltas.items():
+        values = {k: v for k, v in values.items() if v}
+        if not values:
+            continue
+        stmt = (
+            update(CenterDailyStats)
+            .where(CenterDailyStats.center_id == center_id, CenterDailyStats.day == day)
+            .values({getattr(CenterDailyStats, k): getattr(CenterDailyStats, k) + v for k, v in values.items()})
+        )
+        if db.execute(stmt).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(CenterDailyStats(
+                    center_id=center_id, day=day, **{c: values.get(c, 0) for c in COUNTER_COLUMNS}
+                ))
+        except IntegrityError:
+            db.execute(stmt)
+
+
+def bump_enrollments(db: Session, counts: Iterable[Tuple[int, Optional[date], int]]) -> None:
+    """counts: (中心, 入组日期, 人数)，新增患者后调用（调用方负责 commit）"""
+    deltas: Deltas = {}
+    for center_id, day, n in counts:
+        _add_enrollment(deltas, center_id, day, n)
+    _apply(db, deltas)
+
+
+def move_enrollment(
+    db: Session, old_center_id: int, old_day: Optional[date], new_center_id: int, new_day: Optional[date]
+) -> None:
+    """患者转中心或修改入组日期"""
+    deltas: Deltas = {}
+    _add_enrollment(deltas, old_center_id, old_day, -1)
+    _add_enrollment(deltas, new_center_id, new_day, 1)
+    _apply(db, deltas)
+
+
+def visit_daily_changed(
+    db: Session,
+    center_id: int,
+    old_day: Optional[date],
+    old_status: Optional[str],
+    new_day: Optional[date],
+    new_status: Optional[str],
+) -> None:
+    """访视新增（old_status=None）、改期或状态变化、删除（new_status=None）"""
+    if (old_day, old_status) == (new_day, new_status):
+        return
+    deltas: Deltas = {}
+    _add_visit(deltas, center_id, old_day, old_status, -1)
+    _add_visit(deltas, center_id, new_day, new_status, 1)
+    _apply(db, deltas)
+
+
+def move_patient_visits(db: Session, patient_id: int, old_center_id: int, new_center_id: int) -> None:
+    """患者转中心：其全部访视的计数从原中心移到新中心"""
+    deltas: Deltas = {}
+    rows = (
+        db.query(Visit.visit_date, Visit.status, func.count())
+        .filter(Visit.patient_id == patient_id)
+        .group_by(Visit.visit_date, Visit.status)
+    )
+    for day, status, n in rows:
+        _add_visit(deltas, old_center_id, day, status, -n)
+        _add_visit(deltas, new_center_id, day, status, n)
+    _apply(db, deltas)
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """清空并按当前数据全量重建（两条分组聚合），返回写入行数（调用方负责 commit）"""
+    db.query(CenterDailyStats).delete(synchronize_session=False)
+    counts = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+    enrollments = (
+        db.query(Patient.center_id, Patient.enrollment_date, func.count())
+        .filter(Patient.enrollment_date.isnot(None))
+        .group_by(Patient.center_id, Patient.enrollment_date)
+    )
+    for center_id, day, n in enrollments:
+        counts[(center_id, day)]["enrollments"] = n
+
+    def _reached(column):
+        statuses = [s for s, columns in VISIT_STATUS_COUNTERS.items() if column in columns]
+        return func.sum(case((Visit.status.in_(statuses), 1), else_=0))
+
+    visit_columns = COUNTER_COLUMNS[1:]
+    visits = (
+        db.query(Patient.center_id, Visit.visit_date, *[_reached(c) for c in visit_columns])
+        .join(Patient, Patient.id == Visit.patient_id)
+        .group_by(Patient.center_id, Visit.visit_date)
+    )
+    for center_id, day, *values in visits:
+        counts[(center_id, day)].update(zip(visit_columns, (int(v or 0) for v in values)))
+
+    rows = [{"center_id": cid, "day": day, **values} for (cid, day), values in counts.items()]
+    if rows:
+        db.execute(insert(CenterDailyStats), rows)
+    return len(rows)
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """日期所在桶的起始日：周从周一起，月从 1 日起"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _bucket_starts(start: date, end: date, bucket: str) -> List[date]:
+    starts, current = [], bucket_start(start, bucket)
+    while current <= end:
+        starts.append(current)
+        if bucket == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if bucket == "week" else 1)
+    return starts
+
+
+def daily_series(
+    db: Session,
+    start: date,
+    end: date,
+    bucket: str = "week",
+    center_ids: Optional[List[int]] = None,
+) -> dict:
+    """
+    [start, end] 内各中心及合计按桶汇总的计数序列，另附累计入组人数（含 start 之前的入组）。
+    首尾桶只统计区间内的日期。
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"不支持的分桶：{bucket}")
+    starts = _bucket_starts(start, end, bucket)
+    if len(starts) > MAX_BUCKETS:
+        raise ValueError(f"时间范围过大（超过 {MAX_BUCKETS} 个桶）")
+    index = {s: i for i, s in enumerate(starts)}
+    ds = CenterDailyStats
+
+    def _scoped(query):
+        return query.filter(ds.center_id.in_(center_ids)) if center_ids is not None else query
+
+    rows = _scoped(
+        db.query(ds.center_id, ds.day, *[getattr(ds, c) for c in COUNTER_COLUMNS])
+        .filter(ds.day >= start, ds.day <= end)
+    ).all()
+    enrolled_before = dict(_scoped(
+        db.query(ds.center_id, func.sum(ds.enrollments)).filter(ds.day < start).group_by(ds.center_id)
+    ).all())
+
+    center_list = sorted({r[0] for r in rows} | set(enrolled_before))
+    series = {cid: {c: [0] * len(starts) for c in COUNTER_COLUMNS} for cid in center_list}
+    for center_id, day, *values in rows:
+        i = index[bucket_start(day, bucket)]
+        for column, value in zip(COUNTER_COLUMNS, values):
+            series[center_id][column][i] += value
+
+    def _with_cumulative(counters: dict, before: int) -> dict:
+        total, cumulative = before, []
+        for n in counters["enrollments"]:
+            total += n
+            cumulative.append(total)
+        return {**counters, "enrollments_cumulative": cumulative}
+
+    overall = {c: [sum(series[cid][c][i] for cid in center_list) for i in range(len(starts))] for c in COUNTER_COLUMNS}
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "buckets": starts,
+        "overall": _with_cumulative(overall, int(sum(enrolled_before.values()) or 0)),
+        "centers": [
+            {"center_id": cid, "series": _with_cumulative(series[cid], int(enrolled_before.get(cid) or 0))}
+            for cid in center_list
+        ],
+    }
@@ -0,0 +1,261 @@
+"""
+派生临床变量：BMI、腰臀比（WHR）、血压分级、eGFR（CKD-EPI 2021）。
+
+计算公式只在本模块以 numpy 数组形式实现一次：
+- 保存表单时把单条记录当作长度为 1 的数组计算；
+- 全库重算（recompute_physical_exams / recompute_lab_results）按主键分批整列计算，
+  只把结果有变化的行批量写回，并像表单保存一样递增访视版本、记变更；
+  已签名/锁定访视的数据保持不变，只在结果中计数。
+体格检查的部分更新由 physical_exam_update 在 upsert 语句内合并旧值重算。
+"""
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy import Numeric, and_, bindparam, case, cast, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.forms import LabResults, PhysicalExam
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.services.visit_cache import FROZEN_STATUSES
+from app.services.visit_events import forms_recomputed
+
+# 血压分级（《中国高血压防治指南 2018》）：收缩压 / 舒张压各自分段，取较高一级
+BP_EDGES = {"sbp": (119, 139, 159, 179), "dbp": (79, 89, 99, 109)}
+BP_LABELS = ("正常", "正常高值", "1级高血压", "2级高血压", "3级高血压")
+
+# CKD-EPI 2021（不含种族系数）
+_SCR_UMOL_PER_MGDL = 88.4
+
+
+def _arr(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def bmi_array(height_cm, weight_kg) -> np.ndarray:
+    h_m, w = _arr(height_cm) / 100, _arr(weight_kg)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.round(w / (h_m * h_m), 1)
+    return np.where((h_m > 0) & (w > 0), bmi, np.nan)
+
+
+def whr_array(waist_cm, hip_cm) -> np.ndarray:
+    waist, hip = _arr(waist_cm), _arr(hip_cm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        whr = np.round(waist / hip, 2)
+    return np.where((waist > 0) & (hip > 0), whr, np.nan)
+
+
+def bp_grade_array(sbp, dbp) -> np.ndarray:
+    """收缩压/舒张压 → 分级名称；两者都缺失为 None"""
+    sbp, dbp = _arr(sbp), _arr(dbp)
+    grade = np.full(sbp.shape, -1)
+    for values, edges in ((sbp, BP_EDGES["sbp"]), (dbp, BP_EDGES["dbp"])):
+        band = np.searchsorted(edges, values, side="left")
+        grade = np.where(np.isnan(values), grade, np.maximum(grade, band))
+    labels = np.asarray(BP_LABELS + (None,), dtype=object)
+    return labels[grade]   # -1 取到末尾的 None
+
+
+def egfr_array(scr_umol, age, gender) -> np.ndarray:
+    """血清肌酐（μmol/L）、年龄、性别 → eGFR（mL/min/1.73m²）；未成年或信息不全为 NaN"""
+    scr = _arr(scr_umol) / _SCR_UMOL_PER_MGDL
+    age = _arr(age)
+    gender = np.asarray(gender, dtype=object)
+    female = gender == "female"
+    kappa = np.where(female, 0.7, 0.9)
+    alpha = np.where(female, -0.241, -0.302)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = scr / kappa
+        egfr = (
+            142
+            * np.minimum(ratio, 1) ** alpha
+            * np.maximum(ratio, 1) ** -1.200
+            * 0.9938 ** age
+            * np.where(female, 1.012, 1.0)
+        )
+    valid = (scr > 0) & (age >= 18) & (female | (gender == "male"))
+    return np.where(valid, np.round(egfr, 1), np.nan)
+
+
+def _scalar(values: np.ndarray) -> Optional[float]:
+    value = values[0]
+    return None if value is None or (isinstance(value, float) and np.isnan(value)) else value
+
+
+def derive_physical_exam(values: dict) -> dict:
+    """单条体格检查的派生值；只返回能由 values 算出的项"""
+    derived = {
+        "bmi": _scalar(bmi_array([values.get("height_cm")], [values.get("weight_kg")])),
+        "whr": _scalar(whr_array([values.get("waist_cm")], [values.get("hip_cm")])),
+        "bp_grade": _scalar(bp_grade_array([values.get("sbp_mmhg")], [values.get("dbp_mmhg")])),
+    }
+    return {k: (float(v) if k != "bp_grade" else v) for k, v in derived.items() if v is not None}
+
+
+def calc_egfr(scr_umol: Optional[float], age: Optional[int], gender: Optional[str]) -> Optional[float]:
+    value = _scalar(egfr_array([scr_umol], [age], [gender]))
+    return float(value) if value is not None else None
+
+
+def physical_exam_update(merged) -> dict:
+    """
+    upsert 更新分支的派生列：以合并后的测量值在同一语句内重算，输入不全时保留原值。
+    merged(列名) 见 app/services/upsert.py。
+    """
+    table = PhysicalExam.__table__
+    h_cm, w_kg = merged("height_cm"), merged("weight_kg")
+    waist, hip = merged("waist_cm"), merged("hip_cm")
+    sbp, dbp = merged("sbp_mmhg"), merged("dbp_mmhg")
+    h_m = h_cm / 100
+
+    bp_whens = []
+    for level in range(len(BP_LABELS) - 1, 0, -1):
+        bp_whens.append((
+            or_(sbp > BP_EDGES["sbp"][level - 1], dbp > BP_EDGES["dbp"][level - 1]),
+            BP_LABELS[level],
+        ))
+    bp_whens.append((or_(sbp.isnot(None), dbp.isnot(None)), BP_LABELS[0]))
+
+    return {
+        "bmi": case(
+            (and_(h_cm > 0, w_kg > 0), func.round(cast(w_kg / (h_m * h_m), Numeric(12, 6)), 1)),
+            else_=table.c.bmi,
+        ),
+        "whr": case(
+            (and_(waist > 0, hip > 0), func.round(cast(waist / hip, Numeric(12, 6)), 2)),
+            else_=table.c.whr,
+        ),
+        "bp_grade": case(*bp_whens, else_=table.c.bp_grade),
+    }
+
+
+#  全库批量重算
+def _changed(stored: np.ndarray, computed: np.ndarray) -> np.ndarray:
+    if stored.dtype == object:
+        return stored != computed
+    both_nan = np.isnan(stored) & np.isnan(computed)
+    return ~(both_nan | (stored == computed))
+
+
+def _nullable(value):
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return float(value) if isinstance(value, (float, np.floating)) else value
+
+
+def _write_changes(db: Session, table, ids, visit_ids, statuses, stored: dict, computed: dict, dry_run: bool):
+    """
+    computed 中 NaN/None 表示输入不全：保留原值。已签名/锁定访视的数据不改写，只计入 skipped。
+    返回 (改写的访视 id, 跳过行数)（调用方负责 commit）
+    """
+    changed = np.zeros(len(ids), dtype=bool)
+    final = {}
+    for col, values in computed.items():
+        if values.dtype == object:
+            known = np.array([v is not None for v in values], dtype=bool)
+        else:
+            known = ~np.isnan(values)
+        final[col] = np.where(known, values, stored[col])
+        changed |= known & _changed(stored[col], values)
+    frozen = np.isin(np.asarray(statuses, dtype=object), FROZEN_STATUSES)
+    idx = np.flatnonzero(changed & ~frozen)
+    if len(idx) and not dry_run:
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({col: bindparam("v_" + col) for col in computed})
+        )
+        db.execute(stmt, [
+            {"_id": int(ids[i]), **{"v_" + col: _nullable(final[col][i]) for col in computed}}
+            for i in idx
+        ])
+    return [int(visit_ids[i]) for i in idx], int(np.count_nonzero(changed & frozen))
+
+
+def _scan(table, columns, last_id: int, chunk_size: int):
+    return (
+        select(table.c.id, table.c.visit_id, Visit.status, *columns)
+        .join(Visit, Visit.id == table.c.visit_id)
+        .where(table.c.id > last_id)
+        .order_by(table.c.id)
+        .limit(chunk_size)
+    )
+
+
+def _finish_chunk(db: Session, model, summary: dict, written: list, skipped: int, dry_run: bool, commit: bool) -> None:
+    summary["updated"] += len(written)
+    summary["skipped"] += skipped
+    if dry_run:
+        return
+    # 与表单保存一致：递增访视版本、失效缓存、记变更、重新核查
+    forms_recomputed(db, model, written)
+    if commit:
+        db.commit()
+
+
+def recompute_physical_exams(db: Session, chunk_size: int = 50000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    全库重算 BMI / WHR / 血压分级，每批单独提交；返回扫描数、更新数，
+    以及因访视已签名/锁定而未改写的行数（skipped）
+    """
+    table = PhysicalExam.__table__
+    inputs = ("height_cm", "weight_kg", "waist_cm", "hip_cm", "sbp_mmhg", "dbp_mmhg")
+    outputs = ("bmi", "whr", "bp_grade")
+    summary = {"scanned": 0, "updated": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(_scan(table, [table.c[c] for c in inputs + outputs], last_id, chunk_size)).all()
+        if not rows:
+            return summary
+        cols = list(zip(*rows))
+        data = dict(zip(("id", "visit_id", "status") + inputs + outputs, cols))
+        stored = {
+            "bmi": _arr(data["bmi"]),
+            "whr": _arr(data["whr"]),
+            "bp_grade": np.asarray(data["bp_grade"], dtype=object),
+        }
+        num = {c: _arr(data[c]) for c in inputs}
+        computed = {
+            "bmi": bmi_array(num["height_cm"], num["weight_kg"]),
+            "whr": whr_array(num["waist_cm"], num["hip_cm"]),
+            "bp_grade": bp_grade_array(num["sbp_mmhg"], num["dbp_mmhg"]),
+        }
+        written, skipped = _write_changes(
+            db, table, data["id"], data["visit_id"], data["status"], stored, computed, dry_run,
+        )
+        _finish_chunk(db, PhysicalExam, summary, written, skipped, dry_run, commit=True)
+        summary["scanned"] += len(rows)
+        last_id = rows[-1][0]
+
+
+def recompute_lab_results(
+    db: Session,
+    chunk_size: int = 50000,
+    dry_run: bool = False,
+    patient_id: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    按肌酐与患者年龄、性别重算 eGFR，每批单独提交；返回扫描数、更新数与跳过数（同上）。
+    指定 patient_id 时只处理该患者（患者年龄/性别修改后调用），此时不提交，由调用方 commit。
+    """
+    table = LabResults.__table__
+    if patient_id is not None:
+        db.flush()
+    summary = {"scanned": 0, "updated": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        query = (
+            _scan(table, [table.c.scr, table.c.egfr, Patient.age, Patient.gender], last_id, chunk_size)
+            .join(Patient, Patient.id == Visit.patient_id)
+        )
+        if patient_id is not None:
+            query = query.where(Patient.id == patient_id)
+        rows = db.execute(query).all()
+        if not rows:
+            return summary
+        ids, visit_ids, statuses, scr, egfr, age, gender = zip(*rows)
+        stored = {"egfr": _arr(egfr)}
+        computed = {"egfr": egfr_array(scr, age, gender)}
+        written, skipped = _write_changes(db, table, ids, visit_ids, statuses, stored, computed, dry_run)
+        _finish_chunk(db, LabResults, summary, written, skipped, dry_run, commit=patient_id is None)
+        summary["scanned"] += len(rows)
+        last_id = rows[-1][0]
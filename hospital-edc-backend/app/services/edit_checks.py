@@ -0,0 +1,344 @@
+"""
+数据核查（edit check）规则引擎：实验室检查、体格检查与访视日期的合理性核查。
+
+规则以数据定义（DEFAULT_RULES，或 EDIT_CHECK_RULES_FILE 指定的 JSON 数组），字段写作
+"<来源>.<列名>"，来源为 visit / pe（体格检查）/ lab（实验室检查）。支持三类：
+
+    {"code": "LAB_HBA1C_RANGE", "kind": "range", "field": "lab.hba1c", "min": 3, "max": 20,
+     "message": "..."}
+    {"code": "PE_SBP_GT_DBP", "kind": "compare", "left": "pe.sbp_mmhg", "op": ">",
+     "right": "pe.dbp_mmhg", "message": "..."}           # right 也可以是数值
+    {"code": "PE_WEIGHT_DELTA", "kind": "visit_delta", "field": "pe.weight_kg",
+     "max_pct": 20, "message": "..."}                     # 与同一患者上一次访视比较，或用 max_abs
+
+规则在启动时编译为作用于 numpy 列数组的函数：全库核查按患者分批读取整列计算，
+保存单个表单时对该患者的全部访视运行同一组规则。结果写入 discrepancies 表，
+增量核查只处理 change_log 中上次核查之后有变更的患者。
+"""
+import json
+import operator
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, Iterable, List
+import numpy as np
+from sqlalchemy import Date, func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.change_log import ChangeLog
+from app.models.discrepancy import Discrepancy, SweepWatermark
+from app.models.forms import LabResults, PhysicalExam
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.services.change_log import changes_since
+
+SOURCES = {"visit": Visit, "pe": PhysicalExam, "lab": LabResults}
+
+# 访视日期、体格检查、实验室检查变化时需要重新核查
+CHECKED_TABLES = ("visits", "physical_exams", "lab_results")
+
+DEFAULT_RULES = [
+    # 实验室检查（mmol/L、μmol/L、U/L、%）
+    {"code": "LAB_HBA1C_RANGE", "kind": "range", "field": "lab.hba1c", "min": 3, "max": 20,
+     "message": "HbA1c 超出合理范围（3–20%）"},
+    {"code": "LAB_FPG_RANGE", "kind": "range", "field": "lab.fasting_glucose", "min": 1, "max": 35,
+     "message": "空腹血糖超出合理范围（1–35 mmol/L）"},
+    {"code": "LAB_TC_RANGE", "kind": "range", "field": "lab.tc", "min": 1, "max": 20,
+     "message": "总胆固醇超出合理范围（1–20 mmol/L）"},
+    {"code": "LAB_TG_RANGE", "kind": "range", "field": "lab.tg", "min": 0.1, "max": 50,
+     "message": "甘油三酯超出合理范围（0.1–50 mmol/L）"},
+    {"code": "LAB_HDL_RANGE", "kind": "range", "field": "lab.hdl_c", "min": 0.1, "max": 5,
+     "message": "HDL-C 超出合理范围（0.1–5 mmol/L）"},
+    {"code": "LAB_LDL_RANGE", "kind": "range", "field": "lab.ldl_c", "min": 0.1, "max": 15,
+     "message": "LDL-C 超出合理范围（0.1–15 mmol/L）"},
+    {"code": "LAB_ALT_RANGE", "kind": "range", "field": "lab.alt", "min": 0, "max": 2000,
+     "message": "ALT 超出合理范围（0–2000 U/L）"},
+    {"code": "LAB_AST_RANGE", "kind": "range", "field": "lab.ast", "min": 0, "max": 2000,
+     "message": "AST 超出合理范围（0–2000 U/L）"},
+    {"code": "LAB_SCR_RANGE", "kind": "range", "field": "lab.scr", "min": 20, "max": 2000,
+     "message": "血清肌酐超出合理范围（20–2000 μmol/L）"},
+    {"code": "LAB_UA_RANGE", "kind": "range", "field": "lab.ua", "min": 50, "max": 1500,
+     "message": "尿酸超出合理范围（50–1500 μmol/L）"},
+    {"code": "LAB_BUN_RANGE", "kind": "range", "field": "lab.bun", "min": 0.5, "max": 60,
+     "message": "尿素氮超出合理范围（0.5–60 mmol/L）"},
+    {"code": "LAB_HDL_LT_TC", "kind": "compare", "left": "lab.hdl_c", "op": "<", "right": "lab.tc",
+     "message": "HDL-C 应低于总胆固醇"},
+    {"code": "LAB_LDL_LT_TC", "kind": "compare", "left": "lab.ldl_c", "op": "<", "right": "lab.tc",
+     "message": "LDL-C 应低于总胆固醇"},
+    {"code": "LAB_DATE_NOT_AFTER_VISIT", "kind": "compare", "left": "lab.test_date", "op": "<=",
+     "right": "visit.visit_date", "message": "检验日期晚于访视日期"},
+    # 体格检查
+    {"code": "PE_WEIGHT_RANGE", "kind": "range", "field": "pe.weight_kg", "min": 25, "max": 250,
+     "message": "体重超出合理范围（25–250 kg）"},
+    {"code": "PE_HEIGHT_RANGE", "kind": "range", "field": "pe.height_cm", "min": 120, "max": 220,
+     "message": "身高超出合理范围（120–220 cm）"},
+    {"code": "PE_WAIST_RANGE", "kind": "range", "field": "pe.waist_cm", "min": 40, "max": 200,
+     "message": "腰围超出合理范围（40–200 cm）"},
+    {"code": "PE_HIP_RANGE", "kind": "range", "field": "pe.hip_cm", "min": 50, "max": 200,
+     "message": "臀围超出合理范围（50–200 cm）"},
+    {"code": "PE_HR_RANGE", "kind": "range", "field": "pe.heart_rate", "min": 30, "max": 200,
+     "message": "心率超出合理范围（30–200 次/分）"},
+    {"code": "PE_SBP_RANGE", "kind": "range", "field": "pe.sbp_mmhg", "min": 60, "max": 260,
+     "message": "收缩压超出合理范围（60–260 mmHg）"},
+    {"code": "PE_DBP_RANGE", "kind": "range", "field": "pe.dbp_mmhg", "min": 30, "max": 160,
+     "message": "舒张压超出合理范围（30–160 mmHg）"},
+    {"code": "PE_SBP_GT_DBP", "kind": "compare", "left": "pe.sbp_mmhg", "op": ">", "right": "pe.dbp_mmhg",
+     "message": "收缩压应高于舒张压"},
+    # 跨访视
+    {"code": "PE_WEIGHT_DELTA", "kind": "visit_delta", "field": "pe.weight_kg", "max_pct": 20,
+     "message": "体重较上次访视变化超过 20%"},
+    {"code": "PE_HEIGHT_DELTA", "kind": "visit_delta", "field": "pe.height_cm", "max_abs": 5,
+     "message": "身高较上次访视变化超过 5 cm"},
+]
+
+_OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+CompiledRule = namedtuple("CompiledRule", "code field message fields check describe")
+
+
+def _column(ref: str):
+    source, name = ref.split(".", 1)
+    return SOURCES[source].__table__.c[name]
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    return ~np.isnat(values) if values.dtype.kind == "M" else ~np.isnan(values)
+
+
+def _fmt(value) -> str:
+    if isinstance(value, np.datetime64):
+        return str(value)
+    value = float(value)
+    return str(int(value)) if value.is_integer() else f"{value:g}"
+
+
+def compile_rule(rule: dict) -> CompiledRule:
+    """规则定义 → CompiledRule；check(cols, prev) 返回违反规则的布尔数组（缺失值不判定）"""
+    kind, code, message = rule["kind"], rule["code"], rule["message"]
+    if kind == "range":
+        field, low, high = rule["field"], rule.get("min"), rule.get("max")
+        _column(field)
+
+        def check(cols, prev):
+            v = cols[field]
+            bad = np.zeros(len(v), dtype=bool)
+            if low is not None:
+                bad |= v < low
+            if high is not None:
+                bad |= v > high
+            return bad
+
+        def describe(cols, prev, i):
+            return _fmt(cols[field][i])
+
+        return CompiledRule(code, field, message, (field,), check, describe)
+
+    if kind == "compare":
+        left, right, op = rule["left"], rule["right"], _OPS[rule["op"]]
+        _column(left)
+        fields = (left,) if not isinstance(right, str) else (left, right)
+        if isinstance(right, str):
+            _column(right)
+
+        def _right(cols, n):
+            return cols[right] if isinstance(right, str) else np.full(n, float(right))
+
+        def check(cols, prev):
+            lv = cols[left]
+            rv = _right(cols, len(lv))
+            return _present(lv) & _present(rv) & ~op(lv, rv)
+
+        def describe(cols, prev, i):
+            rv = _right(cols, len(cols[left]))
+            return f"{_fmt(cols[left][i])} {rule['op']} {_fmt(rv[i])} 不成立"
+
+        return CompiledRule(code, left, message, fields, check, describe)
+
+    if kind == "visit_delta":
+        field, max_abs, max_pct = rule["field"], rule.get("max_abs"), rule.get("max_pct")
+        _column(field)
+
+        def check(cols, prev):
+            v, p = cols[field], prev[field]
+            both = _present(v) & _present(p)
+            change = np.abs(v - p)
+            bad = np.zeros(len(v), dtype=bool)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if max_abs is not None:
+                    bad |= change > max_abs
+                if max_pct is not None:
+                    bad |= change / np.abs(p) * 100 > max_pct
+            return both & bad
+
+        def describe(cols, prev, i):
+            return f"{_fmt(prev[field][i])} → {_fmt(cols[field][i])}"
+
+        return CompiledRule(code, field, message, (field,), check, describe)
+
+    raise ValueError(f"未知的核查规则类型：{kind}")
+
+
+def load_rules() -> List[CompiledRule]:
+    rules = DEFAULT_RULES
+    if settings.EDIT_CHECK_RULES_FILE:
+        with open(settings.EDIT_CHECK_RULES_FILE, encoding="utf-8") as f:
+            rules = json.load(f)
+    return [compile_rule(r) for r in rules]
+
+
+RULES = load_rules()
+_FIELDS = sorted({ref for rule in RULES for ref in rule.fields})
+
+
+#  按患者读取列数组
+def load_columns(db: Session, patient_ids: list) -> dict:
+    """
+    指定患者全部访视的核查字段列（按患者、访视日期排序）。
+    数值列为 float（缺失 NaN），日期列为 datetime64[D]（缺失 NaT）。
+    """
+    columns = [_column(ref) for ref in _FIELDS]
+    stmt = (
+        select(Visit.id, Visit.patient_id, Patient.center_id, *columns)
+        .join(Patient, Patient.id == Visit.patient_id)
+        .outerjoin(PhysicalExam, PhysicalExam.visit_id == Visit.id)
+        .outerjoin(LabResults, LabResults.visit_id == Visit.id)
+        .where(Visit.patient_id.in_(patient_ids))
+        .order_by(Visit.patient_id, Visit.visit_date, Visit.id)
+    )
+    rows = db.execute(stmt).all()
+    data = list(zip(*rows)) if rows else [()] * (3 + len(columns))
+    cols = {
+        "visit_id": np.asarray(data[0], dtype=np.int64),
+        "patient_id": np.asarray(data[1], dtype=np.int64),
+        "center_id": np.asarray(data[2], dtype=np.int64),
+    }
+    for ref, column, values in zip(_FIELDS, columns, data[3:]):
+        dtype = "datetime64[D]" if isinstance(column.type, Date) else float
+        cols[ref] = np.asarray(values, dtype=dtype)
+    return cols
+
+
+def _previous(cols: dict) -> dict:
+    """同一患者上一次访视的字段值（首次访视为缺失）"""
+    same_patient = np.zeros(len(cols["patient_id"]), dtype=bool)
+    same_patient[1:] = cols["patient_id"][1:] == cols["patient_id"][:-1]
+    prev = {}
+    for ref in _FIELDS:
+        values = cols[ref]
+        shifted = np.empty_like(values)
+        if len(values):
+            shifted[0] = values[0]
+            shifted[1:] = values[:-1]
+        missing = np.datetime64("NaT") if values.dtype.kind == "M" else np.nan
+        prev[ref] = np.where(same_patient, shifted, missing)
+    return prev
+
+
+def evaluate(cols: dict, rules: Iterable[CompiledRule] = None) -> Dict[tuple, dict]:
+    """对列数组运行规则，返回 {(visit_id, rule_code): 疑问内容}"""
+    prev = _previous(cols)
+    findings = {}
+    for rule in rules or RULES:
+        for i in np.flatnonzero(rule.check(cols, prev)):
+            visit_id = int(cols["visit_id"][i])
+            findings[(visit_id, rule.code)] = {
+                "visit_id": visit_id,
+                "patient_id": int(cols["patient_id"][i]),
+                "center_id": int(cols["center_id"][i]),
+                "rule_code": rule.code,
+                "field": rule.field,
+                "value": rule.describe(cols, prev, i)[:100],
+                "message": rule.message,
+            }
+    return findings
+
+
+def _sync(db: Session, patient_ids: list, findings: Dict[tuple, dict]) -> Dict[str, int]:
+    """把核查结果落到 discrepancies：新增/重新打开触发的，关闭不再触发的（调用方负责 commit）"""
+    now = datetime.utcnow()
+    existing = {
+        (d.visit_id, d.rule_code): d
+        for d in db.query(Discrepancy).filter(Discrepancy.patient_id.in_(patient_ids))
+    }
+    opened = resolved = 0
+    for key, finding in findings.items():
+        record = existing.get(key)
+        if record is None:
+            db.add(Discrepancy(**finding, status="open", detected_at=now))
+            opened += 1
+            continue
+        if record.status != "open":
+            record.status, record.detected_at, record.resolved_at = "open", now, None
+            opened += 1
+        record.value, record.message, record.center_id = finding["value"], finding["message"], finding["center_id"]
+    for key, record in existing.items():
+        if key not in findings and record.status == "open":
+            record.status, record.resolved_at = "resolved", now
+            resolved += 1
+    return {"opened": opened, "resolved": resolved}
+
+
+def check_patients(db: Session, patient_ids: list) -> Dict[str, int]:
+    """核查指定患者的全部访视并同步疑问（调用方负责 commit）"""
+    if not patient_ids:
+        return {"opened": 0, "resolved": 0}
+    db.flush()
+    return _sync(db, patient_ids, evaluate(load_columns(db, patient_ids)))
+
+
+def move_patient_discrepancies(db: Session, patient_id: int, center_id: int) -> None:
+    """患者转中心后同步冗余的 center_id"""
+    db.query(Discrepancy).filter(Discrepancy.patient_id == patient_id).update(
+        {Discrepancy.center_id: center_id}, synchronize_session=False
+    )
+
+
+#  全库 / 增量核查
+WATERMARK_NAME = "edit_checks"
+
+
+def _watermark(db: Session) -> SweepWatermark:
+    mark = db.get(SweepWatermark, WATERMARK_NAME)
+    if mark is None:
+        mark = SweepWatermark(name=WATERMARK_NAME, last_change_id=0)
+        db.add(mark)
+        # 立即写入：待写对象不在 identity map 中，再次 db.get 会另建一行导致主键冲突
+        db.flush()
+    return mark
+
+
+def _check_in_chunks(db: Session, patient_ids: list, chunk_size: int, summary: dict) -> None:
+    for start in range(0, len(patient_ids), chunk_size):
+        chunk = patient_ids[start:start + chunk_size]
+        result = check_patients(db, chunk)
+        db.commit()
+        db.expunge_all()
+        summary["patients"] += len(chunk)
+        summary["opened"] += result["opened"]
+        summary["resolved"] += result["resolved"]
+
+
+def run_sweep(db: Session, full: bool = False, chunk_size: int = 2000) -> Dict[str, int]:
+    """
+    full=True：核查全部患者；否则只核查上次核查以来 change_log 中访视/体检/化验有变更的患者。
+    每批单独提交，最后推进水位线。返回核查患者数、新开/关闭的疑问数与新水位线。
+    """
+    summary = {"patients": 0, "opened": 0, "resolved": 0}
+    since = _watermark(db).last_change_id
+    if full:
+        # 先记下起点：核查期间的新变更留给下一次增量
+        target = db.query(func.coalesce(func.max(ChangeLog.id), 0)).scalar()
+        patient_ids = [pid for (pid,) in db.query(Patient.id).order_by(Patient.id)]
+    else:
+        target, patient_ids = since, set()
+        while True:
+            rows, target, has_more = changes_since(db, target, 10000)
+            patient_ids.update(r.patient_id for r in rows if r.table_name in CHECKED_TABLES and r.patient_id)
+            if not has_more:
+                break
+        patient_ids = sorted(patient_ids)
+    _check_in_chunks(db, patient_ids, chunk_size, summary)
+    mark = _watermark(db)
+    mark.last_change_id = max(mark.last_change_id, target)
+    db.commit()
+    summary["watermark"] = mark.last_change_id
+    return summary
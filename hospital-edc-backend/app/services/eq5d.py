@@ -0,0 +1,80 @@
+"""
+EQ-5D-5L 健康效用指数。
+
+效用值 = 1 - 五个维度在各自水平上的扣减值之和。启动时按所选价值集（EQ5D_VALUE_SET，
+默认中国价值集）把全部 5^5 = 3125 种健康状态预先算成一张查找表，单条保存与批量重算
+都只需一次下标访问。表单部分更新时由 eq5d_index_sql 在 upsert 语句内按合并后的维度计算，
+扣减值取自同一价值集，结果与查找表一致。
+
+也可通过 EQ5D_VALUE_SET_FILE 指定 JSON 文件加载其他价值集，格式与 VALUE_SETS 相同：
+    {"MO": [0, 0.066, ...], "SC": [...], "UA": [...], "PD": [...], "AD": [...]}
+每个维度 5 个数，依次为水平 1-5 的扣减值（水平 1 为 0）。
+"""
+import json
+from typing import Optional, Sequence
+import numpy as np
+from sqlalchemy import case, func
+from app.config import settings
+
+DIMENSIONS = ("MO", "SC", "UA", "PD", "AD")
+# 与 Questionnaire 列一一对应，顺序同 DIMENSIONS
+DIMENSION_COLUMNS = ("eq_mobility", "eq_self_care", "eq_usual_activity", "eq_pain", "eq_anxiety")
+
+VALUE_SETS = {
+    # 中国价值集：Luo N, et al. Value Health 2017;20(4):662-669
+    "CN": {
+        "MO": (0, 0.066, 0.158, 0.287, 0.345),
+        "SC": (0, 0.048, 0.116, 0.206, 0.263),
+        "UA": (0, 0.045, 0.141, 0.199, 0.210),
+        "PD": (0, 0.058, 0.150, 0.258, 0.322),
+        "AD": (0, 0.049, 0.134, 0.236, 0.247),
+    },
+}
+
+
+def build_lookup(value_set: dict) -> np.ndarray:
+    """按 (MO, SC, UA, PD, AD) 水平 1-5 排列的 3125 项效用值表"""
+    decrements = [np.asarray(value_set[d], dtype=float) for d in DIMENSIONS]
+    total = np.zeros((5,) * 5)
+    for axis, dec in enumerate(decrements):
+        shape = [1] * 5
+        shape[axis] = 5
+        total = total + dec.reshape(shape)
+    return np.round(1 - total, 3).ravel()
+
+
+def _load_value_set() -> dict:
+    if settings.EQ5D_VALUE_SET_FILE:
+        with open(settings.EQ5D_VALUE_SET_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return VALUE_SETS[settings.EQ5D_VALUE_SET]
+
+
+VALUE_SET = _load_value_set()
+LOOKUP = build_lookup(VALUE_SET)
+_STRIDES = np.array([625, 125, 25, 5, 1])
+
+
+def eq5d_index(levels: Sequence[Optional[int]]) -> Optional[float]:
+    """五个维度水平（1-5）→ 效用值；任一维度缺失或越界返回 None"""
+    if any(lv is None or not 1 <= lv <= 5 for lv in levels):
+        return None
+    return float(LOOKUP[sum((lv - 1) * s for lv, s in zip(levels, _STRIDES))])
+
+
+def eq5d_index_sql(levels):
+    """五个维度的 SQL 表达式 → 效用值表达式；任一维度缺失或越界时为 NULL"""
+    decrements = [
+        case(*[(level == i + 1, VALUE_SET[d][i]) for i in range(5)])
+        for level, d in zip(levels, DIMENSIONS)
+    ]
+    return func.round(1 - sum(decrements), 3)
+
+
+def eq5d_indices(levels: np.ndarray) -> np.ndarray:
+    """(n, 5) 水平矩阵（缺失为 NaN）→ (n,) 效用值，无法计算的行为 NaN"""
+    valid = np.all((levels >= 1) & (levels <= 5), axis=1)
+    out = np.full(len(levels), np.nan)
+    codes = (levels[valid].astype(np.int64) - 1) @ _STRIDES
+    out[valid] = LOOKUP[codes]
+    return out
@@ -0,0 +1,123 @@
+"""
+研究数据宽表导出：每个访视一行 = 患者基本信息 + 各单行表单 + 按类型展开的问卷。
+
+整张表由一条 LEFT JOIN 查询产生（单行表单以 visit_id 唯一，问卷以 (visit_id, 类型) 唯一，
+不会放大行数），通过服务端游标（yield_per / stream_results）分批取出并逐批写成 CSV，
+内存占用与访视总数无关。用药、膳食记录为多行表单，不在宽表中。
+"""
+import csv
+import io
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+from app.models.center import Center
+from app.models.forms import Comorbidity, CostIndicator, LabResults, PhysicalExam
+from app.models.lifestyle import LifestyleAssessment
+from app.models.patient import Patient
+from app.models.questionnaire import Questionnaire
+from app.models.visit import Visit
+
+# 患者信息只导出去标识化字段（不含姓名、首字母、就诊号）
+PATIENT_COLUMNS = (
+    "patient_code", "gender", "age", "employment_status", "education_level",
+    "insurance_coverage", "smoking_status", "smoking_per_day", "drinking_status",
+    "drinking_per_day", "consent_date", "enrollment_date", "status",
+)
+
+# 单行表单：(列名前缀, Model)；导出除 id / visit_id 外的全部列
+FORM_TABLES = (
+    ("pe", PhysicalExam),
+    ("lab", LabResults),
+    ("cm", Comorbidity),
+    ("cost", CostIndicator),
+    ("ls", LifestyleAssessment),
+)
+
+# 各问卷导出的列
+QUESTIONNAIRE_COLUMNS = {
+    "phq9": tuple(f"q{i}" for i in range(1, 10)) + ("total_score", "phq9_symptoms"),
+    "gad7": tuple(f"q{i}" for i in range(1, 8)) + ("total_score",),
+    "eq5d": ("eq_mobility", "eq_self_care", "eq_usual_activity", "eq_pain", "eq_anxiety",
+             "eq_vas_score", "eq5d_index"),
+    "dtsq": tuple(f"q{i}" for i in range(1, 10)) + ("dtsq_open_text",),
+}
+
+_SKIP_FORM_COLUMNS = {"id", "visit_id"}
+_Q_ALIASES = {q_type: aliased(Questionnaire, name=f"q_{q_type}") for q_type in QUESTIONNAIRE_COLUMNS}
+
+
+def export_columns() -> List[Tuple[str, object]]:
+    """[(CSV 表头, 列表达式)]，同时决定 SELECT 列与 CSV 列的顺序"""
+    columns = [
+        ("center_code", Center.center_code),
+        *[(c if c != "status" else "patient_status", Patient.__table__.c[c]) for c in PATIENT_COLUMNS],
+        ("visit_id", Visit.id),
+        ("visit_type", Visit.visit_type),
+        ("visit_date", Visit.visit_date),
+        ("visit_status", Visit.status),
+    ]
+    for prefix, model in FORM_TABLES:
+        for col in model.__table__.c:
+            if col.name not in _SKIP_FORM_COLUMNS:
+                columns.append((f"{prefix}_{col.name}", col))
+    for q_type, names in QUESTIONNAIRE_COLUMNS.items():
+        q = _Q_ALIASES[q_type]
+        columns += [(f"{q_type}_{name}", getattr(q, name)) for name in names]
+    return columns
+
+
+def export_query(
+    center_ids: Optional[List[int]] = None,
+    visit_type: Optional[str] = None,
+    visit_status: Optional[str] = None,
+):
+    """宽表 SELECT；center_ids 为 None 表示不限中心"""
+    stmt = (
+        select(*[col for _, col in export_columns()])
+        .select_from(Visit)
+        .join(Patient, Patient.id == Visit.patient_id)
+        .join(Center, Center.id == Patient.center_id)
+    )
+    for _, model in FORM_TABLES:
+        stmt = stmt.outerjoin(model, model.visit_id == Visit.id)
+    for q_type in QUESTIONNAIRE_COLUMNS:
+        q = _Q_ALIASES[q_type]
+        stmt = stmt.outerjoin(q, (q.visit_id == Visit.id) & (q.questionnaire_type == q_type))
+    if center_ids is not None:
+        stmt = stmt.where(Patient.center_id.in_(center_ids))
+    if visit_type:
+        stmt = stmt.where(Visit.visit_type == visit_type)
+    if visit_status:
+        stmt = stmt.where(Visit.status == visit_status)
+    # 按 ix_visits_patient_date 顺序输出，同一患者的访视相邻
+    return stmt.order_by(Visit.patient_id, Visit.visit_date, Visit.id)
+
+
+def iter_export_csv(
+    db: Session,
+    center_ids: Optional[List[int]] = None,
+    visit_type: Optional[str] = None,
+    visit_status: Optional[str] = None,
+    batch_size: int = 2000,
+    bom: bool = True,
+) -> Iterator[str]:
+    """
+    逐批产出 CSV 文本（首块为表头）。bom=True 时带 UTF-8 BOM，Excel 可直接打开中文。
+    结果集走服务端游标，调用方需在迭代结束前保持 db 打开。
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if bom:
+        buf.write("\ufeff")
+    writer.writerow([name for name, _ in export_columns()])
+    yield buf.getvalue()
+
+    result = db.execute(
+        export_query(center_ids, visit_type, visit_status),
+        execution_options={"yield_per": batch_size},
+    )
+    for rows in result.partitions():
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue()
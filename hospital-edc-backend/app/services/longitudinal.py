@@ -0,0 +1,213 @@
+"""
+纵向队列分析：HbA1c、血糖、血脂、BMI、血压等指标在 baseline → M24 各访视的变化。
+
+按中心 × 访视类型（及全部中心合计）统计：例数、均值、中位数、相对基线的变化量
+（同一患者配对）与达标率。数据经服务端游标分批读成 numpy 列，分组统计全部向量化完成。
+
+结果按"访视版本签名"缓存：访视或任一表单写入都会使 Visit.version 递增
+（见 app/services/visit_events.py），患者资料修改（含转中心）使 Patient.version 递增，
+签名不变即数据未变，直接返回缓存结果。
+"""
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.forms import LabResults, PhysicalExam
+from app.models.patient import Patient
+from app.models.visit import Visit
+
+VISIT_TYPES = tuple(Visit.__table__.c.visit_type.type.enums)   # baseline, M6, ..., M24
+BASELINE = "baseline"
+
+# 指标名 → (列, 达标上限)；达标 = 数值 < 上限（《中国2型糖尿病防治指南》控制目标），None 表示不统计达标率
+METRICS = {
+    "hba1c": (LabResults.hba1c, 7.0),
+    "fasting_glucose": (LabResults.fasting_glucose, None),
+    "ldl_c": (LabResults.ldl_c, 2.6),
+    "bmi": (PhysicalExam.bmi, 24.0),
+    "weight_kg": (PhysicalExam.weight_kg, None),
+    "sbp_mmhg": (PhysicalExam.sbp_mmhg, 130),
+    "dbp_mmhg": (PhysicalExam.dbp_mmhg, 80),
+}
+
+
+def _scope(query, center_ids: Optional[List[int]]):
+    if center_ids is not None:
+        query = query.where(Patient.center_id.in_(center_ids))
+    return query
+
+
+def data_signature(db: Session, center_ids: Optional[List[int]]) -> tuple:
+    """范围内访视数、版本和、最大 id 与患者版本和；任一访视/表单/患者写入都会改变"""
+    stmt = _scope(
+        select(
+            func.count(Visit.id),
+            func.coalesce(func.sum(Visit.version), 0),
+            func.max(Visit.id),
+            func.coalesce(func.sum(Patient.version), 0),
+        ).join(Patient, Patient.id == Visit.patient_id),
+        center_ids,
+    )
+    return tuple(db.execute(stmt).one())
+
+
+def load_columns(db: Session, center_ids: Optional[List[int]], batch_size: int = 50000) -> dict:
+    """分批读取为列数组：patient_id、center_id、访视类型编号、(n, 指标数) 数值矩阵（缺失为 NaN）"""
+    stmt = _scope(
+        select(Visit.patient_id, Patient.center_id, Visit.visit_type, *[col for col, _ in METRICS.values()])
+        .join(Patient, Patient.id == Visit.patient_id)
+        .outerjoin(LabResults, LabResults.visit_id == Visit.id)
+        .outerjoin(PhysicalExam, PhysicalExam.visit_id == Visit.id),
+        center_ids,
+    )
+    type_codes = {t: i for i, t in enumerate(VISIT_TYPES)}
+    chunks = []
+    result = db.execute(stmt, execution_options={"yield_per": batch_size})
+    for rows in result.partitions():
+        patient_ids, centers, types, *values = zip(*rows)
+        chunks.append((
+            np.asarray(patient_ids, dtype=np.int64),
+            np.asarray(centers, dtype=np.int64),
+            np.asarray([type_codes[t] for t in types], dtype=np.int64),
+            np.asarray(values, dtype=float).T,
+        ))
+    if not chunks:
+        empty = np.zeros(0, dtype=np.int64)
+        return {"patient_id": empty, "center_id": empty, "visit_type": empty,
+                "values": np.zeros((0, len(METRICS)))}
+    return {
+        "patient_id": np.concatenate([c[0] for c in chunks]),
+        "center_id": np.concatenate([c[1] for c in chunks]),
+        "visit_type": np.concatenate([c[2] for c in chunks]),
+        "values": np.concatenate([c[3] for c in chunks]),
+    }
+
+
+def baseline_deltas(patient_id: np.ndarray, visit_type: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """各访视相对同一患者基线访视的变化量；无基线值或本身为基线访视时为 NaN"""
+    patients, inverse = np.unique(patient_id, return_inverse=True)
+    baseline = np.full((len(patients), values.shape[1]), np.nan)
+    is_baseline = visit_type == VISIT_TYPES.index(BASELINE)
+    baseline[inverse[is_baseline]] = values[is_baseline]
+    deltas = values - baseline[inverse]
+    deltas[is_baseline] = np.nan
+    return deltas
+
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def group_stats(keys: np.ndarray, n_groups: int, values: np.ndarray, deltas: np.ndarray) -> List[Dict[str, dict]]:
+    """
+    keys: (n,) 组号 0..n_groups-1。计数、均值、达标率用 bincount 一次算出，
+    中位数按组号排序后对每组切片求 nanmedian。返回每组 {指标: 统计}。
+    """
+    present = ~np.isnan(values)
+    delta_present = ~np.isnan(deltas)
+    limits = np.array([np.inf if lim is None else lim for _, lim in METRICS.values()])
+    met = present & (np.nan_to_num(values, nan=np.inf) < limits)
+
+    def _by_group(weights):
+        return np.stack([np.bincount(keys, weights=weights[:, j], minlength=n_groups)
+                         for j in range(weights.shape[1])], axis=1)
+
+    n = _by_group(present.astype(float))
+    sums = _by_group(np.where(present, values, 0.0))
+    delta_n = _by_group(delta_present.astype(float))
+    delta_sums = _by_group(np.where(delta_present, deltas, 0.0))
+    met_n = _by_group(met.astype(float))
+
+    order = np.argsort(keys, kind="stable")
+    bounds = np.searchsorted(keys[order], np.arange(n_groups + 1))
+    groups = []
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # 全为 NaN 的组 nanmedian 告警
+        means = sums / n
+        delta_means = delta_sums / delta_n
+        rates = met_n / n
+        for g in range(n_groups):
+            rows = order[bounds[g]:bounds[g + 1]]
+            medians = np.nanmedian(values[rows], axis=0) if len(rows) else np.full(len(METRICS), np.nan)
+            delta_medians = np.nanmedian(deltas[rows], axis=0) if len(rows) else np.full(len(METRICS), np.nan)
+            stats = {}
+            for j, (name, (_, limit)) in enumerate(METRICS.items()):
+                stats[name] = {
+                    "n": int(n[g, j]),
+                    "mean": _round(means[g, j]),
+                    "median": _round(medians[j]),
+                    "delta_n": int(delta_n[g, j]),
+                    "delta_mean": _round(delta_means[g, j]),
+                    "delta_median": _round(delta_medians[j]),
+                    "target_rate": _round(rates[g, j], 4) if limit is not None else None,
+                }
+            groups.append(stats)
+    return groups
+
+
+def compute_longitudinal(db: Session, center_ids: Optional[List[int]]) -> dict:
+    data = load_columns(db, center_ids)
+    values, visit_type = data["values"], data["visit_type"]
+    deltas = baseline_deltas(data["patient_id"], visit_type, values)
+    n_types = len(VISIT_TYPES)
+
+    overall = group_stats(visit_type, n_types, values, deltas)
+    centers, center_index = np.unique(data["center_id"], return_inverse=True)
+    per_center = group_stats(center_index * n_types + visit_type, len(centers) * n_types, values, deltas)
+
+    return {
+        "visit_types": list(VISIT_TYPES),
+        "targets": {name: limit for name, (_, limit) in METRICS.items() if limit is not None},
+        "patients": int(len(np.unique(data["patient_id"]))),
+        "visits": int(len(visit_type)),
+        "overall": dict(zip(VISIT_TYPES, overall)),
+        "centers": [
+            {"center_id": int(cid), "visit_types": dict(zip(VISIT_TYPES, per_center[i * n_types:(i + 1) * n_types]))}
+            for i, cid in enumerate(centers)
+        ],
+    }
+
+
+class _ResultCache:
+    """按访问范围缓存 (签名, 结果)，LRU 保留最近 max_entries 个范围"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[tuple, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, signature: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, signature: tuple, result: dict) -> None:
+        with self._lock:
+            self._entries[key] = (signature, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+longitudinal_cache = _ResultCache()
+
+
+def get_longitudinal(db: Session, center_ids: Optional[List[int]]) -> dict:
+    """带缓存的纵向统计；数据签名变化时重算"""
+    key = tuple(sorted(center_ids)) if center_ids is not None else None
+    signature = data_signature(db, center_ids)
+    result = longitudinal_cache.get(key, signature)
+    if result is None:
+        result = compute_longitudinal(db, center_ids)
+        longitudinal_cache.put(key, signature, result)
+    return result
@@ -0,0 +1,48 @@
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.patient import Patient, PatientCodeSequence
+
+
+def format_patient_code(center_code: str, number: int) -> str:
+    return f"{center_code}-{number:03d}"
+
+
+def _init_sequence(db: Session, center_code: str) -> None:
+    """首次使用某中心前缀时，从已有编号的最大序号起步，避免与历史编号冲突"""
+    last = 0
+    codes = db.query(Patient.patient_code).filter(
+        Patient.patient_code.startswith(center_code + "-", autoescape=True)
+    )
+    for (code,) in codes:
+        suffix = code[len(center_code) + 1:]
+        if suffix.isdigit():
+            last = max(last, int(suffix))
+    # 并发初始化时可能已被其他请求写入，用保存点隔离主键冲突
+    try:
+        with db.begin_nested():
+            db.add(PatientCodeSequence(center_code=center_code, last_value=last))
+    except IntegrityError:
+        pass
+
+
+def allocate_patient_codes(db: Session, center_code: str, count: int = 1) -> List[str]:
+    """
+    为 center_code 原子地分配 count 个连续患者编号。
+    UPDATE 持有序列行锁直到调用方 commit，并发录入不会拿到重复编号。
+    """
+    stmt = (
+        update(PatientCodeSequence)
+        .where(PatientCodeSequence.center_code == center_code)
+        .values(last_value=PatientCodeSequence.last_value + count)
+    )
+    if not db.execute(stmt).rowcount:
+        _init_sequence(db, center_code)
+        db.execute(stmt)
+    last = (
+        db.query(PatientCodeSequence.last_value)
+        .filter(PatientCodeSequence.center_code == center_code)
+        .scalar()
+    )
+    return [format_patient_code(center_code, n) for n in range(last - count + 1, last + 1)]
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import List, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.center import Center
+from app.models.patient import Patient
+from app.schemas.patient import PatientCreate
+from app.services.change_log import record_changes
+from app.services.daily_stats import bump_enrollments
+from app.services.patient_codes import allocate_patient_codes
+from app.services.patient_search import index_patients
+from app.services.stats import bump_patient_status
+
+GENDERS = ("male", "female")
+
+
+def parse_patient_file(filename: str, content: bytes) -> List[dict]:
+    """解析导入文件：.json 为对象数组（或 {"patients": [...]}），其余按 CSV（首行表头）处理"""
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".json"):
+        data = json.loads(text)
+        return data["patients"] if isinstance(data, dict) else data
+    # CSV 空单元格、以及列数不足的行缺失的单元格（DictReader 填 None）均视为未填写
+    return [
+        {k.strip(): ((v or "").strip() or None) for k, v in row.items() if k}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def _validate(
+    db: Session, rows: List[dict], default_center_id: Optional[int], accessible_centers: Optional[list]
+):
+    """逐行校验，返回 ([(行号, 数据, 中心 id, 编号前缀)], 错误报告)；编号分配与写入前完成"""
+    center_codes = dict(db.query(Center.id, Center.center_code))
+    valid, errors = [], []
+    for idx, raw in enumerate(rows, start=1):
+        try:
+            data = PatientCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append({
+                "row": idx,
+                "errors": [f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors()],
+            })
+            continue
+        center_id = data.center_id or default_center_id
+        if data.gender not in GENDERS:
+            errors.append({"row": idx, "errors": ["gender: 须为 male 或 female"]})
+        elif not center_id:
+            errors.append({"row": idx, "errors": ["无法确定患者所属中心"]})
+        elif center_id not in center_codes:
+            errors.append({"row": idx, "errors": ["所属中心不存在"]})
+        elif accessible_centers is not None and center_id not in accessible_centers:
+            errors.append({"row": idx, "errors": ["无权在该中心创建患者"]})
+        else:
+            # 与单条新建一致：未给出编号前缀时取所属中心的中心编号
+            valid.append((idx, data, center_id, data.center_code or center_codes[center_id]))
+    return valid, errors
+
+
+def import_patients(
+    db: Session,
+    rows: List[dict],
+    default_center_id: Optional[int],
+    created_by: Optional[int],
+    accessible_centers: Optional[list] = None,
+    chunk_size: int = 1000,
+) -> dict:
+    """
+    批量入组：整体校验后按 chunk_size 分批写入，每批一个事务。
+    每批内编号按中心前缀整块分配，患者以 executemany 插入。
+    返回 {"inserted": n, "errors": [{"row": 行号(从1起), "errors": [...]}, ...]}
+    """
+    valid, errors = _validate(db, rows, default_center_id, accessible_centers)
+    inserted = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            by_prefix = defaultdict(list)
+            for item in chunk:
+                by_prefix[item[3]].append(item)
+            values = []
+            for prefix, items in by_prefix.items():
+                codes = allocate_patient_codes(db, prefix, len(items))
+                for code, (_, data, center_id, _) in zip(codes, items):
+                    values.append({
+                        **data.model_dump(exclude={"center_code", "center_id"}),
+                        "patient_code": code,
+                        "center_code": prefix,
+                        "center_id": center_id,
+                        "status": "enrolled",
+                        "has_submitted": False,
+                        "has_consent": False,
+                        "created_by": created_by,
+                    })
+            db.execute(insert(Patient), values)
+
+            # executemany 不回传自增 id，按本批编号取回后建立搜索索引
+            created = (
+                db.query(Patient.id, Patient.patient_code, Patient.name_initials, Patient.center_id,
+                         Patient.enrollment_date)
+                .filter(Patient.patient_code.in_([v["patient_code"] for v in values]))
+                .all()
+            )
+            index_patients(db, [r[:3] for r in created])
+            per_center = defaultdict(int)
+            for r in created:
+                per_center[r.center_id] += 1
+            for center_id, n in per_center.items():
+                bump_patient_status(db, center_id, None, "enrolled", count=n)
+            per_day = defaultdict(int)
+            for r in created:
+                per_day[(r.center_id, r.enrollment_date)] += 1
+            bump_enrollments(db, [(cid, day, n) for (cid, day), n in per_day.items()])
+            record_changes(db, [
+                {"table_name": "patients", "op": "insert", "center_id": r.center_id, "patient_id": r.id}
+                for r in created
+            ])
+            db.commit()
+            inserted += len(values)
+        except Exception as e:
+            # 本批整体回滚并逐行记入错误报告，后续批次继续导入
+            db.rollback()
+            msg = f"写入失败: {e.__class__.__name__}"
+            errors.extend({"row": idx, "errors": [msg]} for idx, *_ in chunk)
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": inserted, "errors": errors}
@@ -0,0 +1,73 @@
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import false, insert, select, true
+from sqlalchemy.orm import Session
+from app.models.patient import Patient, PatientSearchToken
+
+TOKEN_MAX_LEN = 20
+
+
+def _suffixes(value: Optional[str]) -> set:
+    value = (value or "").strip().lower()[:TOKEN_MAX_LEN]
+    return {value[i:] for i in range(len(value))}
+
+
+def patient_tokens(patient_code: Optional[str], name_initials: Optional[str]) -> set:
+    return _suffixes(patient_code) | _suffixes(name_initials)
+
+
+def index_patients(db: Session, rows: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> None:
+    """为 (patient_id, patient_code, name_initials) 重建搜索后缀（调用方负责 commit）"""
+    rows = list(rows)
+    if not rows:
+        return
+    db.query(PatientSearchToken).filter(
+        PatientSearchToken.patient_id.in_([r[0] for r in rows])
+    ).delete(synchronize_session=False)
+    values = [
+        {"token": t, "patient_id": pid}
+        for pid, code, initials in rows
+        for t in patient_tokens(code, initials)
+    ]
+    if values:
+        db.execute(insert(PatientSearchToken), values)
+
+
+def index_patient(db: Session, patient: Patient) -> None:
+    db.flush()
+    index_patients(db, [(patient.id, patient.patient_code, patient.name_initials)])
+
+
+def search_filter(term: str):
+    """患者编号或姓名首字母包含 term 的过滤条件（走后缀索引）"""
+    term = term.strip().lower()
+    if not term:
+        return true()
+    if len(term) > TOKEN_MAX_LEN:
+        return false()
+    # 前缀 LIKE（转义 % _）：常量前缀可走索引范围扫描，且不受 *_ci 排序规则下
+    # "末字符+1" 区间上界与大小写/重音折叠不一致的影响
+    return Patient.id.in_(
+        select(PatientSearchToken.patient_id)
+        .where(PatientSearchToken.token.startswith(term, autoescape=True))
+    )
+
+
+def rebuild_search_index(db: Session, chunk_size: int = 5000) -> int:
+    """按主键分批全量重建后缀索引，每批单独提交；返回处理的患者数"""
+    db.query(PatientSearchToken).delete(synchronize_session=False)
+    db.commit()
+    last_id, done = 0, 0
+    while True:
+        rows = (
+            db.query(Patient.id, Patient.patient_code, Patient.name_initials)
+            .filter(Patient.id > last_id)
+            .order_by(Patient.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return done
+        index_patients(db, rows)
+        db.commit()
+        last_id = rows[-1][0]
+        done += len(rows)
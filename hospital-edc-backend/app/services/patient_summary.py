@@ -0,0 +1,57 @@
+from sqlalchemy import exists, select, update
+from sqlalchemy.orm import Session
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.models.consent import ConsentRecord
+
+
+def refresh_patient_summary(db: Session, patient_id: int) -> None:
+    """访视新增/状态变更/删除后重算患者录入状态（调用方负责 commit）"""
+    db.flush()
+    statuses = [
+        s for (s,) in db.query(Visit.status)
+        .filter(Visit.patient_id == patient_id)
+        .order_by(Visit.visit_date.desc(), Visit.id.desc())
+    ]
+    db.query(Patient).filter(Patient.id == patient_id).update(
+        {
+            Patient.has_submitted: any(s != "draft" for s in statuses),
+            Patient.latest_visit_status: statuses[0] if statuses else None,
+            Patient.version: Patient.version + 1,
+            # 汇总字段变化不算患者资料修改，保持 updated_at 不变
+            Patient.updated_at: Patient.updated_at,
+        },
+        synchronize_session="fetch",
+    )
+
+
+def mark_consent(db: Session, patient_id: int) -> None:
+    """知情同意保存后标记患者已签署（调用方负责 commit）"""
+    db.query(Patient).filter(Patient.id == patient_id).update(
+        {
+            Patient.has_consent: True,
+            Patient.version: Patient.version + 1,
+            Patient.updated_at: Patient.updated_at,
+        },
+        synchronize_session="fetch",
+    )
+
+
+def rebuild_all_summaries(db: Session) -> None:
+    """全量回填：以集合操作一次性重算所有患者的汇总字段"""
+    latest_status = (
+        select(Visit.status)
+        .where(Visit.patient_id == Patient.id)
+        .order_by(Visit.visit_date.desc(), Visit.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Patient).values(
+            has_submitted=exists().where(Visit.patient_id == Patient.id, Visit.status != "draft"),
+            has_consent=exists().where(ConsentRecord.patient_id == Patient.id),
+            latest_visit_status=latest_status,
+            version=Patient.version + 1,
+            updated_at=Patient.updated_at,
+        ).execution_options(synchronize_session=False)
+    )
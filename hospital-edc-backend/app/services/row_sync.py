@@ -0,0 +1,84 @@
+"""
+访视下多行子表（药物、膳食记录）的差异同步。
+
+提交的列表代表该访视的完整集合：与现有行比对后只对变化的行执行
+批量 INSERT / UPDATE / DELETE，未变化的行不写入，行 id 保持稳定。
+
+匹配顺序：
+1. 带 id 且属于本访视的行按 id 匹配；
+2. 不带 id 的行按完整内容匹配剩余的现有行；
+3. 仍未匹配的新行 INSERT，剩下的现有行 DELETE。不复用被删除行的 id：
+   id 对外可见（前端、变更日志），复用会让一条已删除的记录"变成"另一条。
+"""
+from collections import defaultdict
+from typing import List
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+
+def sync_visit_rows(db: Session, model_cls, visit_id: int, items: List[dict]) -> dict:
+    """
+    items 为完整字段的 dict 列表（可含 id）；调用方负责 commit。
+    返回 {"inserted", "updated", "deleted", "unchanged"} 计数。
+    """
+    table = model_cls.__table__
+    fields = [c.name for c in table.columns if c.name not in ("id", "visit_id")]
+
+    existing = {
+        row.id: tuple(row[1:])
+        for row in db.execute(
+            select(table.c.id, *[table.c[f] for f in fields]).where(table.c.visit_id == visit_id)
+        )
+    }
+
+    unmatched_new = []
+    updates = []
+    unchanged = 0
+    for item in items:
+        values = tuple(item.get(f) for f in fields)
+        row_id = item.get("id")
+        if row_id in existing:
+            if existing.pop(row_id) != values:
+                updates.append((row_id, values))
+            else:
+                unchanged += 1
+        else:
+            unmatched_new.append(values)
+
+    by_content = defaultdict(list)
+    for row_id, values in existing.items():
+        by_content[values].append(row_id)
+    inserts = []
+    for values in unmatched_new:
+        ids = by_content.get(values)
+        if ids:
+            existing.pop(ids.pop())
+            unchanged += 1
+        else:
+            inserts.append(values)
+    deleted_ids = sorted(existing)
+
+    if updates:
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({f: bindparam("v_" + f) for f in fields}),
+            [
+                {"_id": row_id, **{"v_" + f: v for f, v in zip(fields, values)}}
+                for row_id, values in updates
+            ],
+        )
+    if inserts:
+        db.execute(
+            insert(table),
+            [{"visit_id": visit_id, **dict(zip(fields, values))} for values in inserts],
+        )
+    if deleted_ids:
+        db.execute(delete(table).where(table.c.id.in_(deleted_ids)))
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deleted_ids),
+        "unchanged": unchanged,
+    }
@@ -1,24 +1,62 @@
+"""
+量表评分与分级。
+
+分级以"分段上界 + 等级名称"表定义：score <= edges[i] 落入 labels[i]，超过最后一个上界
+落入 labels[-1]。单条评分（保存表单时）用 bisect，批量重算（app/services/batch_scoring.py）
+用 numpy.searchsorted，两者共用同一张表，修改切点只需改这里。
+"""
+import json
+from bisect import bisect_left
+from typing import List, Optional
+
+# (分段上界, 等级名称)，len(labels) == len(edges) + 1
+SCORE_BANDS = {
+    "phq9": ((4, 9, 14, 19), ("无/极轻微抑郁", "轻度抑郁", "中度抑郁", "中重度抑郁", "重度抑郁")),
+    "gad7": ((4, 9, 14), ("无焦虑症状", "轻度焦虑", "中度焦虑", "重度焦虑")),
+    "diet": ((45, 65, 85), ("差", "尚可", "一般", "良好")),
+    "exercise": ((20, 30, 40), ("差", "尚可", "一般", "良好")),
+}
+
+# 计分问卷的题目数（q1..qN 求和）
+QUESTION_COUNTS = {"phq9": 9, "gad7": 7}
+
+
+def band_label(kind: str, score: float) -> str:
+    edges, labels = SCORE_BANDS[kind]
+    return labels[bisect_left(edges, score)]
+
+
 def calc_phq9_level(score: int) -> str:
-    if score <= 4:   return "无/极轻微抑郁"
-    if score <= 9:   return "轻度抑郁"
-    if score <= 14:  return "中度抑郁"
-    if score <= 19:  return "中重度抑郁"
-    return "重度抑郁"
+    return band_label("phq9", score)
 
 def calc_gad7_level(score: int) -> str:
-    if score <= 4:   return "无焦虑症状"
-    if score <= 9:   return "轻度焦虑"
-    if score <= 14:  return "中度焦虑"
-    return "重度焦虑"
+    return band_label("gad7", score)
 
 def calc_diet_level(score: float) -> str:
-    if score <= 45:  return "差"
-    if score <= 65:  return "尚可"
-    if score <= 85:  return "一般"
-    return "良好"
+    return band_label("diet", score)
 
 def calc_exercise_level(score: float) -> str:
-    if score <= 20:  return "差"
-    if score <= 30:  return "尚可"
-    if score <= 40:  return "一般"
-    return "良好"
\ No newline at end of file
+    return band_label("exercise", score)
+
+
+def questionnaire_total(q_type: str, answers: dict) -> Optional[int]:
+    """PHQ-9 / GAD-7 总分（未答题按 0 计）；其他问卷不计总分返回 None"""
+    count = QUESTION_COUNTS.get(q_type)
+    if count is None:
+        return None
+    return sum(answers.get(f"q{i}", 0) or 0 for i in range(1, count + 1))
+
+
+def parse_scores_json(raw: Optional[str]) -> List[Optional[float]]:
+    """旧客户端提交的逐题分值 JSON（列表或 {题号: 分值}）→ 按题号顺序的分值列表"""
+    if not raw:
+        return []
+    scores = json.loads(raw)
+    if isinstance(scores, dict):
+        scores = list(scores.values())
+    return [None if s is None else float(s) for s in scores]
+
+
+def items_total(scores: List[Optional[float]]) -> float:
+    """生活方式评估总分：已答题分值之和"""
+    return sum(s for s in scores if s is not None)
@@ -0,0 +1,132 @@
+from typing import Iterable, Optional
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.center import Center
+from app.models.patient import Patient
+from app.models.stats import CenterStats
+from app.models.visit import Visit
+
+# 访视状态 → 计数列
+VISIT_STATUS_COLUMNS = {
+    "draft": "visits_draft",
+    "submitted": "visits_submitted",
+    "signed": "visits_signed",
+    "locked": "visits_locked",
+}
+COUNTER_COLUMNS = ["total_patients", "enrolled", *VISIT_STATUS_COLUMNS.values()]
+
+
+def _aggregate(db: Session, center_ids: Iterable[int]) -> dict:
+    """一次分组聚合扫描，得到指定中心的全部计数"""
+    def _count_visits(status):
+        return func.sum(case((Visit.status == status, 1), else_=0))
+
+    rows = (
+        db.query(
+            Patient.center_id,
+            func.count(func.distinct(Patient.id)),
+            func.count(func.distinct(case((Patient.status == "enrolled", Patient.id)))),
+            *[_count_visits(s) for s in VISIT_STATUS_COLUMNS],
+        )
+        .outerjoin(Visit, Visit.patient_id == Patient.id)
+        .filter(Patient.center_id.in_(list(center_ids)))
+        .group_by(Patient.center_id)
+        .all()
+    )
+    return {r[0]: dict(zip(COUNTER_COLUMNS, (int(v or 0) for v in r[1:]))) for r in rows}
+
+
+def _build_rows(db: Session, center_ids: list) -> set:
+    """为缺失缓存的中心计算并写入计数行，返回实际写入的中心"""
+    if not center_ids:
+        return set()
+    db.flush()
+    counts = _aggregate(db, center_ids)
+    built = set()
+    for cid in center_ids:
+        # 并发时可能已被其他请求写入，用保存点隔离主键冲突，不影响外层事务
+        try:
+            with db.begin_nested():
+                db.add(CenterStats(center_id=cid, **counts.get(cid, {})))
+            built.add(cid)
+        except IntegrityError:
+            pass
+    return built
+
+
+def _bump(db: Session, center_id: Optional[int], deltas: dict) -> None:
+    deltas = {k: v for k, v in deltas.items() if v}
+    if center_id is None or not deltas:
+        return
+    stmt = (
+        update(CenterStats)
+        .where(CenterStats.center_id == center_id)
+        .values({getattr(CenterStats, k): getattr(CenterStats, k) + v for k, v in deltas.items()})
+    )
+    if db.execute(stmt).rowcount:
+        return
+    # 尚无缓存行：直接从本事务视角聚合（已包含本次改动）；若被并发写入抢先则补做增量
+    if center_id not in _build_rows(db, [center_id]):
+        db.execute(stmt)
+
+
+def bump_patient_status(
+    db: Session, center_id: int, old: Optional[str], new: Optional[str], count: int = 1
+) -> None:
+    """count 名患者新增（old=None）或状态变化后增量更新计数（调用方负责 commit）"""
+    deltas = {
+        "total_patients": ((old is None) - (new is None)) * count,
+        "enrolled": ((new == "enrolled") - (old == "enrolled")) * count,
+    }
+    _bump(db, center_id, deltas)
+
+
+def bump_visit_status(db: Session, center_id: int, old: Optional[str], new: Optional[str]) -> None:
+    """访视新增（old=None）、状态变化或删除（new=None）后增量更新计数"""
+    if old == new:
+        return
+    deltas = {}
+    if old in VISIT_STATUS_COLUMNS:
+        deltas[VISIT_STATUS_COLUMNS[old]] = -1
+    if new in VISIT_STATUS_COLUMNS:
+        deltas[VISIT_STATUS_COLUMNS[new]] = deltas.get(VISIT_STATUS_COLUMNS[new], 0) + 1
+    _bump(db, center_id, deltas)
+
+
+def invalidate_centers(db: Session, center_ids: Iterable[int]) -> None:
+    """无法增量维护时（如患者转中心）在本事务内按当前数据重建这些中心的计数行"""
+    ids = [c for c in set(center_ids) if c is not None]
+    if ids:
+        db.query(CenterStats).filter(CenterStats.center_id.in_(ids)).delete(synchronize_session=False)
+        _build_rows(db, ids)
+
+
+def get_center_stats(db: Session, center_ids: Optional[list]) -> dict:
+    """
+    汇总指定中心（None 表示全部中心）的计数。只读：缺少缓存行的中心（如新建中心）
+    临时聚合计入，不在读请求中写库；缓存行由写入路径（_bump）或 rebuild_center_stats 补建。
+    """
+    missing_q = (
+        db.query(Center.id)
+        .outerjoin(CenterStats, CenterStats.center_id == Center.id)
+        .filter(CenterStats.center_id.is_(None))
+    )
+    if center_ids is not None:
+        missing_q = missing_q.filter(Center.id.in_(center_ids))
+    missing = [cid for (cid,) in missing_q]
+
+    query = db.query(*[func.coalesce(func.sum(getattr(CenterStats, c)), 0) for c in COUNTER_COLUMNS])
+    if center_ids is not None:
+        query = query.filter(CenterStats.center_id.in_(center_ids))
+    totals = dict(zip(COUNTER_COLUMNS, (int(v) for v in query.one())))
+    for counts in (_aggregate(db, missing) if missing else {}).values():
+        for column, value in counts.items():
+            totals[column] += value
+    return totals
+
+
+def rebuild_center_stats(db: Session) -> None:
+    """清空并按当前数据重建全部中心的计数（调用方负责 commit）"""
+    db.query(CenterStats).delete(synchronize_session=False)
+    _build_rows(db, [cid for (cid,) in db.query(Center.id)])
@@ -0,0 +1,81 @@
+"""
+单行表单的原生 upsert：一条语句完成"有则更新、无则插入"。
+
+MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite / PostgreSQL 使用
+INSERT ... ON CONFLICT DO UPDATE；其他方言退回到先查后写。
+"""
+from typing import Callable, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_DIALECT_INSERTS = {
+    "mysql": mysql.insert,
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# derived(merged) -> {列名: 更新分支的 SQL 表达式}
+# merged(列名) 给出"本次提交值优先、否则沿用已有值"的表达式，用于在同一语句内计算派生列
+DerivedUpdates = Callable[[Callable[[str], object]], Dict[str, object]]
+
+
+def upsert_row(
+    db: Session,
+    model_cls,
+    key: dict,
+    values: dict,
+    derived: Optional[DerivedUpdates] = None,
+) -> None:
+    """
+    按唯一键 key 写入一行（调用方负责 commit）。
+    插入分支写入 key + values；更新分支只覆盖 values 中出现的列，
+    并按 derived 在同一语句中重算派生列。
+    """
+    table = model_cls.__table__
+    dialect = db.get_bind().dialect.name
+    make_insert = _DIALECT_INSERTS.get(dialect)
+    if make_insert is None:
+        _select_then_write(db, model_cls, key, values, derived)
+        return
+
+    stmt = make_insert(table).values(**key, **values)
+    incoming = stmt.inserted if dialect == "mysql" else stmt.excluded
+
+    def merged(name):
+        if name in values:
+            return func.coalesce(incoming[name], table.c[name])
+        return table.c[name]
+
+    # 派生列放在最前：MySQL 按顺序赋值，后面的赋值会看到前面已更新的列
+    derived_updates = derived(merged) if derived else {}
+    updates = list(derived_updates.items())
+    updates += [
+        (name, incoming[name]) for name in values
+        if name not in key and name not in derived_updates
+    ]
+    if not updates:
+        first_key = next(iter(key))
+        updates = [(first_key, table.c[first_key])]
+
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(updates)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=dict(updates))
+    db.execute(stmt)
+
+
+def _select_then_write(db: Session, model_cls, key: dict, values: dict, derived) -> None:
+    obj = db.query(model_cls).filter_by(**key).first()
+    if obj is None:
+        db.add(model_cls(**key, **values))
+        return
+    for k, v in values.items():
+        setattr(obj, k, v)
+    if derived:
+        db.flush()
+        table = model_cls.__table__
+        exprs = derived(lambda name: table.c[name])
+        db.query(model_cls).filter_by(**key).update(
+            {table.c[k]: expr for k, expr in exprs.items()}, synchronize_session="fetch"
+        )
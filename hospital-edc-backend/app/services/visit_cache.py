@@ -0,0 +1,129 @@
+"""
+已签名 / 已锁定访视的 all-forms 只读缓存。
+
+缓存内容是序列化后的 JSON 字节，按 (visit_id, version) 命中：version 随访视或
+任一表单写入而递增（见 app/services/visit_events.py），旧版本永远不会再被命中。
+
+- 内存层：按字节数上限做 LRU 淘汰；
+- 磁盘层（可选，VISIT_CACHE_DIR）：文件名带 version，多进程共享也不会读到旧数据，
+  进程重启后可直接复用；总大小超过 VISIT_CACHE_DISK_MAX_BYTES 时按修改时间清理。
+
+version 始终由调用方查库取得（app/etag.py）：解锁、修改与批量重算都会递增 version，
+而 invalidate 只作用于本进程，多 worker 部署时其他进程的内存层须靠 version 不匹配来淘汰旧内容。
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+
+FROZEN_STATUSES = ("signed", "locked")
+
+
+class VisitFormsCache:
+    def __init__(self, max_bytes: int, disk_dir: str = "", disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()   # visit_id -> (version, status, body)
+        self._bytes = 0
+        self._disk_written = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    #  内存层
+    def _remember(self, visit_id: int, version: int, status: str, body: bytes) -> None:
+        with self._lock:
+            old = self._entries.pop(visit_id, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            if len(body) > self.max_bytes:
+                return
+            self._entries[visit_id] = (version, status, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get(self, visit_id: int, version: int) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(visit_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(visit_id)
+                return entry[2]
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(visit_id, version), "rb") as f:
+                status, body = f.read().split(b"\n", 1)
+        except (OSError, ValueError):
+            return None
+        self._remember(visit_id, version, status.decode(), body)
+        return body
+
+    def put(self, visit_id: int, version: int, status: str, body: bytes) -> None:
+        if status not in FROZEN_STATUSES:
+            return
+        self._remember(visit_id, version, status, body)
+        if self.disk_dir:
+            self._write_disk(visit_id, version, status, body)
+
+    def invalidate(self, visit_id: int) -> None:
+        """访视或其表单写入、删除时调用"""
+        with self._lock:
+            entry = self._entries.pop(visit_id, None)
+            if entry is not None:
+                self._bytes -= len(entry[2])
+        if entry is not None and self.disk_dir:
+            try:
+                os.remove(self._path(visit_id, entry[0]))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    #  磁盘层
+    def _path(self, visit_id: int, version: int) -> str:
+        return os.path.join(self.disk_dir, f"{visit_id}-{version}.json")
+
+    def _write_disk(self, visit_id: int, version: int, status: str, body: bytes) -> None:
+        path = self._path(visit_id, version)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(status.encode() + b"\n" + body)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._disk_written += len(body)
+        # 每写入约 1/10 上限的数据清理一次，避免每次写入都扫描目录
+        if self.disk_max_bytes and self._disk_written * 10 >= self.disk_max_bytes:
+            self._disk_written = 0
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+            stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in files]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+visit_forms_cache = VisitFormsCache(
+    max_bytes=settings.VISIT_CACHE_MAX_BYTES,
+    disk_dir=settings.VISIT_CACHE_DIR,
+    disk_max_bytes=settings.VISIT_CACHE_DISK_MAX_BYTES,
+)
@@ -0,0 +1,98 @@
+from typing import Optional
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from app.models.forms import LabResults, PhysicalExam
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.services.change_log import record_change, record_changes
+from app.services.completeness import drop_completeness, init_completeness, refresh_completeness
+from app.services.daily_stats import visit_daily_changed
+from app.services.edit_checks import check_patients
+from app.services.patient_summary import refresh_patient_summary
+from app.services.stats import bump_visit_status
+from app.services.visit_cache import visit_forms_cache
+
+# 写入后需要重新运行数据核查的表单
+CHECKED_MODELS = {PhysicalExam, LabResults}
+
+
+def _bump_visit_version(db: Session, visit_id: int) -> None:
+    db.query(Visit).filter(Visit.id == visit_id).update(
+        {Visit.version: Visit.version + 1}, synchronize_session=False
+    )
+
+
+def visit_changed(db: Session, visit: Visit, old_status: Optional[str], new_status: Optional[str]) -> None:
+    """
+    访视新增（old_status=None）、修改或删除（new_status=None）后，
+    在同一事务内同步各处冗余数据（调用方负责 commit）
+    """
+    # 改期前的访视日期：须在下面 flush 之前从属性历史中读取
+    old_dates = inspect(visit).attrs.visit_date.history.deleted
+    old_date = old_dates[0] if old_dates else visit.visit_date
+    center_id = db.query(Patient.center_id).filter(Patient.id == visit.patient_id).scalar()
+    if new_status is None:
+        # 须在下面 flush 删除访视之前删除引用它的完整度行
+        drop_completeness(db, visit.id)
+    refresh_patient_summary(db, visit.patient_id)
+    if old_status is None:
+        init_completeness(db, visit, center_id)
+    bump_visit_status(db, center_id, old_status, new_status)
+    visit_daily_changed(db, center_id, old_date, old_status, visit.visit_date, new_status)
+    if old_status is not None and new_status is not None:
+        _bump_visit_version(db, visit.id)
+    if old_status is not None:
+        visit_forms_cache.invalidate(visit.id)
+    op = "insert" if old_status is None else "delete" if new_status is None else "update"
+    record_change(db, "visits", op, center_id, visit.patient_id, visit.id)
+    if old_status is not None:
+        # 访视日期变化影响日期核查与跨访视比较；删除时关闭该访视的疑问
+        check_patients(db, [visit.patient_id])
+
+
+def forms_changed(db: Session, visit_id: int, *models) -> None:
+    """访视下表单写入后调用，models 为本次写入的表单 Model（调用方负责 commit）"""
+    _bump_visit_version(db, visit_id)
+    visit_forms_cache.invalidate(visit_id)
+    patient_id, center_id = (
+        db.query(Visit.patient_id, Patient.center_id)
+        .join(Patient, Patient.id == Visit.patient_id)
+        .filter(Visit.id == visit_id)
+        .one()
+    )
+    record_changes(db, [
+        {"table_name": model.__tablename__, "op": "upsert", "center_id": center_id,
+         "patient_id": patient_id, "visit_id": visit_id}
+        for model in dict.fromkeys(models)
+    ])
+    refresh_completeness(db, visit_id, models)
+    if CHECKED_MODELS.intersection(models):
+        check_patients(db, [patient_id])
+
+
+def forms_recomputed(db: Session, model, visit_ids, batch_size: int = 1000) -> None:
+    """
+    批量重算派生列（BMI、eGFR、问卷总分等）后调用，visit_ids 为实际改写的访视（调用方负责 commit）。
+    完整度只统计录入字段，派生列变化不影响；核查规则可能引用派生列，按患者重新核查。
+    """
+    visit_ids = sorted(set(visit_ids))
+    for start in range(0, len(visit_ids), batch_size):
+        chunk = visit_ids[start:start + batch_size]
+        db.query(Visit).filter(Visit.id.in_(chunk)).update(
+            {Visit.version: Visit.version + 1}, synchronize_session=False
+        )
+        for visit_id in chunk:
+            visit_forms_cache.invalidate(visit_id)
+        rows = (
+            db.query(Visit.id, Visit.patient_id, Patient.center_id)
+            .join(Patient, Patient.id == Visit.patient_id)
+            .filter(Visit.id.in_(chunk))
+            .all()
+        )
+        record_changes(db, [
+            {"table_name": model.__tablename__, "op": "upsert", "center_id": r.center_id,
+             "patient_id": r.patient_id, "visit_id": r.id}
+            for r in rows
+        ])
+        if model in CHECKED_MODELS:
+            check_patients(db, sorted({r.patient_id for r in rows}))
@@ -0,0 +1,99 @@
+"""
+患者搜索基准测试：对比 LIKE '%x%' 全表扫描与后缀索引查找。
+
+默认在临时 SQLite 库中生成 1,000,000 名患者；也可用 --database-url 指向一个空的 MySQL 测试库。
+    python scripts/bench_patient_search.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.center import Center
+from app.models.patient import Patient, PatientSearchToken
+from app.services.patient_search import patient_tokens, search_filter
+
+CHUNK = 20000
+
+
+def _populate(db, rows: int) -> None:
+    rng = random.Random(42)
+    db.execute(insert(Center), [{"id": i, "center_code": f"CHN-{i:03d}", "center_name": f"C{i}"} for i in range(1, 21)])
+    for start in range(1, rows + 1, CHUNK):
+        patients, tokens = [], []
+        for pid in range(start, min(start + CHUNK, rows + 1)):
+            center = rng.randint(1, 20)
+            code = f"CHN-{center:03d}-{pid:06d}"
+            initials = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 3)))
+            patients.append({
+                "id": pid, "patient_code": code, "center_code": f"CHN-{center:03d}",
+                "center_id": center, "name_initials": initials, "gender": "male",
+            })
+            tokens.extend({"token": t, "patient_id": pid} for t in patient_tokens(code, initials))
+        db.execute(insert(Patient), patients)
+        db.execute(insert(PatientSearchToken), tokens)
+        db.commit()
+        print(f"  populated {min(start + CHUNK - 1, rows)}/{rows}", end="\r")
+    print()
+
+
+def _time(db, criterion, repeat: int) -> tuple:
+    samples, hits = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        hits = len(db.query(Patient.id).filter(criterion).order_by(Patient.id.desc()).limit(51).all())
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), hits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark patient substring search.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic patients.")
+    parser.add_argument("--database-url", default=None, help="Empty database to use (default: temp SQLite file).")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="edc-bench-")
+        url = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+
+    engine = create_engine(url)
+    tables = [Center.__table__, Patient.__table__, PatientSearchToken.__table__]
+    Patient.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+    try:
+        print(f"Populating {args.rows} patients into {url} ...")
+        _populate(db, args.rows)
+
+        terms = ["CHN-007-0001", "000123", "-019-", "QX", "zzz"]
+        print(f"\n{'term':<16}{'LIKE %x% (ms)':>16}{'suffix index (ms)':>20}{'hits':>8}")
+        for term in terms:
+            legacy = Patient.patient_code.contains(term) | Patient.name_initials.contains(term)
+            legacy_ms, _ = _time(db, legacy, args.repeat)
+            indexed_ms, hits = _time(db, search_filter(term), args.repeat)
+            print(f"{term:<16}{legacy_ms:>16.1f}{indexed_ms:>20.1f}{hits:>8}")
+        return 0
+    finally:
+        db.close()
+        if tmpdir:
+            Patient.metadata.drop_all(engine, tables=tables)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""
+批量评分基准测试：逐行 Python 评分 vs numpy 整批评分，以及端到端重算（读取 + 比对 + 批量写回）。
+
+默认在临时 SQLite 库中生成 1,000,000 份 PHQ-9 / GAD-7 问卷（约 10% 总分过期）；
+也可用 --database-url 指向一个空的测试库。
+    python scripts/bench_rescore.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+import numpy as np
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.questionnaire import Questionnaire
+from app.services.batch_scoring import band_labels, questionnaire_totals, rescore_questionnaires
+from app.services.scoring import band_label, questionnaire_total
+
+CHUNK = 50000
+
+
+def _populate(db, rows: int) -> None:
+    rng = random.Random(42)
+    for start in range(0, rows, CHUNK):
+        batch = []
+        for i in range(start, min(start + CHUNK, rows)):
+            q_type = "phq9" if i % 2 == 0 else "gad7"
+            answers = {f"q{k}": rng.randint(0, 3) for k in range(1, (10 if q_type == "phq9" else 8))}
+            total = sum(answers.values())
+            if rng.random() < 0.1:
+                total += 1   # 模拟切点/逻辑变更后的过期总分
+            batch.append({"id": i + 1, "visit_id": i // 2 + 1, "questionnaire_type": q_type,
+                          "total_score": total, **answers})
+        db.execute(insert(Questionnaire), batch)
+        db.commit()
+        print(f"  populated {min(start + CHUNK, rows)}/{rows}", end="\r")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark batch questionnaire rescoring.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic questionnaires.")
+    parser.add_argument("--database-url", default=None, help="Empty database to use (default: temp SQLite file).")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="edc-bench-")
+        url = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+
+    engine = create_engine(url)
+    tables = [Questionnaire.__table__]
+    Questionnaire.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+    try:
+        print(f"Populating {args.rows} questionnaires into {url} ...")
+        _populate(db, args.rows)
+
+        cols = [Questionnaire.questionnaire_type] + [getattr(Questionnaire, f"q{k}") for k in range(1, 10)]
+        t0 = time.perf_counter()
+        rows = db.execute(select(*cols)).all()
+        load_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for r in rows:
+            total = questionnaire_total(r[0], dict(zip((f"q{k}" for k in range(1, 10)), r[1:])))
+            band_label(r[0], total)
+        python_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        types = np.array([r[0] for r in rows], dtype=object)
+        answers = np.array([r[1:] for r in rows], dtype=float)
+        convert_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        totals = questionnaire_totals(types, answers)
+        for q_type in ("phq9", "gad7"):
+            band_labels(q_type, totals[types == q_type])
+        numpy_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        summary = rescore_questionnaires(db, chunk_size=args.chunk_size)
+        end_to_end_s = time.perf_counter() - t0
+
+        print(f"\n{'step':<40}{'seconds':>10}")
+        print(f"{'load rows':<40}{load_s:>10.2f}")
+        print(f"{'score row by row (python)':<40}{python_s:>10.2f}")
+        print(f"{'rows -> numpy arrays':<40}{convert_s:>10.2f}")
+        print(f"{'score in bulk (numpy searchsorted)':<40}{numpy_s:>10.2f}")
+        print(f"{'rescore_questionnaires end to end':<40}{end_to_end_s:>10.2f}")
+        print(f"\nscanned {summary['scanned']}, updated {summary['updated']}")
+        return 0
+    finally:
+        db.close()
+        if tmpdir:
+            Questionnaire.metadata.drop_all(engine, tables=tables)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
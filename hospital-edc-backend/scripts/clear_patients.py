@@ -2,6 +2,8 @@ import argparse
 import sys
 from pathlib import Path
 
+import os
+
 from sqlalchemy import text
 
 # Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
@@ -9,19 +11,33 @@ BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+from app.config import settings
 from app.database import SessionLocal
 
 # Import models so metadata is available and table names stay centralized
 from app.models.consent import ConsentRecord
 from app.models.visit import Visit
-from app.models.patient import Patient
+from app.models.patient import Patient, PatientSearchToken, PatientCodeSequence
 from app.models.forms import PhysicalExam, LabResults, Comorbidity, CostIndicator
 from app.models.questionnaire import Questionnaire
 from app.models.medication import Medication
 from app.models.lifestyle import LifestyleAssessment, MealRecord
+from app.models.stats import CenterStats, CenterDailyStats, VisitCompleteness
+from app.models.change_log import ChangeLog
+from app.models.discrepancy import Discrepancy, SweepWatermark
 
 
 TABLES_IN_DELETE_ORDER = [
+    # Derived / cache tables (rebuilt from the tables below; some reference them by FK)
+    ("patient_search_tokens", PatientSearchToken),
+    ("visit_completeness", VisitCompleteness),
+    ("discrepancies", Discrepancy),
+    ("change_log", ChangeLog),
+    ("sweep_watermarks", SweepWatermark),
+    ("center_daily_stats", CenterDailyStats),
+    ("center_stats", CenterStats),
+    ("patient_code_sequences", PatientCodeSequence),
+    # Source data
     ("consent_records", ConsentRecord),
     ("questionnaires", Questionnaire),
     ("medications", Medication),
@@ -40,9 +56,25 @@ def _count_rows(db, table_name: str) -> int:
     return int(db.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar() or 0)
 
 
+def _clear_visit_cache_dir() -> int:
+    """Remove on-disk all-forms bodies; they are keyed by visit id and version, which may be reused."""
+    if not settings.VISIT_CACHE_DIR or not os.path.isdir(settings.VISIT_CACHE_DIR):
+        return 0
+    removed = 0
+    for entry in os.scandir(settings.VISIT_CACHE_DIR):
+        if entry.name.endswith(".json"):
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
-        description="Clear all patient-related data (patients, visits, forms, consent). Does NOT touch users.",
+        description=(
+            "Clear all patient-related data (patients, visits, forms, consent) and the tables derived "
+            "from it (search tokens, completeness, discrepancies, change log, center stats). "
+            "Does NOT touch users or centers. Restart the API afterwards to drop in-process caches."
+        ),
     )
     parser.add_argument(
         "--yes",
@@ -75,6 +107,7 @@ def main() -> int:
             print(f"  - deleted {deleted} from {name}")
 
         db.commit()
+        print(f"  - removed {_clear_visit_cache_dir()} cached all-forms files")
 
         print("\nPost-delete counts:")
         for name, _ in TABLES_IN_DELETE_ORDER:
@@ -0,0 +1,105 @@
+"""
+对各路由的热点查询执行 EXPLAIN，检查是否命中预期索引（支持 MySQL / SQLite）。
+    python scripts/explain_hot_queries.py            # 使用 .env 中的 DATABASE_URL
+    python scripts/explain_hot_queries.py --verbose  # 同时打印完整执行计划
+任一查询未命中预期索引时以退出码 1 结束，可用于部署前检查。
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from sqlalchemy import select, func, text
+
+from app.database import engine
+from app.models.patient import Patient
+from app.models.visit import Visit
+from app.models.questionnaire import Questionnaire
+from app.models.medication import Medication
+from app.models.lifestyle import MealRecord
+
+# (说明, 查询, 可接受的索引名)
+HOT_QUERIES = [
+    (
+        "patients.list_patient_visits / visits.list_visits",
+        select(Visit).where(Visit.patient_id == 1).order_by(Visit.visit_date, Visit.id),
+        {"ix_visits_patient_date"},
+    ),
+    (
+        "visits.create_visit 查重",
+        select(Visit.id).where(Visit.patient_id == 1, Visit.visit_type == "M6"),
+        {"ix_visits_patient_type"},
+    ),
+    (
+        "按访视状态统计",
+        select(func.count()).select_from(Visit).where(Visit.status == "draft"),
+        {"ix_visits_status"},
+    ),
+    (
+        "forms.get_questionnaire / save_questionnaire",
+        select(Questionnaire).where(Questionnaire.visit_id == 1, Questionnaire.questionnaire_type == "phq9"),
+        {"uq_questionnaires_visit_type"},
+    ),
+    (
+        "forms.get_medications / save_medications",
+        select(Medication).where(Medication.visit_id == 1),
+        {"ix_medications_visit_id"},
+    ),
+    (
+        "forms.get_meal_records / save_meal_records",
+        select(MealRecord).where(MealRecord.visit_id == 1),
+        {"ix_meal_records_visit_id"},
+    ),
+    (
+        "patients.list_patients（中心 + 状态过滤，id 倒序分页）",
+        select(Patient.id)
+        .where(Patient.center_id.in_([1]), Patient.status == "enrolled")
+        .order_by(Patient.id.desc())
+        .limit(21),
+        {"ix_patients_center_status_id"},
+    ),
+]
+
+
+def _explain(conn, stmt) -> tuple:
+    """返回 (执行计划中出现的索引名集合, 可读的执行计划文本)"""
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).mappings().all()
+        plan = [r["detail"] for r in rows]
+        # 形如 "SEARCH visits USING [COVERING ]INDEX ix_xxx (...)"
+        used = {m for line in plan for m in re.findall(r"USING (?:COVERING )?INDEX (\w+)", line)}
+        return used, "\n".join(plan)
+    rows = conn.execute(text("EXPLAIN " + sql)).mappings().all()
+    used = {r["key"] for r in rows if r.get("key")}
+    return used, "\n".join(str(dict(r)) for r in rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that hot router queries use their composite indexes.")
+    parser.add_argument("--verbose", action="store_true", help="Print full plans.")
+    args = parser.parse_args()
+
+    if engine.dialect.name not in ("mysql", "sqlite"):
+        print(f"Unsupported dialect: {engine.dialect.name}")
+        return 2
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt, expected in HOT_QUERIES:
+            used, plan = _explain(conn, stmt)
+            ok = bool(used & expected)
+            failures += not ok
+            print(f"[{'OK' if ok else 'MISS'}] {label}: 使用 {sorted(used) or '无索引'}，期望 {sorted(expected)}")
+            if args.verbose or not ok:
+                print("    " + plan.replace("\n", "\n    "))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
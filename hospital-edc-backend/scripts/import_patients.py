@@ -0,0 +1,46 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.patient_import import import_patients, parse_patient_file
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Bulk-enroll patients from a CSV (header row = PatientCreate fields) or JSON array.",
+    )
+    parser.add_argument("path", help="CSV or JSON file to import.")
+    parser.add_argument("--center-id", type=int, default=None, help="Center for rows without a center_id column.")
+    parser.add_argument("--created-by", type=int, default=None, help="User id recorded as creator.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction.")
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    rows = parse_patient_file(path.name, path.read_bytes())
+
+    db = SessionLocal()
+    try:
+        result = import_patients(
+            db, rows,
+            default_center_id=args.center_id,
+            created_by=args.created_by,
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        db.close()
+
+    print(f"Inserted {result['inserted']} of {len(rows)} rows.")
+    for err in result["errors"]:
+        print(f"  row {err['row']}: {'; '.join(err['errors'])}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
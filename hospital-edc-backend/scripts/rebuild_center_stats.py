@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.stats import rebuild_center_stats
+
+
+def main() -> int:
+    """Drop and recompute the per-center dashboard counters."""
+    db = SessionLocal()
+    try:
+        rebuild_center_stats(db)
+        db.commit()
+        print("Center stats rebuilt.")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
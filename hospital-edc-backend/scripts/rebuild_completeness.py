@@ -0,0 +1,36 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.completeness import rebuild_completeness
+
+
+def main() -> int:
+    """Drop and recompute the visit completeness matrix from the form tables."""
+    parser = argparse.ArgumentParser(description="Rebuild the visit x CRF-section completeness matrix.")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Visits processed per batch.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        n = rebuild_completeness(db, chunk_size=args.chunk_size)
+        print(f"Completeness rebuilt for {n} visits in {time.perf_counter() - t0:.1f}s.")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
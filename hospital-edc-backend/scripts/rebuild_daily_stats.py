@@ -0,0 +1,32 @@
+import sys
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.daily_stats import rebuild_daily_stats
+
+
+def main() -> int:
+    """Backfill center_daily_stats from patients.enrollment_date and visits.visit_date/status."""
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        n = rebuild_daily_stats(db)
+        db.commit()
+        print(f"Daily stats rebuilt: {n} (center, day) rows in {time.perf_counter() - t0:.1f}s.")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.patient_summary import rebuild_all_summaries
+
+
+def main() -> int:
+    """Recompute has_submitted / has_consent / latest_visit_status for every patient."""
+    db = SessionLocal()
+    try:
+        rebuild_all_summaries(db)
+        db.commit()
+        print("Patient summary rebuilt.")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
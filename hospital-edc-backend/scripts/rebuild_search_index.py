@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.patient_search import rebuild_search_index
+
+
+def main() -> int:
+    """Rebuild the patient_code / name_initials suffix index used by patient search."""
+    db = SessionLocal()
+    try:
+        done = rebuild_search_index(db)
+        print(f"Indexed {done} patients.")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""
+全库重算派生临床变量：体格检查的 BMI / 腰臀比 / 血压分级，化验结果的 eGFR（CKD-EPI 2021）。
+
+    python scripts/recompute_derived.py              # 全部重算并写回
+    python scripts/recompute_derived.py --dry-run    # 只统计需要更新的行数
+    python scripts/recompute_derived.py --only labs
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.derived import recompute_lab_results, recompute_physical_exams
+
+TARGETS = {
+    "physical": recompute_physical_exams,
+    "labs": recompute_lab_results,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute derived clinical variables in bulk.")
+    parser.add_argument("--only", choices=sorted(TARGETS), help="Recompute a single table.")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read per batch.")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for name, recompute in TARGETS.items():
+            if args.only and name != args.only:
+                continue
+            t0 = time.perf_counter()
+            summary = recompute(db, chunk_size=args.chunk_size, dry_run=args.dry_run)
+            verb = "would update" if args.dry_run else "updated"
+            print(f"{name}: scanned {summary['scanned']}, {verb} {summary['updated']}, "
+                  f"skipped {summary['skipped']} on signed/locked visits in {time.perf_counter() - t0:.1f}s")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+"""
+批量重算问卷总分、EQ-5D-5L 效用值与生活方式评分（修改切点、切换价值集或导入历史数据后运行）。
+
+    python scripts/rescore.py                 # 全部重算并写回
+    python scripts/rescore.py --dry-run       # 只统计需要更新的行数
+    python scripts/rescore.py --only lifestyle
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.batch_scoring import rescore_lifestyle, rescore_questionnaires
+
+TARGETS = {
+    "questionnaires": rescore_questionnaires,
+    "lifestyle": rescore_lifestyle,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute questionnaire and lifestyle scores in bulk.")
+    parser.add_argument("--only", choices=sorted(TARGETS), help="Rescore a single table.")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read per batch.")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for name, rescore in TARGETS.items():
+            if args.only and name != args.only:
+                continue
+            t0 = time.perf_counter()
+            summary = rescore(db, chunk_size=args.chunk_size, dry_run=args.dry_run)
+            verb = "would update" if args.dry_run else "updated"
+            print(f"{name}: scanned {summary.pop('scanned')}, {verb} {summary.pop('updated')}, "
+                  f"skipped {summary.pop('skipped')} on signed/locked visits in {time.perf_counter() - t0:.1f}s")
+            for key, count in sorted(summary.items()):
+                print(f"  {key:<24}{count:>10}")
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure `hospital-edc-backend` is on sys.path even if run from another CWD.
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401
+from app.services.edit_checks import RULES, run_sweep
+
+
+def main() -> int:
+    """Run the edit-check rules and sync the discrepancies table."""
+    parser = argparse.ArgumentParser(description="Run range / consistency edit checks over visit data.")
+    parser.add_argument("--full", action="store_true",
+                        help="Check every patient instead of only those changed since the last sweep.")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Patients checked (and committed) per batch.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        summary = run_sweep(db, full=args.full, chunk_size=args.chunk_size)
+        print(
+            f"Checked {summary['patients']} patients against {len(RULES)} rules in {time.perf_counter() - t0:.1f}s: "
+            f"{summary['opened']} opened, {summary['resolved']} resolved (watermark {summary['watermark']})."
+        )
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
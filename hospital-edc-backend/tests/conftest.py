@@ -0,0 +1,55 @@
+"""
+测试使用临时 SQLite 库：每个用例前重建全部表并写入两个中心与三个用户，
+清空进程内缓存。运行：在 hospital-edc-backend 目录下执行 python -m pytest
+"""
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="edc-test-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "edc.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+import app.models as m  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.dependencies import hash_password  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.longitudinal import longitudinal_cache  # noqa: E402
+from app.services.visit_cache import visit_forms_cache  # noqa: E402
+
+
+@pytest.fixture
+def centers():
+    """(C1, C2) 中心 id；用户 admin（总管理员）、r1（C1 研究者）、ca2（C2 中心管理员）"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    visit_forms_cache.clear()
+    longitudinal_cache.clear()
+    db = SessionLocal()
+    c1 = m.Center(center_code="CHN-017", center_name="北京")
+    c2 = m.Center(center_code="CHN-018", center_name="上海")
+    db.add_all([c1, c2])
+    db.flush()
+    password = hash_password("x")
+    db.add_all([
+        m.User(username="admin", hashed_password=password, role="main_admin", center_id=c1.id),
+        m.User(username="r1", hashed_password=password, role="researcher", center_id=c1.id),
+        m.User(username="ca2", hashed_password=password, role="center_admin", center_id=c2.id),
+    ])
+    db.commit()
+    ids = (c1.id, c2.id)
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def db(centers):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(centers):
+    return TestClient(app)
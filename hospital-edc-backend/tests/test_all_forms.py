@@ -0,0 +1,80 @@
+from fastapi import HTTPException
+from app.models.change_log import ChangeLog
+from app.models.forms import PhysicalExam
+from app.models.visit import Visit
+from app.routers import forms
+from tests.utils import auth, create_patient, create_visit
+
+
+def _all_forms(client, vid):
+    r = client.get(f"/api/visits/{vid}/all-forms", headers=auth())
+    assert r.status_code == 200, r.text
+    return r.json(), int(r.headers["x-db-queries"])
+
+
+def _fill(client, vid, n):
+    payload = {
+        "physical_exam": {"weight_kg": 70, "height_cm": 175},
+        "medications": [{"drug_name": f"drug-{i}"} for i in range(n)],
+        "meal_records": [{"dish_name": f"dish-{i}"} for i in range(n)],
+        "questionnaires": [{"questionnaire_type": t, "q1": 1} for t in ("phq9", "gad7", "dtsq")[:n]],
+    }
+    r = client.post(f"/api/visits/{vid}/all-forms", json=payload, headers=auth())
+    assert r.status_code == 200, r.text
+
+
+def test_all_forms_query_count_is_independent_of_row_counts(client):
+    pid = create_patient(client)["id"]
+    small, large = create_visit(client, pid)["id"], create_visit(client, pid, "M6", "2026-07-01")["id"]
+    _fill(client, small, 1)
+    _fill(client, large, 3)
+    small_body, small_queries = _all_forms(client, small)
+    large_body, large_queries = _all_forms(client, large)
+    assert small_queries == large_queries
+    assert len(large_body["medications"]) == 3 and len(large_body["meal_records"]) == 3
+    assert set(large_body["questionnaires"]) == {"phq9", "gad7", "dtsq"}
+    assert large_body["physical_exam"]["bmi"] == small_body["physical_exam"]["bmi"] == 22.9
+    assert large_body["visit"]["id"] == large
+
+
+def test_all_forms_of_empty_visit(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    body, _ = _all_forms(client, vid)
+    assert body["physical_exam"] is None and body["medications"] == [] and body["questionnaires"] == {}
+    assert client.get("/api/visits/999999/all-forms", headers=auth()).status_code == 404
+
+
+def _state(db, vid):
+    db.expire_all()
+    return (
+        db.query(Visit.version).filter(Visit.id == vid).scalar(),
+        db.query(PhysicalExam).filter(PhysicalExam.visit_id == vid).count(),
+        db.query(ChangeLog).filter(ChangeLog.visit_id == vid).count(),
+    )
+
+
+def test_failed_section_rolls_back_the_whole_save(client, db, monkeypatch):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    before = _state(db, vid)
+
+    def _fail(*args):
+        raise HTTPException(400, "膳食记录有误")
+
+    monkeypatch.setattr(forms, "_save_meal_records", _fail)
+    r = client.post(f"/api/visits/{vid}/all-forms", json={
+        "physical_exam": {"weight_kg": 70},
+        "medications": [{"drug_name": "metformin"}],
+        "meal_records": [{"dish_name": "rice"}],
+    }, headers=auth())
+    assert r.status_code == 400
+    assert _state(db, vid) == before
+    assert client.get(f"/api/visits/{vid}/medications", headers=auth()).json() == []
+
+
+def test_save_bumps_version_once_for_all_sections(client, db):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    version = _state(db, vid)[0]
+    _fill(client, vid, 2)
+    assert _state(db, vid)[0] == version + 1
+    r = client.post(f"/api/visits/{vid}/all-forms", json={"lab_results": {"hba1c": 7}}, headers=auth())
+    assert r.json()["results"] == {"lab_results": {"egfr": None}}
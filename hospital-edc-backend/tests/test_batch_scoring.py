@@ -0,0 +1,50 @@
+from sqlalchemy import text
+from app.models.change_log import ChangeLog
+from app.models.lifestyle import LifestyleAssessment
+from app.models.questionnaire import Questionnaire
+from app.services.batch_scoring import rescore_lifestyle, rescore_questionnaires
+from tests.utils import auth, create_patient, create_visit, set_visit_status
+
+
+def _phq9(client, visit_id, answer=2):
+    r = client.post(f"/api/visits/{visit_id}/questionnaire", json={
+        "questionnaire_type": "phq9", **{f"q{i}": answer for i in range(1, 10)},
+    }, headers=auth())
+    assert r.status_code == 200, r.text
+
+
+def test_rescore_fixes_stale_totals_and_skips_frozen_visits(client, db):
+    pid = create_patient(client)["id"]
+    vid = create_visit(client, pid)["id"]
+    locked = create_visit(client, pid, "M6", "2026-07-05")["id"]
+    _phq9(client, vid)
+    _phq9(client, locked)
+    set_visit_status(client, locked, "locked")
+    etag = client.get(f"/api/visits/{vid}/questionnaire/phq9", headers=auth()).headers["etag"]
+    db.execute(text("UPDATE questionnaires SET total_score = 0"))
+    db.commit()
+    changes_before = db.query(ChangeLog).count()
+
+    summary = rescore_questionnaires(db)
+    assert (summary["scanned"], summary["updated"], summary["skipped"]) == (2, 1, 1)
+    assert not any(key.endswith(":None") for key in summary)
+    assert sum(n for key, n in summary.items() if key.startswith("phq9:")) == 2
+
+    totals = dict(db.query(Questionnaire.visit_id, Questionnaire.total_score))
+    assert totals == {vid: 18, locked: 0}
+    r = client.get(f"/api/visits/{vid}/questionnaire/phq9", headers={**auth(), "If-None-Match": etag})
+    assert r.status_code == 200
+    assert db.query(ChangeLog).count() == changes_before + 1
+
+
+def test_rescore_lifestyle_recomputes_levels(client, db):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/lifestyle", json={"diet_scores": [3] * 10}, headers=auth())
+    expected = db.query(LifestyleAssessment.diet_total, LifestyleAssessment.diet_level).one()
+    db.execute(text("UPDATE lifestyle_assessments SET diet_total = NULL, diet_level = NULL"))
+    db.commit()
+
+    assert rescore_lifestyle(db)["updated"] == 1
+    db.expire_all()
+    assert db.query(LifestyleAssessment.diet_total, LifestyleAssessment.diet_level).one() == expected
+    assert rescore_lifestyle(db)["updated"] == 0
@@ -0,0 +1,57 @@
+from app.models.center import Center
+from app.models.stats import CenterStats
+from app.services.stats import COUNTER_COLUMNS, _aggregate, get_center_stats
+from tests.utils import auth, create_patient, create_visit, set_visit_status
+
+
+def _assert_counters_match_source(db, center_ids):
+    db.expire_all()
+    fresh = _aggregate(db, center_ids)
+    for cid in center_ids:
+        assert get_center_stats(db, [cid]) == fresh.get(cid, dict.fromkeys(COUNTER_COLUMNS, 0)), cid
+
+
+def test_counters_track_writes(client, db, centers):
+    c1, c2 = centers
+    p1 = create_patient(client, center_id=c1)["id"]
+    p2 = create_patient(client, center_id=c2)["id"]
+    v1 = create_visit(client, p1)["id"]
+    v2 = create_visit(client, p1, "M6", "2026-07-01")["id"]
+    create_visit(client, p2)
+    client.post(f"/api/visits/{v1}/submit", headers=auth())
+    set_visit_status(client, v1, "signed")
+    client.delete(f"/api/visits/{v2}", headers=auth())
+
+    stats = client.get("/api/patients/stats", headers=auth()).json()
+    assert stats == {"total_patients": 2, "enrolled": 2, "pending_entry": 1, "pending_sign": 0}
+    assert client.get("/api/patients/stats", headers=auth("r1")).json()["pending_entry"] == 0
+    _assert_counters_match_source(db, centers)
+
+
+def test_transfer_moves_counts_between_centers(client, db, centers):
+    c1, c2 = centers
+    pid = create_patient(client, center_id=c1)["id"]
+    create_visit(client, pid)
+    client.get("/api/patients/stats", headers=auth())
+    r = client.put(f"/api/patients/{pid}", json={"center_id": c2}, headers=auth())
+    assert r.status_code == 200, r.text
+    assert client.get("/api/patients/stats", headers=auth("r1")).json()["total_patients"] == 0
+    assert client.get("/api/patients/stats", headers=auth("ca2")).json() == {
+        "total_patients": 1, "enrolled": 1, "pending_entry": 1, "pending_sign": 0,
+    }
+    _assert_counters_match_source(db, centers)
+
+
+def test_reading_stats_does_not_write_or_commit(client, db, centers):
+    create_patient(client, center_id=centers[0])
+    db.query(CenterStats).delete()
+    db.commit()
+    db.add(Center(center_code="CHN-099", center_name="未提交"))
+    db.flush()
+
+    assert get_center_stats(db, None)["total_patients"] == 1
+    db.rollback()
+    assert db.query(Center).filter(Center.center_code == "CHN-099").count() == 0
+    assert db.query(CenterStats).count() == 0
+    assert client.get("/api/patients/stats", headers=auth()).json()["total_patients"] == 1
+    assert db.query(CenterStats).count() == 0
@@ -0,0 +1,59 @@
+from sqlalchemy.exc import IntegrityError
+from app.database import SessionLocal
+from app.models.center import Center
+from app.models.change_log import ChangeLog
+from app.services import change_log
+from app.services.change_log import changes_since, record_change
+from tests.utils import auth, create_patient, create_visit
+
+
+def _rows(db):
+    return [(r.table_name, r.op, r.patient_id) for r in db.query(ChangeLog).order_by(ChangeLog.id)]
+
+
+def test_ids_are_assigned_in_commit_order(db, centers):
+    """先登记、后提交的事务拿到更大的 id，读者越过的 id 之前不会再出现新行"""
+    slow, fast = SessionLocal(), SessionLocal()
+    try:
+        record_change(slow, "patients", "update", centers[0], 1)
+        record_change(fast, "patients", "update", centers[0], 2)
+        fast.commit()
+        slow.commit()
+    finally:
+        slow.close()
+        fast.close()
+    assert [r[2] for r in _rows(db)] == [2, 1]
+
+
+def test_rollback_discards_pending_changes_but_savepoint_does_not(db, centers):
+    record_change(db, "patients", "update", centers[0], 1)
+    db.rollback()
+    record_change(db, "patients", "update", centers[0], 2)
+    try:
+        with db.begin_nested():
+            db.add(Center(center_code="CHN-017", center_name="重复"))
+    except IntegrityError:
+        pass
+    db.commit()
+    assert _rows(db) == [("patients", "update", 2)]
+
+
+def test_feed_returns_settled_changes_in_order(client, db, monkeypatch):
+    monkeypatch.setattr(change_log.settings, "CHANGE_FEED_SETTLE_SECONDS", 0)
+    pid = create_patient(client)["id"]
+    vid = create_visit(client, pid)["id"]
+    client.post(f"/api/visits/{vid}/physical-exam", json={"weight_kg": 70}, headers=auth())
+    rows, next_since, has_more = changes_since(db, 0, 2)
+    assert [(r.table_name, r.op) for r in rows] == [("patients", "insert"), ("visits", "insert")]
+    assert has_more
+    rows, _, has_more = changes_since(db, next_since, 10)
+    assert [(r.table_name, r.visit_id) for r in rows] == [("physical_exams", vid)]
+    assert not has_more
+
+
+def test_unsettled_changes_are_held_back(client, db, monkeypatch):
+    monkeypatch.setattr(change_log.settings, "CHANGE_FEED_SETTLE_SECONDS", 3600)
+    create_patient(client)
+    assert changes_since(db, 0)[0] == []
+    body = client.get("/api/changes/?since=0", headers=auth()).json()
+    assert body == {"changes": [], "next": 0, "has_more": False}
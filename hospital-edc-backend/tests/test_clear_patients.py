@@ -0,0 +1,30 @@
+import importlib.util
+import sys
+from pathlib import Path
+from app.database import Base
+from tests.utils import auth, create_patient, create_visit
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "clear_patients.py"
+
+
+def _load_script():
+    spec = importlib.util.spec_from_file_location("clear_patients", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_clear_covers_every_table_referencing_patient_data(client, db, monkeypatch):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": 15}, headers=auth())
+
+    script = _load_script()
+    monkeypatch.setattr(sys, "argv", ["clear_patients.py", "--yes"])
+    assert script.main() == 0
+
+    cleared = {name for name, _ in script.TABLES_IN_DELETE_ORDER}
+    kept = {"users", "centers", "invitation_codes", "alembic_version"}
+    assert set(Base.metadata.tables) - kept <= cleared
+    for name in cleared:
+        assert script._count_rows(db, name) == 0, name
+    assert client.get("/api/patients/", headers=auth()).json()["total"] == 0
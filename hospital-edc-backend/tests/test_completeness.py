@@ -0,0 +1,41 @@
+from tests.utils import auth, create_patient, create_visit
+
+# 已发布的位序契约：第 i 位对应 sections[i]
+PUBLISHED_SECTIONS = [
+    "basic", "comorbidity", "medication", "cost", "eq5d", "dtsq", "phq9", "gad7", "diet", "exercise", "meal",
+]
+
+
+def _visit_row(client, vid):
+    items = client.get("/api/analytics/completeness/visits", headers=auth()).json()["items"]
+    return next(i for i in items if i["visit_id"] == vid)
+
+
+def test_section_bits_follow_the_published_order(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    page = client.get("/api/analytics/completeness/visits", headers=auth()).json()
+    assert page["sections"] == PUBLISHED_SECTIONS
+    assert _visit_row(client, vid)["section_mask"] == 0
+
+    client.post(f"/api/visits/{vid}/medications", json={"medications": [{"drug_name": "metformin"}]}, headers=auth())
+    client.post(f"/api/visits/{vid}/questionnaire", json={"questionnaire_type": "phq9", "q1": 1}, headers=auth())
+    row = _visit_row(client, vid)
+    assert row["section_mask"] == (1 << PUBLISHED_SECTIONS.index("medication")) | (1 << PUBLISHED_SECTIONS.index("phq9"))
+    assert row["ratios"]["medication"] == 1 and 0 < row["ratios"]["phq9"] < 1
+
+    ids = client.get(f"/api/visits/{vid}/medications", headers=auth()).json()
+    client.post(f"/api/visits/{vid}/medications", json={"medications": []}, headers=auth())
+    assert ids and _visit_row(client, vid)["section_mask"] == 1 << PUBLISHED_SECTIONS.index("phq9")
+
+
+def test_rollup_matches_matrix_and_missing_filter(client):
+    a = create_visit(client, create_patient(client)["id"])["id"]
+    b = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{a}/medications", json={"medications": [{"drug_name": "x"}]}, headers=auth())
+
+    groups = client.get("/api/analytics/completeness", headers=auth()).json()["groups"]
+    assert sum(g["visits"] for g in groups) == 2
+    assert sum(g["sections"]["medication"]["visits_with_data"] for g in groups) == 1
+
+    missing = client.get("/api/analytics/completeness/visits", params={"missing": "medication"}, headers=auth()).json()
+    assert [i["visit_id"] for i in missing["items"]] == [b]
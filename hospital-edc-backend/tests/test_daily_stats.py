@@ -0,0 +1,57 @@
+from datetime import date
+from app.models.stats import CenterDailyStats
+from app.services.daily_stats import COUNTER_COLUMNS, rebuild_daily_stats
+from tests.utils import auth, create_patient, create_visit, set_visit_status
+
+
+def _snapshot(db):
+    db.expire_all()
+    rows = db.query(CenterDailyStats).all()
+    return {
+        (r.center_id, r.day): tuple(getattr(r, c) for c in COUNTER_COLUMNS)
+        for r in rows if any(getattr(r, c) for c in COUNTER_COLUMNS)
+    }
+
+
+def test_incremental_rollups_match_a_full_rebuild(client, db, centers):
+    c1, c2 = centers
+    a = create_patient(client, center_id=c1, enrollment_date="2026-01-02")["id"]
+    b = create_patient(client, center_id=c1, enrollment_date="2026-01-09")["id"]
+    create_patient(client, center_id=c2)                                   # 无入组日期，不计入
+    v1 = create_visit(client, a, "baseline", "2026-01-05")["id"]
+    v2 = create_visit(client, a, "M6", "2026-07-05")["id"]
+    v3 = create_visit(client, b, "baseline", "2026-01-12")["id"]
+    client.post(f"/api/visits/{v1}/submit", headers=auth())
+    set_visit_status(client, v1, "locked")
+    client.put(f"/api/visits/{v2}", json={"visit_date": "2026-07-20"}, headers=auth())
+    client.delete(f"/api/visits/{v3}", headers=auth())
+    client.put(f"/api/patients/{a}", json={"enrollment_date": "2026-01-03"}, headers=auth())
+    client.put(f"/api/patients/{b}", json={"center_id": c2}, headers=auth())
+
+    incremental = _snapshot(db)
+    rebuild_daily_stats(db)
+    db.commit()
+    assert _snapshot(db) == incremental
+    assert incremental[(c1, date(2026, 1, 5))] == (0, 1, 1, 1, 1)      # 锁定访视计入此前各状态
+
+
+def test_series_buckets_and_cumulative_enrollment(client, centers):
+    c1, c2 = centers
+    create_patient(client, center_id=c1, enrollment_date="2025-12-30")
+    for day in ("2026-01-05", "2026-01-06", "2026-01-12"):
+        create_patient(client, center_id=c1, enrollment_date=day)
+    create_patient(client, center_id=c2, enrollment_date="2026-01-07")
+
+    r = client.get("/api/analytics/timeseries",
+                   params={"start": "2026-01-01", "end": "2026-01-18", "bucket": "week"}, headers=auth())
+    series = r.json()
+    assert series["buckets"] == ["2025-12-29", "2026-01-05", "2026-01-12"]
+    assert series["overall"]["enrollments"] == [0, 3, 1]
+    assert series["overall"]["enrollments_cumulative"] == [1, 4, 5]
+
+    own = client.get("/api/analytics/timeseries",
+                     params={"start": "2026-01-01", "end": "2026-01-18"}, headers=auth("ca2")).json()
+    assert [c["center_id"] for c in own["centers"]] == [c2]
+    assert own["overall"]["enrollments_cumulative"] == [0, 1, 1]
+    bad = client.get("/api/analytics/timeseries", params={"start": "2026-02-01", "end": "2026-01-01"}, headers=auth())
+    assert bad.status_code == 400
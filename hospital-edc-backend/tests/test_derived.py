@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from app.models.change_log import ChangeLog
+from app.models.forms import LabResults, PhysicalExam
+from app.services.derived import calc_egfr, recompute_lab_results, recompute_physical_exams
+from tests.utils import auth, create_patient, create_visit, set_visit_status
+
+
+def _lab_egfr(db, visit_id):
+    db.expire_all()
+    return db.query(LabResults.egfr).filter(LabResults.visit_id == visit_id).scalar()
+
+
+def test_physical_exam_partial_update_derives_from_merged_row(client, db):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/physical-exam", json={"height_cm": 170, "weight_kg": 70}, headers=auth())
+    r = client.post(f"/api/visits/{vid}/physical-exam", json={"weight_kg": 80, "sbp_mmhg": 145}, headers=auth())
+    assert r.json()["bmi"] == 27.7
+    assert r.json()["bp_grade"] == "1级高血压"
+
+
+def test_age_edit_recomputes_egfr_but_not_on_locked_visits(client, db):
+    pid = create_patient(client, age=40)["id"]
+    open_visit = create_visit(client, pid, "baseline", "2026-01-05")["id"]
+    locked_visit = create_visit(client, pid, "M6", "2026-07-05")["id"]
+    for vid in (open_visit, locked_visit):
+        client.post(f"/api/visits/{vid}/lab-results", json={"scr": 80}, headers=auth())
+    set_visit_status(client, locked_visit, "locked")
+    before = _lab_egfr(db, locked_visit)
+    etag = client.get(f"/api/visits/{locked_visit}/all-forms", headers=auth()).headers["etag"]
+
+    assert client.put(f"/api/patients/{pid}", json={"age": 70}, headers=auth()).status_code == 200
+
+    assert _lab_egfr(db, open_visit) == calc_egfr(80, 70, "male")
+    assert _lab_egfr(db, locked_visit) == before
+    r = client.get(f"/api/visits/{locked_visit}/all-forms", headers={**auth(), "If-None-Match": etag})
+    assert r.status_code == 304
+
+
+def test_batch_recompute_bumps_version_and_records_changes(client, db):
+    pid = create_patient(client, age=40)["id"]
+    vid = create_visit(client, pid)["id"]
+    frozen = create_visit(client, pid, "M6", "2026-07-05")["id"]
+    for v in (vid, frozen):
+        client.post(f"/api/visits/{v}/lab-results", json={"scr": 80}, headers=auth())
+        client.post(f"/api/visits/{v}/physical-exam", json={"height_cm": 170, "weight_kg": 70}, headers=auth())
+    set_visit_status(client, frozen, "signed")
+    etag = client.get(f"/api/visits/{vid}/all-forms", headers=auth()).headers.get("etag")
+    # 模拟公式调整前写入的旧值
+    db.execute(text("UPDATE lab_results SET egfr = 1"))
+    db.execute(text("UPDATE physical_exams SET bmi = 1"))
+    db.commit()
+    changes_before = db.query(ChangeLog).count()
+
+    assert recompute_lab_results(db) == {"scanned": 2, "updated": 1, "skipped": 1}
+    assert recompute_physical_exams(db) == {"scanned": 2, "updated": 1, "skipped": 1}
+
+    r = client.get(f"/api/visits/{vid}/all-forms", headers={**auth(), "If-None-Match": etag or ""})
+    assert r.status_code == 200
+    assert r.json()["lab_results"]["egfr"] == calc_egfr(80, 40, "male")
+    assert r.json()["physical_exam"]["bmi"] == 24.2
+    assert db.query(ChangeLog).count() == changes_before + 2
+    assert _lab_egfr(db, frozen) == 1
+    assert db.query(PhysicalExam.bmi).filter(PhysicalExam.visit_id == frozen).scalar() == 1
+
+
+def test_dry_run_writes_nothing(client, db):
+    vid = create_visit(client, create_patient(client, age=40)["id"])["id"]
+    client.post(f"/api/visits/{vid}/lab-results", json={"scr": 80}, headers=auth())
+    db.execute(text("UPDATE lab_results SET egfr = 1"))
+    db.commit()
+    assert recompute_lab_results(db, dry_run=True)["updated"] == 1
+    assert _lab_egfr(db, vid) == 1
@@ -0,0 +1,50 @@
+from sqlalchemy import text
+from tests.utils import auth, create_patient, create_visit
+
+
+def _open(client, user="admin", **params):
+    r = client.get("/api/discrepancies/", params=params, headers=auth(user))
+    assert r.status_code == 200, r.text
+    return {(d["visit_id"], d["rule_code"]): d for d in r.json()["items"]}
+
+
+def test_discrepancy_opens_resolves_and_reopens_in_place(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": 25, "tc": 4, "hdl_c": 5}, headers=auth())
+    found = _open(client)
+    assert set(found) == {(vid, "LAB_HBA1C_RANGE"), (vid, "LAB_HDL_LT_TC")}
+    first_id = found[(vid, "LAB_HBA1C_RANGE")]["id"]
+
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": 7}, headers=auth())
+    assert set(_open(client)) == {(vid, "LAB_HDL_LT_TC")}
+    assert [d["id"] for d in _open(client, status="resolved").values()] == [first_id]
+
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": 2}, headers=auth())
+    reopened = _open(client)[(vid, "LAB_HBA1C_RANGE")]
+    assert reopened["id"] == first_id and reopened["value"] == "2"
+
+
+def test_cross_visit_rule_and_center_scoping(client, centers):
+    pid = create_patient(client, center_id=centers[0])["id"]
+    first = create_visit(client, pid, "baseline", "2026-01-05")["id"]
+    second = create_visit(client, pid, "M6", "2026-07-05")["id"]
+    client.post(f"/api/visits/{first}/physical-exam", json={"weight_kg": 70}, headers=auth())
+    client.post(f"/api/visits/{second}/physical-exam", json={"weight_kg": 90}, headers=auth())
+    assert set(_open(client)) == {(second, "PE_WEIGHT_DELTA")}
+    assert _open(client, "ca2") == {}
+
+    client.put(f"/api/patients/{pid}", json={"center_id": centers[1]}, headers=auth())
+    assert set(_open(client, "ca2")) == {(second, "PE_WEIGHT_DELTA")}
+
+
+def test_sweep_catches_rows_written_outside_the_api(client, db):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/physical-exam", json={"weight_kg": 70}, headers=auth())
+    assert client.post("/api/discrepancies/sweep", headers=auth()).json()["opened"] == 0
+
+    db.execute(text("UPDATE physical_exams SET sbp_mmhg = 300 WHERE visit_id = :v"), {"v": vid})
+    db.commit()
+    assert client.post("/api/discrepancies/sweep", headers=auth()).json()["opened"] == 0   # 增量只看 change_log
+    assert client.post("/api/discrepancies/sweep?full=true", headers=auth()).json()["opened"] == 1
+    assert set(_open(client)) == {(vid, "PE_SBP_RANGE")}
+    assert client.post("/api/discrepancies/sweep", headers=auth("r1")).status_code == 403
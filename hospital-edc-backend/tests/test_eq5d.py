@@ -0,0 +1,49 @@
+import numpy as np
+from app.services.eq5d import LOOKUP, eq5d_index, eq5d_indices
+from tests.utils import auth, create_patient, create_visit
+
+DIMS = {"eq_mobility": 1, "eq_self_care": 2, "eq_usual_activity": 3, "eq_pain": 2, "eq_anxiety": 1}
+
+
+def _save(client, vid, **fields):
+    r = client.post(f"/api/visits/{vid}/questionnaire", json={"questionnaire_type": "eq5d", **fields}, headers=auth())
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _stored(client, vid, q_type="eq5d"):
+    return client.get(f"/api/visits/{vid}/questionnaire/{q_type}", headers=auth()).json()
+
+
+def test_single_and_vectorized_index_agree():
+    levels = np.array([[1, 1, 1, 1, 1], [5, 5, 5, 5, 5], [1, 2, 3, 2, 1], [1, 2, np.nan, 2, 1]])
+    out = eq5d_indices(levels)
+    assert out[0] == 1.0 and out[1] == LOOKUP[-1]
+    assert out[2] == eq5d_index([1, 2, 3, 2, 1])
+    assert np.isnan(out[3]) and eq5d_index([1, 2, None, 2, 1]) is None
+
+
+def test_partial_update_recomputes_index_from_merged_row(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    assert _save(client, vid, **DIMS)["eq5d_index"] == eq5d_index(list(DIMS.values()))
+    result = _save(client, vid, eq_mobility=4)
+    expected = eq5d_index([4, 2, 3, 2, 1])
+    assert result["eq5d_index"] == expected
+    assert _stored(client, vid)["eq5d_index"] == expected
+
+
+def test_index_is_null_until_all_dimensions_present(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    assert _save(client, vid, eq_mobility=2, eq_pain=3)["eq5d_index"] is None
+    assert _save(client, vid, eq_self_care=1, eq_usual_activity=1, eq_anxiety=1)["eq5d_index"] == \
+        eq5d_index([2, 1, 1, 3, 1])
+
+
+def test_partial_phq9_update_rescores_merged_answers(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/questionnaire", json={
+        "questionnaire_type": "phq9", **{f"q{i}": 1 for i in range(1, 10)},
+    }, headers=auth())
+    r = client.post(f"/api/visits/{vid}/questionnaire", json={"questionnaire_type": "phq9", "q1": 3}, headers=auth())
+    assert r.json()["total_score"] == 11
+    assert _stored(client, vid, "phq9")["total_score"] == 11
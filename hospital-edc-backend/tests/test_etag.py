@@ -0,0 +1,44 @@
+from tests.utils import auth, create_patient, create_visit
+
+
+def _get(client, url, etag=None, user="admin"):
+    headers = auth(user)
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+
+def test_visit_form_etag_changes_on_every_write(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    url = f"/api/visits/{vid}/medications"
+    first = _get(client, url)
+    assert _get(client, url, first.headers["etag"]).status_code == 304
+    assert _get(client, url, "W/" + first.headers["etag"]).status_code == 304
+
+    # 同一访视下任一表单写入都会使该访视全部表单的 ETag 失效
+    client.post(f"/api/visits/{vid}/cost-indicators", json={"drug_cost": 1}, headers=auth())
+    second = _get(client, url, first.headers["etag"])
+    assert second.status_code == 200 and second.headers["etag"] != first.headers["etag"]
+    assert _get(client, f"/api/visits/{vid}/physical-exam", second.headers["etag"]).status_code == 304
+
+
+def test_patient_etag_follows_profile_and_summary_changes(client):
+    pid = create_patient(client)["id"]
+    url = f"/api/patients/{pid}"
+    etag = _get(client, url).headers["etag"]
+    assert _get(client, url, etag).status_code == 304
+
+    create_visit(client, pid)
+    r = _get(client, url, etag)
+    assert r.status_code == 200 and r.json()["latest_visit_status"] == "draft"
+
+    etag = r.headers["etag"]
+    client.put(url, json={"name_initials": "LS"}, headers=auth())
+    r = _get(client, url, etag)
+    assert r.status_code == 200 and r.json()["name_initials"] == "LS"
+
+
+def test_no_304_for_users_without_access(client, centers):
+    pid = create_patient(client, center_id=centers[0])["id"]
+    etag = _get(client, f"/api/patients/{pid}").headers["etag"]
+    assert _get(client, f"/api/patients/{pid}", etag, user="ca2").status_code == 403
@@ -0,0 +1,47 @@
+import csv
+import io
+from app.services.export import export_columns, iter_export_csv
+from tests.utils import auth, create_patient, create_visit
+
+
+def _rows(text):
+    return list(csv.DictReader(io.StringIO(text.lstrip("\ufeff"))))
+
+
+def _seed(client, centers):
+    pid = create_patient(client, center_id=centers[0], name_initials="QX")["id"]
+    vid = create_visit(client, pid)["id"]
+    client.post(f"/api/visits/{vid}/all-forms", json={
+        "physical_exam": {"weight_kg": 70, "height_cm": 175},
+        "questionnaires": [{"questionnaire_type": "phq9", "q1": 2}, {"questionnaire_type": "gad7", "q1": 1}],
+    }, headers=auth())
+    create_visit(client, pid, "M6", "2026-07-01")
+    create_visit(client, create_patient(client, center_id=centers[1])["id"])
+    return vid
+
+
+def test_one_row_per_visit_with_questionnaires_spread_into_columns(client, centers):
+    vid = _seed(client, centers)
+    r = client.get("/api/export/visits.csv", headers=auth())
+    assert r.status_code == 200
+    assert r.text.startswith("\ufeff")
+    rows = _rows(r.text)
+    assert list(rows[0]) == [name for name, _ in export_columns()]
+    assert len(rows) == 3 and len({row["visit_id"] for row in rows}) == 3
+    row = next(row for row in rows if row["visit_id"] == str(vid))
+    assert (row["pe_bmi"], row["phq9_q1"], row["gad7_q1"], row["eq5d_eq5d_index"]) == ("22.9", "2", "1", "")
+    assert "QX" not in r.text
+
+
+def test_export_is_scoped_and_admin_only(client, centers):
+    _seed(client, centers)
+    assert {row["center_code"] for row in _rows(client.get("/api/export/visits.csv", headers=auth("ca2")).text)} == {
+        "CHN-018"
+    }
+    assert client.get(f"/api/export/visits.csv?center_id={centers[0]}", headers=auth("ca2")).status_code == 403
+    assert client.get("/api/export/visits.csv", headers=auth("r1")).status_code == 403
+
+
+def test_batches_concatenate_to_the_same_output(client, db, centers):
+    _seed(client, centers)
+    assert "".join(iter_export_csv(db, batch_size=1)) == "".join(iter_export_csv(db, batch_size=1000))
@@ -0,0 +1,16 @@
+import importlib.util
+from pathlib import Path
+import pytest
+from app.database import engine
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "explain_hot_queries.py"
+_spec = importlib.util.spec_from_file_location("explain_hot_queries", SCRIPT)
+explain = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(explain)
+
+
+@pytest.mark.parametrize("label, stmt, expected", explain.HOT_QUERIES, ids=[q[0] for q in explain.HOT_QUERIES])
+def test_hot_query_uses_its_index(centers, label, stmt, expected):
+    with engine.connect() as conn:
+        used, plan = explain._explain(conn, stmt)
+    assert used & expected, plan
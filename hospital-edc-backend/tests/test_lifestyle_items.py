@@ -0,0 +1,48 @@
+import json
+from tests.utils import auth, create_patient, create_visit
+
+DIET = [10, 7.5, 5, 2.5, 10, 10, 7.5, 5, 2.5, 10]
+
+
+def _save(client, vid, body):
+    return client.post(f"/api/visits/{vid}/lifestyle", json=body, headers=auth())
+
+
+def test_list_and_legacy_json_store_the_same_columns(client):
+    pid = create_patient(client)["id"]
+    a, b = create_visit(client, pid)["id"], create_visit(client, pid, "M6", "2026-07-01")["id"]
+    ra = _save(client, a, {"diet_scores": DIET, "exercise_scores": [5, None, 5]})
+    rb = _save(client, b, {"diet_scores_json": json.dumps(DIET), "exercise_scores_json": "[5, null, 5]"})
+    assert ra.json()["diet_total"] == rb.json()["diet_total"] == sum(DIET)
+
+    row_a = client.get(f"/api/visits/{a}/lifestyle", headers=auth()).json()
+    row_b = client.get(f"/api/visits/{b}/lifestyle", headers=auth()).json()
+    items = lambda row: [row[f"diet_q{i}"] for i in range(1, 11)] + [row[f"exercise_q{i}"] for i in range(1, 6)]
+    assert items(row_a) == items(row_b) == DIET + [5, None, 5, None, None]
+
+
+def test_partial_save_keeps_the_other_assessment(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    _save(client, vid, {"diet_scores": DIET})
+    _save(client, vid, {"exercise_scores": [10] * 5})
+    row = client.get(f"/api/visits/{vid}/lifestyle", headers=auth()).json()
+    assert row["diet_q1"] == 10 and row["diet_total"] == sum(DIET) and row["exercise_total"] == 50
+
+
+def test_invalid_items_are_rejected(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    assert _save(client, vid, {"diet_scores_json": "[1,"}).status_code == 400
+    assert _save(client, vid, {"exercise_scores_json": json.dumps([1] * 6)}).status_code == 400
+    assert _save(client, vid, {"exercise_scores": [1] * 6}).status_code == 422
+
+
+def test_item_stats_are_center_scoped(client, centers):
+    for center_id, score in ((centers[0], 10), (centers[1], 2.5)):
+        vid = create_visit(client, create_patient(client, center_id=center_id)["id"])["id"]
+        _save(client, vid, {"diet_scores": [score]})
+    overall = client.get("/api/analytics/lifestyle-items", headers=auth()).json()
+    assert overall["assessments"] == 2
+    assert overall["diet"][0] == {"item": 1, "n": 2, "mean": 6.25, "min": 2.5, "max": 10}
+    assert overall["diet"][1]["n"] == 0
+    own = client.get("/api/analytics/lifestyle-items", headers=auth("r1")).json()
+    assert own["diet"][0]["mean"] == 10
@@ -0,0 +1,46 @@
+from tests.utils import auth, create_patient, create_visit
+
+
+def _lab(client, pid, visit_type, day, hba1c):
+    vid = create_visit(client, pid, visit_type, day)["id"]
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": hba1c}, headers=auth())
+    return vid
+
+
+def _stats(client, user="admin"):
+    r = client.get("/api/analytics/longitudinal", headers=auth(user))
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_paired_deltas_and_target_rates(client, centers):
+    a = create_patient(client, center_id=centers[0])["id"]
+    b = create_patient(client, center_id=centers[1])["id"]
+    _lab(client, a, "baseline", "2026-01-05", 8.0)
+    _lab(client, a, "M6", "2026-07-05", 6.5)
+    _lab(client, b, "baseline", "2026-01-06", 9.0)
+    _lab(client, b, "M6", "2026-07-06", 8.0)
+    _lab(client, create_patient(client)["id"], "M6", "2026-07-07", 6.0)   # 无基线，不参与配对
+
+    m6 = _stats(client)["overall"]["M6"]["hba1c"]
+    assert (m6["n"], m6["mean"], m6["median"]) == (3, 6.83, 6.5)
+    assert (m6["delta_n"], m6["delta_mean"]) == (2, -1.25)
+    assert m6["target_rate"] == round(2 / 3, 4)
+    assert _stats(client)["overall"]["baseline"]["hba1c"]["delta_n"] == 0
+
+    own = _stats(client, "ca2")
+    assert [c["center_id"] for c in own["centers"]] == [centers[1]]
+    assert own["overall"]["M6"]["hba1c"]["delta_mean"] == -1.0
+
+
+def test_cached_result_follows_form_writes_and_transfers(client, centers):
+    pid = create_patient(client, center_id=centers[0])["id"]
+    vid = _lab(client, pid, "baseline", "2026-01-05", 8.0)
+    assert _stats(client)["overall"]["baseline"]["hba1c"]["mean"] == 8.0
+
+    client.post(f"/api/visits/{vid}/lab-results", json={"hba1c": 7.0}, headers=auth())
+    assert _stats(client)["overall"]["baseline"]["hba1c"]["mean"] == 7.0
+
+    assert _stats(client, "ca2")["visits"] == 0
+    client.put(f"/api/patients/{pid}", json={"center_id": centers[1]}, headers=auth())
+    assert _stats(client, "ca2")["visits"] == 1
@@ -0,0 +1,24 @@
+from app.models.patient import Patient, PatientCodeSequence
+from app.services.patient_codes import allocate_patient_codes
+from tests.utils import create_patient
+
+
+def test_codes_are_sequential_per_center(client, centers):
+    codes = [create_patient(client, center_id=centers[0], center_code="CHN-017")["patient_code"] for _ in range(3)]
+    other = create_patient(client, center_id=centers[1], center_code="CHN-018")["patient_code"]
+    assert codes == ["CHN-017-001", "CHN-017-002", "CHN-017-003"]
+    assert other == "CHN-018-001"
+
+
+def test_sequence_starts_after_existing_codes(client, db, centers):
+    db.add(Patient(patient_code="CHN-017-041", center_code="CHN-017", center_id=centers[0], gender="male"))
+    db.add(Patient(patient_code="CHN-017-X", center_code="CHN-017", center_id=centers[0], gender="male"))
+    db.commit()
+    assert create_patient(client, center_id=centers[0])["patient_code"] == "CHN-017-042"
+
+
+def test_block_allocation(db, centers):
+    assert allocate_patient_codes(db, "T%_", 2) == ["T%_-001", "T%_-002"]
+    assert allocate_patient_codes(db, "T%_", 1) == ["T%_-003"]
+    db.commit()
+    assert db.get(PatientCodeSequence, "T%_").last_value == 3
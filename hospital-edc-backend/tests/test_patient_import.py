@@ -0,0 +1,45 @@
+from tests.utils import auth
+
+HEADER = "name_initials,gender,age,center_code,center_id\n"
+
+
+def _import(client, body: str, filename="patients.csv"):
+    r = client.post(
+        "/api/patients/import",
+        files={"file": (filename, body.encode("utf-8"), "text/csv")},
+        headers=auth(),
+    )
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _codes(client):
+    return sorted(p["patient_code"] for p in client.get("/api/patients/", headers=auth()).json()["items"])
+
+
+def test_bad_rows_are_reported_and_good_rows_imported(client, centers):
+    body = HEADER + (
+        f"AA,male,50,CHN-017,{centers[0]}\n"
+        "BB,female\n"                          # 列数不足：年龄为空，中心取导入者所属中心
+        f"CC,male,40,,{centers[1]}\n"          # center_code 为空：取所属中心的中心编号
+        f"DD,unknown,30,CHN-017,{centers[0]}\n"
+        "EE,female,61,CHN-017,9999\n"          # 中心不存在
+    )
+    result = _import(client, body)
+    assert result["inserted"] == 3
+    assert result["errors"] == [
+        {"row": 4, "errors": ["gender: 须为 male 或 female"]},
+        {"row": 5, "errors": ["所属中心不存在"]},
+    ]
+    assert _codes(client) == ["CHN-017-001", "CHN-017-002", "CHN-018-001"]
+    assert client.get("/api/patients/", params={"search": "bb"}, headers=auth()).json()["items"][0]["age"] is None
+
+
+def test_unknown_center_does_not_fail_the_chunk(client, centers):
+    rows = ",".join(
+        f'{{"name_initials": "P{i}", "gender": "male", "center_id": {cid}}}'
+        for i, cid in enumerate([centers[0], 9999, centers[1]])
+    )
+    result = _import(client, f"[{rows}]", filename="patients.json")
+    assert result == {"inserted": 2, "errors": [{"row": 2, "errors": ["所属中心不存在"]}]}
+    assert len(_codes(client)) == 2
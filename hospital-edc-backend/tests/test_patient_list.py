@@ -0,0 +1,47 @@
+from tests.utils import auth, create_patient
+
+
+def test_cursor_pages_cover_all_patients_without_overlap(client):
+    ids = [create_patient(client)["id"] for _ in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_total": False}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/patients/", params=params, headers=auth()).json()
+        assert page["total"] is None
+        seen += [p["id"] for p in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_total_matches_visible_patients(client, centers):
+    create_patient(client, center_id=centers[0])
+    create_patient(client, center_id=centers[1])
+    assert client.get("/api/patients/", headers=auth()).json()["total"] == 2
+    assert client.get("/api/patients/", headers=auth("r1")).json()["total"] == 1
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/patients/?cursor=not-a-cursor", headers=auth()).status_code == 400
+
+
+def test_null_center_code_uses_the_patients_center(client, centers):
+    patient = create_patient(client, center_id=centers[1], center_code=None)
+    assert patient["center_code"] == "CHN-018"
+    assert patient["patient_code"] == "CHN-018-001"
+    r = client.post(
+        "/api/patients/",
+        json={"name_initials": "ZS", "gender": "male", "center_id": 9999, "center_code": None},
+        headers=auth(),
+    )
+    assert r.status_code == 400
+
+
+def test_limit_is_bounded(client):
+    create_patient(client)
+    for limit in (0, -1, 201):
+        assert client.get("/api/patients/", params={"limit": limit}, headers=auth()).status_code == 422
+    assert client.get("/api/patients/", params={"skip": -1}, headers=auth()).status_code == 422
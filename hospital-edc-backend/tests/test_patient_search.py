@@ -0,0 +1,24 @@
+from tests.utils import auth, create_patient
+
+
+def _search(client, term):
+    r = client.get("/api/patients/", params={"search": term}, headers=auth())
+    assert r.status_code == 200, r.text
+    return {p["id"] for p in r.json()["items"]}
+
+
+def test_search_matches_code_and_initials_substrings(client):
+    a = create_patient(client, name_initials="WZ")
+    b = create_patient(client, name_initials="LI")
+    assert _search(client, a["patient_code"][-3:]) >= {a["id"]}
+    assert _search(client, "wz") == {a["id"]}
+    assert _search(client, "I") == {b["id"]}
+
+
+def test_search_terms_are_literal(client):
+    create_patient(client, name_initials="ZZ")
+    create_patient(client, name_initials="Z_")
+    assert len(_search(client, "zz")) == 1
+    assert len(_search(client, "z_")) == 1
+    assert _search(client, "%") == set()
+    assert _search(client, "zzz") == set()
@@ -0,0 +1,44 @@
+from app.models.patient import Patient
+from app.services.patient_summary import rebuild_all_summaries
+from tests.utils import auth, create_patient, create_visit
+
+
+def _summary(client, pid):
+    p = client.get(f"/api/patients/{pid}", headers=auth()).json()
+    return p["has_submitted"], p["has_consent"], p["latest_visit_status"]
+
+
+def test_summary_follows_visit_and_consent_writes(client):
+    pid = create_patient(client)["id"]
+    assert _summary(client, pid) == (False, False, None)
+
+    first = create_visit(client, pid, "baseline", "2026-01-05")["id"]
+    later = create_visit(client, pid, "M6", "2026-07-05")["id"]
+    assert _summary(client, pid) == (False, False, "draft")
+
+    assert client.post(f"/api/visits/{first}/submit", headers=auth()).status_code == 200
+    assert _summary(client, pid) == (True, False, "draft")
+    assert client.post(f"/api/visits/{later}/submit", headers=auth()).status_code == 200
+    assert _summary(client, pid)[2] == "submitted"
+
+    r = client.post(f"/api/consent/{pid}", data={"subject_signed_date": "2026-01-01"}, headers=auth())
+    assert r.status_code == 200, r.text
+    assert _summary(client, pid) == (True, True, "submitted")
+
+
+def test_summary_cleared_when_visits_deleted(client):
+    pid = create_patient(client)["id"]
+    vid = create_visit(client, pid)["id"]
+    assert client.delete(f"/api/visits/{vid}", headers=auth()).status_code == 200
+    assert _summary(client, pid) == (False, False, None)
+
+
+def test_rebuild_matches_incremental_maintenance(client, db):
+    pid = create_patient(client)["id"]
+    vid = create_visit(client, pid)["id"]
+    client.post(f"/api/visits/{vid}/submit", headers=auth())
+    before = _summary(client, pid)
+    db.query(Patient).update({Patient.has_submitted: False, Patient.latest_visit_status: None})
+    rebuild_all_summaries(db)
+    db.commit()
+    assert _summary(client, pid) == before
@@ -0,0 +1,33 @@
+import pytest
+from app.config import settings
+from app.query_counter import NPlusOneQueryError, RequestQueryStats, check_n_plus_one
+from tests.utils import auth, create_patient, create_visit
+
+
+def _queries(client, url, user="admin"):
+    r = client.get(url, headers=auth(user))
+    assert r.status_code == 200, r.text
+    return int(r.headers["x-db-queries"])
+
+
+def test_list_query_count_does_not_grow_with_rows(client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_RAISE", True)
+    pid = create_patient(client)["id"]
+    create_visit(client, pid)
+    small = (_queries(client, "/api/patients/"), _queries(client, f"/api/visits/?patient_id={pid}"))
+    for _ in range(5):
+        create_patient(client)
+    create_visit(client, pid, "M6", "2026-07-01")
+    create_visit(client, pid, "M12", "2027-01-01")
+    large = (_queries(client, "/api/patients/"), _queries(client, f"/api/visits/?patient_id={pid}"))
+    assert large == small
+
+
+def test_repeated_statement_is_flagged():
+    stats = RequestQueryStats()
+    stats.statements.update({"SELECT * FROM visits WHERE id = ?": 5, "SAVEPOINT sa_1": 9})
+    check_n_plus_one(stats, "GET /x", threshold=0, fail=True)
+    with pytest.raises(NPlusOneQueryError):
+        check_n_plus_one(stats, "GET /x", threshold=5, fail=True)
+    assert stats.repeated(6) == []
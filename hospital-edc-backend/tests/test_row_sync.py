@@ -0,0 +1,32 @@
+from tests.utils import auth, create_patient, create_visit
+
+
+def _save(client, vid, meds):
+    r = client.post(f"/api/visits/{vid}/medications", json={"medications": meds}, headers=auth())
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _rows(client, vid):
+    return {m["drug_name"]: m["id"] for m in client.get(f"/api/visits/{vid}/medications", headers=auth()).json()}
+
+
+def test_ids_are_stable_and_never_reused(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    _save(client, vid, [{"drug_name": "metformin"}, {"drug_name": "aspirin"}])
+    before = _rows(client, vid)
+
+    # 去掉 aspirin、新增 insulin：应为一删一增，insulin 不得沿用 aspirin 的 id
+    result = _save(client, vid, [{"id": before["metformin"], "drug_name": "metformin"}, {"drug_name": "insulin"}])
+    assert (result["inserted"], result["updated"], result["deleted"], result["unchanged"]) == (1, 0, 1, 1)
+    after = _rows(client, vid)
+    assert after["metformin"] == before["metformin"]
+    assert after["insulin"] not in before.values()
+
+
+def test_rows_without_id_match_identical_content(client):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    _save(client, vid, [{"drug_name": "metformin", "dose": "500 mg"}])
+    before = _rows(client, vid)
+    result = _save(client, vid, [{"drug_name": "metformin", "dose": "500 mg"}])
+    assert result["unchanged"] == 1 and _rows(client, vid) == before
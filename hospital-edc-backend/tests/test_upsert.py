@@ -0,0 +1,42 @@
+import pytest
+from app.models.forms import CostIndicator, PhysicalExam
+from app.services.derived import physical_exam_update
+from app.services.upsert import _select_then_write, upsert_row
+from tests.utils import auth, create_patient, create_visit
+
+
+def _row(db, model, vid):
+    db.expire_all()
+    rows = db.query(model).filter(model.visit_id == vid).all()
+    assert len(rows) == 1
+    return rows[0]
+
+
+@pytest.mark.parametrize("write", [upsert_row, _select_then_write], ids=["native", "fallback"])
+def test_partial_update_keeps_other_columns(client, db, write):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    write(db, CostIndicator, {"visit_id": vid}, {"drug_cost": 10.0, "lab_cost": 5.0}, None)
+    db.commit()
+    write(db, CostIndicator, {"visit_id": vid}, {"lab_cost": 7.0, "other_cost": None}, None)
+    db.commit()
+    row = _row(db, CostIndicator, vid)
+    assert (row.drug_cost, row.lab_cost, row.other_cost) == (10.0, 7.0, None)
+
+
+@pytest.mark.parametrize("write", [upsert_row, _select_then_write], ids=["native", "fallback"])
+def test_derived_columns_use_the_merged_row(client, db, write):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    write(db, PhysicalExam, {"visit_id": vid}, {"height_cm": 160.0, "weight_kg": 64.0, "bmi": 25.0}, physical_exam_update)
+    db.commit()
+    write(db, PhysicalExam, {"visit_id": vid}, {"weight_kg": 51.2}, physical_exam_update)
+    db.commit()
+    row = _row(db, PhysicalExam, vid)
+    assert (row.height_cm, row.weight_kg, row.bmi) == (160.0, 51.2, 20.0)
+
+
+def test_form_endpoint_upserts_a_single_row(client, db):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    for body in ({"drug_cost": 1}, {"drug_cost": 2}, {"service_cost": 3}):
+        assert client.post(f"/api/visits/{vid}/cost-indicators", json=body, headers=auth()).status_code == 200
+    row = _row(db, CostIndicator, vid)
+    assert (row.drug_cost, row.service_cost) == (2, 3)
@@ -0,0 +1,60 @@
+from sqlalchemy import text
+from app.services.visit_cache import VisitFormsCache, visit_forms_cache
+from tests.utils import auth, create_patient, create_visit, set_visit_status
+
+
+def _frozen_visit(client, status="locked"):
+    vid = create_visit(client, create_patient(client)["id"])["id"]
+    client.post(f"/api/visits/{vid}/physical-exam", json={"weight_kg": 70}, headers=auth())
+    set_visit_status(client, vid, status)
+    return vid
+
+
+def test_frozen_visit_is_served_from_cache(client):
+    vid = _frozen_visit(client)
+    first = client.get(f"/api/visits/{vid}/all-forms", headers=auth())
+    second = client.get(f"/api/visits/{vid}/all-forms", headers=auth())
+    assert second.content == first.content
+    assert int(second.headers["x-db-queries"]) < int(first.headers["x-db-queries"])
+    r = client.get(f"/api/visits/{vid}/all-forms", headers={**auth(), "If-None-Match": first.headers["etag"]})
+    assert r.status_code == 304
+
+
+def test_change_made_by_another_worker_is_not_masked(client, db):
+    """其他进程改动（本进程缓存未失效）后，按库中 version 返回新内容而非旧缓存/304"""
+    vid = _frozen_visit(client)
+    old = client.get(f"/api/visits/{vid}/all-forms", headers=auth())
+    db.execute(text("UPDATE physical_exams SET weight_kg = 80 WHERE visit_id = :v"), {"v": vid})
+    db.execute(text("UPDATE visits SET version = version + 1 WHERE id = :v"), {"v": vid})
+    db.commit()
+    r = client.get(f"/api/visits/{vid}/all-forms", headers={**auth(), "If-None-Match": old.headers["etag"]})
+    assert r.status_code == 200
+    assert r.json()["physical_exam"]["weight_kg"] == 80
+    assert r.headers["etag"] != old.headers["etag"]
+
+
+def test_reopen_edit_resign_refreshes_body(client):
+    vid = _frozen_visit(client, "signed")
+    client.get(f"/api/visits/{vid}/all-forms", headers=auth())
+    set_visit_status(client, vid, "draft")
+    client.post(f"/api/visits/{vid}/physical-exam", json={"weight_kg": 75}, headers=auth())
+    set_visit_status(client, vid, "signed")
+    assert client.get(f"/api/visits/{vid}/all-forms", headers=auth()).json()["physical_exam"]["weight_kg"] == 75
+
+
+def test_disk_tier_is_keyed_by_version(tmp_path):
+    writer = VisitFormsCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+    writer.put(1, 3, "locked", b"{}")
+    reader = VisitFormsCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+    assert reader.get(1, 3) == b"{}"
+    assert reader.get(1, 4) is None
+    writer.put(2, 1, "draft", b"{}")
+    assert reader.get(2, 1) is None
+
+
+def test_memory_tier_evicts_by_bytes():
+    cache = VisitFormsCache(max_bytes=10)
+    cache.put(1, 1, "signed", b"12345")
+    cache.put(2, 1, "signed", b"123456")
+    assert cache.get(1, 1) is None and cache.get(2, 1) == b"123456"
+    visit_forms_cache.clear()
@@ -0,0 +1,26 @@
+from app.dependencies import create_access_token
+
+
+def auth(user: str = "admin") -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": user})}
+
+
+def create_patient(client, user: str = "admin", **fields) -> dict:
+    payload = {"name_initials": "ZS", "gender": "male", "age": 50, **fields}
+    r = client.post("/api/patients/", json=payload, headers=auth(user))
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def create_visit(client, patient_id: int, visit_type: str = "baseline", visit_date: str = "2026-01-05",
+                 user: str = "admin") -> dict:
+    r = client.post("/api/visits/", json={
+        "patient_id": patient_id, "visit_type": visit_type, "visit_date": visit_date,
+    }, headers=auth(user))
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def set_visit_status(client, visit_id: int, status: str) -> None:
+    r = client.put(f"/api/visits/{visit_id}", json={"status": status}, headers=auth())
+    assert r.status_code == 200, r.text